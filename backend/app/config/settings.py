@@ -9,18 +9,85 @@ class Settings(BaseSettings):
     debug: bool = True
     cors_origins: List[str] = ["http://localhost:5173"]
     max_upload_size: int = 10485760  # 10MB
+    upload_spill_threshold: int = 4194304  # 4MB, larger uploads go to disk
 
     # Dartmouth Chat AI (OpenAI-compatible endpoint)
     dartmouth_ai_api_key: str = ""
     dartmouth_ai_base_url: str = "https://chat.dartmouth.edu/api"
     dartmouth_ai_model: str = "anthropic.claude-3-5-haiku-20241022"
+    narrative_max_concurrency: int = 8
+    narrative_connect_timeout_seconds: float = 5.0
+    narrative_read_timeout_seconds: float = 60.0
+    narrative_pool_max_connections: int = 20
+    narrative_pool_max_keepalive: int = 10
+    narrative_input_token_budget: int = 3000  # system + user prompt
+    narrative_max_bullet_chars: int = 300
+    narrative_coalesce_wait_seconds: float = 90.0  # waiting on an identical request
 
-    # Rate limiting (per IP)
+    # Narrative upstream resilience (hedge percentile 0 disables hedging)
+    narrative_retry_max_attempts: int = 3
+    narrative_retry_base_delay_seconds: float = 0.5
+    narrative_retry_max_delay_seconds: float = 8.0
+    narrative_hedge_percentile: float = 0.0
+    narrative_hedge_min_samples: int = 20
+    narrative_breaker_failure_threshold: int = 5
+    narrative_breaker_reset_seconds: float = 30.0
+
+    # Narrative response cache (empty dir disables the on-disk tier)
+    narrative_cache_max_entries: int = 512
+    narrative_cache_ttl_seconds: float = 86400.0
+    narrative_cache_dir: str = ""
+    narrative_cache_disk_max_bytes: int = 268435456  # 256MB
+
+    # Background narrative jobs (empty store path keeps jobs in memory).
+    # Callbacks go only to the allowed hosts if any are set, otherwise to
+    # any host with public addresses.
+    narrative_job_workers: int = 2
+    narrative_job_max_queue: int = 100
+    narrative_job_max_attempts: int = 3
+    narrative_job_retry_backoff_seconds: float = 2.0
+    narrative_job_ttl_seconds: float = 3600.0
+    narrative_job_callback_timeout_seconds: float = 10.0
+    narrative_job_callback_allowed_hosts: List[str] = []
+    narrative_job_store_path: str = ""
+
+    # Rate limiting (per IP). Set a backend path to share limits across
+    # workers through a SQLite file.
+    rate_limit_backend_path: str = ""
     rate_limit_default_max_requests: int = 60
     rate_limit_default_window_seconds: int = 60
     rate_limit_ai_max_requests: int = 2
     rate_limit_ai_window_seconds: int = 60
 
+    # Resume parsing worker pool
+    parse_pool_workers: int = 2
+    parse_pool_max_queue: int = 8
+    parse_timeout_seconds: float = 30.0
+    parse_batch_max_files: int = 500
+    parse_batch_deadline_seconds: float = 300.0
+
+    # Parse result cache (empty dir disables the on-disk tier)
+    parse_cache_max_entries: int = 256
+    parse_cache_ttl_seconds: float = 3600.0
+    parse_cache_dir: str = ""
+    parse_cache_disk_max_bytes: int = 268435456  # 256MB
+
+    # Incremental analytics sessions
+    analytics_session_max_entries: int = 1000
+    analytics_session_ttl_seconds: float = 7200.0
+    analytics_cohort_max_results: int = 100000
+    analytics_cohort_max_bytes: int = 104857600  # 100MB, checked before parsing
+
+    # PDF export rendering pool
+    export_pool_workers: int = 2
+    export_pool_max_queue: int = 8
+    export_timeout_seconds: float = 60.0
+    export_max_bullets: int = 2000  # bounds worker memory per export
+    export_bulk_max_items: int = 300
+    export_bulk_pdf_max_bullets: int = 20000  # one combined PDF is one story in memory
+    export_bulk_timeout_seconds: float = 600.0
+    export_file_ttl_seconds: float = 3600.0  # then abandoned render files are swept
+
     class Config:
         env_file = ".env"
 
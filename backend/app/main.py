@@ -1,8 +1,19 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import resume, export, narrative
+from fastapi.responses import PlainTextResponse
+from app.routers import resume, export, narrative, analytics
 from app.config.settings import settings
-from app.middleware.rate_limit import RateLimiter, SimpleRateLimitMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.rate_limit import (
+    AI_PATHS,
+    InMemoryRateLimitBackend,
+    RateLimiter,
+    RateLimitMiddleware,
+    RateLimitPolicy,
+    SQLiteRateLimitBackend,
+)
+from app.services.narrative import narrative_service
+from app.utils.metrics import registry
 
 app = FastAPI(
     title="Career Design Resume Analyzer",
@@ -19,20 +30,66 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-rate_limiter = RateLimiter()
+rate_limiter = RateLimiter(
+    backend=(
+        SQLiteRateLimitBackend(settings.rate_limit_backend_path)
+        if settings.rate_limit_backend_path
+        else InMemoryRateLimitBackend()
+    )
+)
 app.add_middleware(
-    SimpleRateLimitMiddleware,
+    RateLimitMiddleware,
     limiter=rate_limiter,
-    default_max_requests=settings.rate_limit_default_max_requests,
-    default_window_seconds=settings.rate_limit_default_window_seconds,
-    ai_max_requests=settings.rate_limit_ai_max_requests,
-    ai_window_seconds=settings.rate_limit_ai_window_seconds,
+    policies=[
+        # Charged by the route only when the response is not served from
+        # the narrative cache. AI requests also count against "default".
+        RateLimitPolicy(
+            name="ai",
+            max_requests=settings.rate_limit_ai_max_requests,
+            window_seconds=settings.rate_limit_ai_window_seconds,
+            paths=AI_PATHS,
+            methods=("POST",),
+            deferred=True,
+        ),
+        RateLimitPolicy(
+            name="default",
+            max_requests=settings.rate_limit_default_max_requests,
+            window_seconds=settings.rate_limit_default_window_seconds,
+            path_prefix="/api",
+        ),
+    ],
 )
 
+# Outermost, so rate-limit rejections are timed too
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(resume.router, prefix="/api", tags=["resume"])
 app.include_router(export.router, prefix="/api/export", tags=["export"])
 app.include_router(narrative.router, prefix="/api", tags=["narrative"])
+app.include_router(analytics.router, prefix="/api/analytics", tags=["analytics"])
+
+
+@app.on_event("startup")
+async def start_job_queues():
+    # Also picks up unfinished jobs from a persistent job store
+    await narrative.narrative_jobs.start()
+
+
+@app.on_event("shutdown")
+async def stop_job_queues():
+    await narrative.narrative_jobs.stop()
+
+
+@app.on_event("shutdown")
+def shutdown_worker_pools():
+    resume.parse_pool.shutdown(wait=False)
+    export.export_pool.shutdown(wait=False)
+
+
+@app.on_event("shutdown")
+async def close_ai_client():
+    await narrative_service.aclose()
 
 
 @app.get("/")
@@ -43,3 +100,9 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Counters and histograms in the Prometheus text exposition format."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
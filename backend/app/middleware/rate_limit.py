@@ -1,73 +1,311 @@
-from collections import deque
-from threading import Lock
+import asyncio
+import logging
+import math
+import sqlite3
+import threading
+from dataclasses import dataclass
 from time import time
-from typing import Deque, Dict
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
-from fastapi import Request
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils.metrics import RATE_LIMIT_REJECTIONS
+
+logger = logging.getLogger(__name__)
+
+# Routes that call the AI upstream and draw from the AI bucket
+AI_PATHS = ("/api/narrative", "/api/narrative/stream", "/api/narrative/jobs")
+
+
+@dataclass
+class RateLimitDecision:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float  # seconds until the next request would be allowed
+    reset_after: float  # seconds until the bucket is full again
+
+
+def _gcra(
+    tat: Optional[float], now: float, interval: float, window: float
+) -> Tuple[bool, float]:
+    """
+    One step of the generic cell rate algorithm.
+
+    Each key only stores its theoretical arrival time (TAT): the moment
+    its bucket would be empty again if no more requests arrived. Returns
+    (allowed, tat_after_this_request).
+    """
+    new_tat = max(tat or now, now) + interval
+    if new_tat - window > now:
+        return False, tat
+    return True, new_tat
+
+
+class InMemoryRateLimitBackend:
+    """
+    Per-process GCRA state: one float per active key, spread over
+    independently locked shards so unrelated clients do not contend.
+
+    Keys whose bucket has fully refilled carry no information and are
+    evicted every ``evict_every`` updates of their shard.
+    """
+
+    blocking = False
+
+    def __init__(self, shards: int = 16, evict_every: int = 1000) -> None:
+        self._shards: List[Dict[str, float]] = [{} for _ in range(shards)]
+        self._locks = [threading.Lock() for _ in range(shards)]
+        self._updates = [0] * shards
+        self.evict_every = evict_every
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+    def update(self, key: str, now: float, interval: float, window: float) -> Tuple[bool, float]:
+        index = hash(key) % len(self._shards)
+        shard = self._shards[index]
+        with self._locks[index]:
+            allowed, tat = _gcra(shard.get(key), now, interval, window)
+            if allowed:
+                shard[key] = tat
+
+            self._updates[index] += 1
+            if self._updates[index] >= self.evict_every:
+                self._updates[index] = 0
+                for idle in [k for k, v in shard.items() if v <= now]:
+                    del shard[idle]
+
+            return allowed, tat
+
+    def evict_idle(self, now: float) -> int:
+        evicted = 0
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                idle = [k for k, v in shard.items() if v <= now]
+                for k in idle:
+                    del shard[k]
+                evicted += len(idle)
+        return evicted
+
+
+class SQLiteRateLimitBackend:
+    """
+    GCRA state in a SQLite file, so every uvicorn worker on the host
+    shares the same limits. Each update is one short write transaction.
+
+    Updates block, so RateLimiter.check_async runs them on a worker
+    thread. If the file stays locked for longer than ``busy_timeout`` the
+    request is allowed rather than held up.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, evict_every: int = 1000, busy_timeout: float = 0.1) -> None:
+        self.path = path
+        self.evict_every = evict_every
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._updates = 0
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits (key TEXT PRIMARY KEY, tat REAL NOT NULL)"
+        )
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM rate_limits").fetchone()[0]
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode; transactions are managed explicitly below
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def update(self, key: str, now: float, interval: float, window: float) -> Tuple[bool, float]:
+        conn = self._connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Rate limit store busy, allowing request: {e}")
+            return True, None
+        try:
+            row = conn.execute("SELECT tat FROM rate_limits WHERE key = ?", (key,)).fetchone()
+            allowed, tat = _gcra(row[0] if row else None, now, interval, window)
+            if allowed:
+                conn.execute(
+                    "INSERT OR REPLACE INTO rate_limits (key, tat) VALUES (?, ?)", (key, tat)
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        self._updates += 1
+        if self._updates >= self.evict_every:
+            self._updates = 0
+            self.evict_idle(now)
+        return allowed, tat
+
+    def evict_idle(self, now: float) -> int:
+        cursor = self._connection().execute("DELETE FROM rate_limits WHERE tat <= ?", (now,))
+        return cursor.rowcount
 
 
 class RateLimiter:
-    def __init__(self) -> None:
-        self._requests: Dict[str, Deque[float]] = {}
-        self._lock = Lock()
+    """
+    GCRA rate limiter: allows bursts of up to ``max_requests`` and then
+    one request every ``window_seconds / max_requests``, in constant
+    memory per client.
+    """
+
+    def __init__(self, backend=None, clock: Callable[[], float] = time) -> None:
+        self.backend = backend if backend is not None else InMemoryRateLimitBackend()
+        self._clock = clock
 
     def allow(self, key: str, max_requests: int, window_seconds: int) -> bool:
-        now = time()
-        cutoff = now - window_seconds
+        return self.check(key, max_requests, window_seconds).allowed
+
+    async def check_async(
+        self, key: str, max_requests: int, window_seconds: float
+    ) -> RateLimitDecision:
+        """check() for use on the event loop; blocking backends run on a thread."""
+        if self.backend.blocking:
+            return await asyncio.to_thread(self.check, key, max_requests, window_seconds)
+        return self.check(key, max_requests, window_seconds)
 
-        with self._lock:
-            bucket = self._requests.get(key)
-            if bucket is None:
-                bucket = deque()
-                self._requests[key] = bucket
+    def check(self, key: str, max_requests: int, window_seconds: float) -> RateLimitDecision:
+        now = self._clock()
+        interval = window_seconds / max_requests
+        allowed, tat = self.backend.update(key, now, interval, window_seconds)
 
-            while bucket and bucket[0] <= cutoff:
-                bucket.popleft()
+        tat = max(tat or now, now)
+        # Capacity left before the next request would be rejected
+        remaining = math.floor((window_seconds - (tat - now)) / interval + 1e-9)
+        retry_after = 0.0 if remaining > 0 else tat + interval - window_seconds - now
+        return RateLimitDecision(
+            allowed=allowed,
+            limit=max_requests,
+            remaining=max(remaining, 0),
+            retry_after=max(retry_after, 0.0),
+            reset_after=tat - now,
+        )
 
-            if len(bucket) >= max_requests:
-                return False
 
-            bucket.append(now)
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    """
+    A rate limit for a group of routes. Requests match on exact ``paths``
+    or on ``path_prefix``, optionally restricted to ``methods``.
+
+    Deferred policies are not charged by the middleware; the route awaits
+    ``request.state.charge_rate_limit()`` once it knows the request will
+    actually cost something (e.g. not a cache hit).
+    """
+
+    name: str
+    max_requests: int
+    window_seconds: float
+    paths: Tuple[str, ...] = ()
+    path_prefix: Optional[str] = None
+    methods: Tuple[str, ...] = ()
+    deferred: bool = False
+
+    def matches(self, method: str, path: str) -> bool:
+        if self.methods and method not in self.methods:
+            return False
+        if path in self.paths:
             return True
+        return self.path_prefix is not None and path.startswith(self.path_prefix)
+
+
+def rate_limit_headers(decision: RateLimitDecision) -> Dict[str, str]:
+    headers = {
+        "RateLimit-Limit": str(decision.limit),
+        "RateLimit-Remaining": str(decision.remaining),
+        "RateLimit-Reset": str(math.ceil(decision.reset_after)),
+    }
+    if not decision.allowed:
+        headers["Retry-After"] = str(max(1, math.ceil(decision.retry_after)))
+    return headers
+
 
+class RateLimitMiddleware:
+    """
+    Per-client rate limiting as plain ASGI middleware, so response bodies
+    (including StreamingResponse) pass through untouched. Every matching
+    policy applies, each with its own bucket; the RateLimit-* headers
+    describe the most restrictive of them.
+    """
 
-class SimpleRateLimitMiddleware(BaseHTTPMiddleware):
     def __init__(
-        self,
-        app,
-        limiter: RateLimiter,
-        default_max_requests: int,
-        default_window_seconds: int,
-        ai_max_requests: int,
-        ai_window_seconds: int,
+        self, app: ASGIApp, limiter: RateLimiter, policies: Sequence[RateLimitPolicy]
     ) -> None:
-        super().__init__(app)
-        self._limiter = limiter
-        self._default_max = default_max_requests
-        self._default_window = default_window_seconds
-        self._ai_max = ai_max_requests
-        self._ai_window = ai_window_seconds
-
-    async def dispatch(self, request: Request, call_next):
-        path = request.url.path
-        if path.startswith("/api"):
-            client_ip = request.client.host if request.client else "unknown"
-
-            if path == "/api/narrative":
-                key = f"{client_ip}:ai"
-                allowed = self._limiter.allow(key, self._ai_max, self._ai_window)
-            else:
-                key = f"{client_ip}:default"
-                allowed = self._limiter.allow(
-                    key, self._default_max, self._default_window
-                )
+        self.app = app
+        self.limiter = limiter
+        self.policies = list(policies)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        policies = self._match(scope["method"], scope["path"])
+        if not policies:
+            await self.app(scope, receive, send)
+            return
 
-            if not allowed:
-                return JSONResponse(
+        client = scope.get("client")
+        host = client[0] if client else "unknown"
+        decisions: List[RateLimitDecision] = []
+
+        async def charge(policy: RateLimitPolicy) -> RateLimitDecision:
+            decision = await self.limiter.check_async(
+                f"{host}:{policy.name}", policy.max_requests, policy.window_seconds
+            )
+            decisions.append(decision)
+            if not decision.allowed:
+                RATE_LIMIT_REJECTIONS.inc(policy.name)
+            return decision
+
+        for policy in policies:
+            if not policy.deferred and not (await charge(policy)).allowed:
+                response = JSONResponse(
                     status_code=429,
                     content={"detail": "Rate limit exceeded. Please try again later."},
+                    headers=rate_limit_headers(decisions[-1]),
                 )
+                await response(scope, receive, send)
+                return
+
+        deferred = [policy for policy in policies if policy.deferred]
+        if deferred:
+
+            async def charge_deferred() -> RateLimitDecision:
+                for policy in deferred:
+                    if not (await charge(policy)).allowed:
+                        return decisions[-1]
+                return _most_restrictive(decisions)
+
+            scope.setdefault("state", {})["charge_rate_limit"] = charge_deferred
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start" and decisions:
+                headers = MutableHeaders(scope=message)
+                for name, value in rate_limit_headers(_most_restrictive(decisions)).items():
+                    headers[name] = value
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+    def _match(self, method: str, path: str) -> List[RateLimitPolicy]:
+        return [policy for policy in self.policies if policy.matches(method, path)]
+
 
-        return await call_next(request)
+def _most_restrictive(decisions: Sequence[RateLimitDecision]) -> RateLimitDecision:
+    """A rejection if there is one, otherwise the decision with least left."""
+    return min(decisions, key=lambda d: (d.allowed, d.remaining))
@@ -1,14 +1,38 @@
-from app.models.bullet_point import BulletPoint, BulletPointCreate, FormattingInfo
+from app.models.bullet_point import (
+    BulletPoint,
+    BulletPointCreate,
+    FormattingInfo,
+    FormattingSpan,
+)
 from app.models.bin import Bin, BinUpdate
-from app.models.analysis import Analytics, AnalysisResult, Distribution
+from app.models.analysis import Analytics, AnalyticsEvent, AnalysisResult, Distribution
+from app.models.batch import (
+    BatchParseResult,
+    BulkExportItem,
+    BulkExportProgress,
+    BulkExportRequest,
+)
+from app.models.cohort import CohortBinStats, CohortReport
+from app.models.job import Job, JobPriority, JobStatus
 
 __all__ = [
     "BulletPoint",
     "BulletPointCreate",
     "FormattingInfo",
+    "FormattingSpan",
     "Bin",
     "BinUpdate",
     "Analytics",
+    "AnalyticsEvent",
     "AnalysisResult",
     "Distribution",
+    "BatchParseResult",
+    "BulkExportItem",
+    "BulkExportProgress",
+    "BulkExportRequest",
+    "CohortBinStats",
+    "CohortReport",
+    "Job",
+    "JobPriority",
+    "JobStatus",
 ]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Literal, Optional
 from datetime import datetime
 from app.models.bin import Bin
 from app.models.onboarding import OnboardingData
@@ -22,3 +22,14 @@ class AnalysisResult(BaseModel):
     analytics: Analytics
     timestamp: datetime
     onboardingData: Optional[OnboardingData] = None
+
+
+class AnalyticsEvent(BaseModel):
+    type: Literal["add", "remove", "move"]
+    bullet_id: str
+    bin_id: Optional[str] = None  # target bin for "add" and "move"
+
+
+class AnalyticsSessionState(BaseModel):
+    session_id: str
+    analytics: Analytics
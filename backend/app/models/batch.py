@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+from typing import Dict, List, Literal, Optional
+from app.models.analysis import AnalysisResult
+from app.models.bullet_point import BulletPoint
+
+
+class BatchParseResult(BaseModel):
+    results: Dict[str, List[BulletPoint]] = {}  # filename -> bullets
+    errors: Dict[str, str] = {}  # filename -> error message
+
+
+class BulkExportItem(BaseModel):
+    name: Optional[str] = None  # e.g. the student's name; used for the file name
+    result: AnalysisResult
+
+
+class BulkExportRequest(BaseModel):
+    items: List[BulkExportItem]
+
+
+class BulkExportProgress(BaseModel):
+    id: str
+    format: Literal["zip", "pdf"]
+    status: Literal["running", "done", "cancelled"] = "running"
+    total: int
+    completed: int = 0
+    failed: Dict[str, str] = {}  # file name -> error message
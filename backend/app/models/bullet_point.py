@@ -1,10 +1,42 @@
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, model_validator
+from typing import Any, Dict, List, Tuple
+
+# (start, end, bold, italic) over text[start:end]
+FormattingSpan = Tuple[int, int, bool, bool]
 
 
 class FormattingInfo(BaseModel):
-    bold: List[bool]  # Character-level bold markers
-    italic: List[bool]  # Character-level italic markers
+    # Only styled runs are stored; characters outside every span are plain
+    spans: List[FormattingSpan] = []
+
+    @model_validator(mode="before")
+    @classmethod
+    def _accept_legacy_flags(cls, data: Any) -> Any:
+        """Accept the old per-character {"bold": [...], "italic": [...]} form."""
+        if isinstance(data, dict) and "spans" not in data:
+            if "bold" in data or "italic" in data:
+                return {
+                    "spans": spans_from_flags(
+                        data.get("bold") or [], data.get("italic") or []
+                    )
+                }
+        return data
+
+    def to_flags(self, length: int) -> Tuple[List[bool], List[bool]]:
+        """Expand spans to per-character bold/italic lists."""
+        bold = [False] * length
+        italic = [False] * length
+        for start, end, is_bold, is_italic in self.spans:
+            end = min(end, length)
+            if is_bold:
+                bold[start:end] = [True] * (end - start)
+            if is_italic:
+                italic[start:end] = [True] * (end - start)
+        return bold, italic
+
+    def to_legacy(self, length: int) -> Dict[str, List[bool]]:
+        bold, italic = self.to_flags(length)
+        return {"bold": bold, "italic": italic}
 
 
 class BulletPoint(BaseModel):
@@ -13,7 +45,33 @@ class BulletPoint(BaseModel):
     formatting: FormattingInfo
     original_index: int
 
+    def to_legacy(self) -> Dict[str, Any]:
+        """Dump with per-character formatting lists for older clients."""
+        data = self.model_dump()
+        data["formatting"] = self.formatting.to_legacy(len(self.text))
+        return data
+
 
 class BulletPointCreate(BaseModel):
     text: str
     formatting: FormattingInfo
+
+
+def spans_from_flags(bold: List[bool], italic: List[bool]) -> List[FormattingSpan]:
+    """Collapse per-character bold/italic flags into styled spans."""
+    spans: List[FormattingSpan] = []
+    length = max(len(bold), len(italic))
+    start = 0
+    current = (False, False)
+
+    for i in range(length):
+        style = (i < len(bold) and bool(bold[i]), i < len(italic) and bool(italic[i]))
+        if style != current:
+            if any(current):
+                spans.append((start, i, *current))
+            start, current = i, style
+
+    if any(current):
+        spans.append((start, length, *current))
+
+    return spans
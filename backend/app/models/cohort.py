@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from typing import Dict, List
+
+
+class CohortBinStats(BaseModel):
+    bin_id: str
+    label: str
+    results: int  # analyses that have this bin and at least one bullet
+    mean_count: float
+    mean_percentage: float
+    percentiles: Dict[str, float]  # "p10" ... "p90" of percentage
+    histogram: List[int]  # analyses per 10-point percentage bucket, 0-10 ... 90-100
+    empty: int  # analyses with no bullets in this bin
+    # How often each _generate_suggestions rule fires for this bin
+    underrepresented: int
+    dominant: int
+
+
+class CohortReport(BaseModel):
+    total_results: int
+    uncategorized_results: int  # analyses with no bullets at all
+    bins: List[CohortBinStats]
+    top_categories: Dict[str, int]  # label -> analyses where it is the top category
+    balanced_profiles: int
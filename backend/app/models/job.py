@@ -0,0 +1,25 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Literal, Optional
+from datetime import datetime
+
+JobStatus = Literal["queued", "running", "succeeded", "failed"]
+JobPriority = Literal["high", "normal", "low"]
+
+
+class Job(BaseModel):
+    id: str
+    status: JobStatus = "queued"
+    priority: JobPriority = "normal"
+    attempts: int = 0
+    created_at: datetime
+    updated_at: datetime
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    callback_url: Optional[str] = None
+    callback_delivered: Optional[bool] = None
+    # Kept for retries and recovery, never returned to clients
+    payload: Dict[str, Any] = Field(default={}, exclude=True)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed")
@@ -0,0 +1,129 @@
+import uuid
+from typing import List
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import TypeAdapter, ValidationError
+from starlette.concurrency import run_in_threadpool
+from app.config.settings import settings
+from app.models.analysis import AnalysisResult, AnalyticsEvent, AnalyticsSessionState
+from app.models.bin import Bin
+from app.models.cohort import CohortReport
+from app.services.analytics import IncrementalAnalytics
+from app.services.cohort_analytics import CohortAnalyticsService, CohortFrame
+from app.utils.cache import LRUCache
+
+router = APIRouter()
+cohort_service = CohortAnalyticsService()
+cohort_results = TypeAdapter(List[AnalysisResult])
+
+# Idle sessions expire; a client with an expired session starts a new one
+sessions = LRUCache(
+    max_entries=settings.analytics_session_max_entries,
+    ttl_seconds=settings.analytics_session_ttl_seconds,
+)
+
+
+@router.post("/sessions", response_model=AnalyticsSessionState, status_code=201)
+async def create_session(bins: List[Bin]):
+    """Start an analytics session from the current bins."""
+    session_id = uuid.uuid4().hex
+    session = IncrementalAnalytics(bins)
+    sessions.set(session_id, session)
+    return AnalyticsSessionState(session_id=session_id, analytics=session.analytics())
+
+
+@router.get("/sessions/{session_id}", response_model=AnalyticsSessionState)
+async def get_session(session_id: str):
+    session = _get_session(session_id)
+    return AnalyticsSessionState(session_id=session_id, analytics=session.analytics())
+
+
+@router.post("/sessions/{session_id}/events", response_model=AnalyticsSessionState)
+async def apply_events(session_id: str, events: List[AnalyticsEvent]):
+    """
+    Apply move/add/remove events (e.g. a drag between bins) and return the
+    updated analytics. Events are applied all-or-nothing.
+    """
+    session = _get_session(session_id)
+    try:
+        session.apply_all(events)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Refresh the entry so active sessions do not expire
+    sessions.set(session_id, session)
+    return AnalyticsSessionState(session_id=session_id, analytics=session.analytics())
+
+
+@router.delete("/sessions/{session_id}", status_code=204)
+async def delete_session(session_id: str):
+    sessions.delete(session_id)
+
+
+@router.post(
+    "/cohort",
+    response_model=CohortReport,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {
+                        "type": "array",
+                        "items": {"$ref": "#/components/schemas/AnalysisResult"},
+                    }
+                }
+            },
+        }
+    },
+)
+async def cohort_report(request: Request):
+    """
+    Term-wide report over many students' analyses: per-category
+    distribution statistics, top-category frequencies and how often each
+    suggestion rule fires.
+
+    The body (a list of AnalysisResult) is size-checked before it is
+    parsed, then validated and aggregated in the threadpool; the
+    aggregation itself is vectorized.
+    """
+    body = await _read_capped_body(request, settings.analytics_cohort_max_bytes)
+    return await run_in_threadpool(_cohort_report, body)
+
+
+def _cohort_report(body: bytes) -> CohortReport:
+    try:
+        results = cohort_results.validate_json(body)
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in e.errors()]
+        )
+    if len(results) > settings.analytics_cohort_max_results:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Cohort reports are limited to {settings.analytics_cohort_max_results} analyses",
+        )
+    return cohort_service.summarize(CohortFrame.from_results(results))
+
+
+async def _read_capped_body(request: Request, max_bytes: int) -> bytes:
+    """Read the request body, failing with 413 as soon as it exceeds max_bytes."""
+    too_large = HTTPException(
+        status_code=413, detail=f"Request body exceeds {max_bytes} bytes"
+    )
+    length = request.headers.get("content-length")
+    if length is not None and length.isdigit() and int(length) > max_bytes:
+        raise too_large
+
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > max_bytes:
+            raise too_large
+    return bytes(body)
+
+
+def _get_session(session_id: str) -> IncrementalAnalytics:
+    session = sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Analytics session not found")
+    return session
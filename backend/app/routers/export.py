@@ -1,13 +1,52 @@
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse, Response
+import asyncio
+import json
+import queue
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+from app.config.settings import settings
 from app.models.analysis import AnalysisResult
-from app.services.export import ExportService
+from app.models.batch import BulkExportItem, BulkExportProgress, BulkExportRequest
+from app.services.export import ExportService, render_combined_pdf_file, render_pdf_file
 from app.services.analytics import AnalyticsService
+from app.services.worker_pool import JobTimeoutError, PoolSaturatedError, WorkerPool
+from app.utils.cache import LRUCache
+from app.utils.file_handler import (
+    cleanup_file,
+    ensure_upload_dir,
+    sweep_old_files,
+    unique_filename,
+)
+from app.utils.zip_stream import ZipStream
 from datetime import datetime
 
 router = APIRouter()
 export_service = ExportService()
 analytics_service = AnalyticsService()
+export_pool = WorkerPool(
+    max_workers=settings.export_pool_workers,
+    max_queue=settings.export_pool_max_queue,
+    timeout_seconds=settings.export_timeout_seconds,
+)
+
+# Rendered PDFs are written here and deleted once sent. Renders whose
+# request went away are deleted by the worker if it notices in time, and
+# otherwise swept once older than settings.export_file_ttl_seconds.
+EXPORT_DIR = ensure_upload_dir("/tmp/exports")
+EXPORT_SWEEP_INTERVAL_SECONDS = 60.0
+_last_sweep = float("-inf")
+EXPORT_CHUNK_SIZE = 64 * 1024
+PROGRESS_POLL_SECONDS = 0.5
+
+# Progress of recent bulk exports, polled by id
+bulk_progress = LRUCache(max_entries=256, ttl_seconds=3600)
+
+SAFE_NAME_RE = re.compile(r"[^\w\- ]+")
 
 
 @router.post("/json")
@@ -29,14 +68,311 @@ async def export_json(result: AnalysisResult):
 @router.post("/pdf")
 async def export_pdf(result: AnalysisResult):
     """Export analysis result as PDF file."""
+    too_large = _too_large(result)
+    if too_large:
+        raise HTTPException(status_code=413, detail=too_large)
+
+    _sweep_exports()
+
+    # Render in the worker pool so the event loop stays responsive, then
+    # stream the file from disk in chunks
+    expires_at = time.time() + settings.export_timeout_seconds
     try:
-        pdf_buffer = export_service.export_to_pdf(result)
+        path = await export_pool.run(
+            render_pdf_file, result, str(EXPORT_DIR), expires_at, discard=_discard_file
+        )
+    except PoolSaturatedError:
+        raise HTTPException(
+            status_code=503,
+            detail="PDF export is busy. Please try again in a moment.",
+            headers={"Retry-After": "5"},
+        )
+    except JobTimeoutError:
+        raise HTTPException(status_code=504, detail="PDF export timed out")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"PDF export failed: {str(e)}")
+
+    return FileResponse(
+        path,
+        media_type="application/pdf",
+        filename=f"career_analysis_{datetime.now().strftime('%Y%m%d')}.pdf",
+        background=BackgroundTask(cleanup_file, Path(path)),
+    )
+
+
+@router.post("/bulk")
+async def export_bulk(
+    request: BulkExportRequest, format: str = Query("zip", pattern="^(zip|pdf)$")
+):
+    """
+    Export reports for many results at once: a streamed ZIP with one PDF
+    per result plus manifest.json, or (format=pdf) one combined PDF.
+    Results that fail are reported instead of failing the whole export.
+
+    Both are streamed, with the X-Export-Id header sent before rendering
+    starts; poll GET /bulk/{id} for progress and for which results
+    failed. A combined PDF is built in memory as one document, so its
+    results are also capped by total bullet count.
+    """
+    items = request.items
+    if not items:
+        raise HTTPException(status_code=400, detail="No results to export")
+    if len(items) > settings.export_bulk_max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Bulk export is limited to {settings.export_bulk_max_items} results",
+        )
+
+    _sweep_exports()
+    seen = {}
+    names = [unique_filename(f"{_safe_stem(item, i)}.pdf", seen) for i, item in enumerate(items)]
+    progress = BulkExportProgress(id=uuid.uuid4().hex, format=format, total=len(items))
+    date = datetime.now().strftime("%Y%m%d")
+
+    if format == "zip":
+        bulk_progress.set(progress.id, progress)
         return StreamingResponse(
-            pdf_buffer,
-            media_type="application/pdf",
+            _bulk_zip(items, names, progress),
+            media_type="application/zip",
             headers={
-                "Content-Disposition": f"attachment; filename=career_analysis_{datetime.now().strftime('%Y%m%d')}.pdf"
+                "Content-Disposition": f"attachment; filename=career_analyses_{date}.zip",
+                "X-Export-Id": progress.id,
             },
         )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"PDF export failed: {str(e)}")
+
+    # One document cannot be split across processes, so it renders as a
+    # single job; oversized results are left out up front, and the rest
+    # must fit the combined cap.
+    named_results = []
+    for name, item in zip(names, items):
+        too_large = _too_large(item.result)
+        if too_large:
+            progress.failed[name] = too_large
+        else:
+            named_results.append((name, item.result))
+    bullet_total = sum(_bullet_count(result) for _, result in named_results)
+    if bullet_total > settings.export_bulk_pdf_max_bullets:
+        raise HTTPException(
+            status_code=413,
+            detail=(
+                f"Combined PDF is limited to {settings.export_bulk_pdf_max_bullets} bullets "
+                f"({bullet_total} requested); use format=zip"
+            ),
+        )
+
+    bulk_progress.set(progress.id, progress)
+    return StreamingResponse(
+        _bulk_pdf(named_results, progress),
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": f"attachment; filename=career_analyses_{date}.pdf",
+            "X-Export-Id": progress.id,
+        },
+    )
+
+
+@router.get("/bulk/{export_id}", response_model=BulkExportProgress)
+async def bulk_export_progress(export_id: str):
+    """Progress of a bulk export started in the last hour."""
+    progress = bulk_progress.get(export_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Export not found")
+    return progress
+
+
+async def _bulk_zip(
+    items: List[BulkExportItem], names: List[str], progress: BulkExportProgress
+) -> AsyncIterator[bytes]:
+    """
+    Render results in parallel on the export pool and stream each PDF into
+    the ZIP as soon as it is ready, in completion order.
+    """
+    archive = ZipStream()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.export_bulk_timeout_seconds
+    # Bounds pool usage and rendered-but-unsent files; a slot is released
+    # once its PDF has been written to the ZIP
+    window = asyncio.Semaphore(export_pool.max_workers)
+
+    async def render(index: int) -> Tuple[int, Optional[str], Optional[str]]:
+        await window.acquire()
+        too_large = _too_large(items[index].result)
+        if too_large:
+            window.release()
+            return index, None, too_large
+        try:
+            path = await _run_export_job(
+                render_pdf_file,
+                items[index].result,
+                str(EXPORT_DIR),
+                deadline=min(deadline, loop.time() + settings.export_timeout_seconds),
+                discard=_discard_file,
+            )
+        except JobTimeoutError:
+            window.release()
+            return index, None, "Export timed out"
+        except Exception as e:
+            window.release()
+            return index, None, f"Export failed: {str(e)}"
+        return index, path, None
+
+    tasks = [asyncio.ensure_future(render(i)) for i in range(len(items))]
+
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            index, path, error = await next_done
+            if error is not None:
+                progress.failed[names[index]] = error
+                continue
+            try:
+                chunk = await asyncio.to_thread(archive.add_file, path, names[index])
+            finally:
+                cleanup_file(Path(path))
+                window.release()
+            progress.completed += 1
+            yield chunk
+
+        manifest = [
+            {
+                "name": item.name,
+                "file": name if name not in progress.failed else None,
+                "status": "failed" if name in progress.failed else "ok",
+                "error": progress.failed.get(name),
+            }
+            for item, name in zip(items, names)
+        ]
+        summary = {
+            "total": progress.total,
+            "succeeded": progress.completed,
+            "failed": len(progress.failed),
+            "items": manifest,
+        }
+        yield archive.add_bytes(json.dumps(summary, indent=2).encode("utf-8"), "manifest.json")
+        yield archive.close()
+        progress.status = "done"
+    finally:
+        if progress.status != "done":
+            # Client disconnected or rendering failed unexpectedly
+            progress.status = "cancelled"
+            for task in tasks:
+                task.cancel()
+            for result in await asyncio.gather(*tasks, return_exceptions=True):
+                if isinstance(result, tuple) and result[1] is not None:
+                    cleanup_file(Path(result[1]))
+
+
+async def _bulk_pdf(
+    named_results: List[Tuple[str, AnalysisResult]], progress: BulkExportProgress
+) -> AsyncIterator[bytes]:
+    """
+    Render the combined PDF as one pool job, counting reports off as the
+    job lays them out, then stream the file from disk. A render that fails
+    or times out aborts the response and marks the export cancelled.
+    """
+    loop = asyncio.get_running_loop()
+    sink = export_pool.queue()
+    job = asyncio.ensure_future(
+        _run_export_job(
+            render_combined_pdf_file,
+            named_results,
+            str(EXPORT_DIR),
+            sink,
+            deadline=loop.time() + settings.export_bulk_timeout_seconds,
+            discard=_discard_combined,
+        )
+    )
+    path = None
+    try:
+        while True:
+            try:
+                report = await asyncio.to_thread(sink.get, timeout=PROGRESS_POLL_SECONDS)
+            except queue.Empty:
+                # A job that never started (or whose worker died) puts no
+                # final None
+                if job.done():
+                    break
+                continue
+            if report is None:
+                break
+            name, error = report
+            if error is None:
+                progress.completed += 1
+            else:
+                progress.failed[name] = error
+
+        path, errors = await job
+        progress.failed.update(errors)
+        progress.completed = progress.total - len(progress.failed)
+        with open(path, "rb") as f:
+            while True:
+                chunk = await asyncio.to_thread(f.read, EXPORT_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        progress.status = "done"
+    finally:
+        if progress.status != "done":
+            # Client disconnected or rendering failed
+            progress.status = "cancelled"
+            job.cancel()
+            if path is None and job.done() and not job.cancelled() and job.exception() is None:
+                # Finished just as the response went away
+                path = job.result()[0]
+        if path is not None:
+            cleanup_file(Path(path))
+
+
+async def _run_export_job(fn, *args, deadline: float, discard: Callable[[Any], None]):
+    """
+    Run a render job on the shared pool, waiting for a free slot until
+    ``deadline`` (loop time). The job also gets the deadline as a
+    time.time() value, so a render that ends too late deletes its own
+    file; one finishing after its request was cancelled goes to
+    ``discard``.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            raise JobTimeoutError("Export deadline exceeded")
+        try:
+            return await export_pool.run(
+                fn, *args, time.time() + remaining, timeout=remaining, discard=discard
+            )
+        except PoolSaturatedError:
+            # Shared with interactive exports; back off instead of failing
+            await asyncio.sleep(min(0.05, remaining))
+
+
+def _discard_file(path: str) -> None:
+    cleanup_file(Path(path))
+
+
+def _discard_combined(result: Tuple[str, Dict[str, str]]) -> None:
+    cleanup_file(Path(result[0]))
+
+
+def _sweep_exports() -> None:
+    """Delete abandoned render files, at most once per sweep interval."""
+    global _last_sweep
+    now = time.monotonic()
+    if now - _last_sweep < EXPORT_SWEEP_INTERVAL_SECONDS:
+        return
+    _last_sweep = now
+    sweep_old_files(EXPORT_DIR, settings.export_file_ttl_seconds)
+
+
+def _bullet_count(result: AnalysisResult) -> int:
+    return sum(len(bin.bullets) for bin in result.bins)
+
+
+def _too_large(result: AnalysisResult) -> Optional[str]:
+    bullet_count = _bullet_count(result)
+    if bullet_count > settings.export_max_bullets:
+        return f"Too many bullets to export ({bullet_count} > {settings.export_max_bullets})"
+    return None
+
+
+def _safe_stem(item: BulkExportItem, index: int) -> str:
+    stem = SAFE_NAME_RE.sub("_", item.name or "").strip()
+    return stem or f"career_analysis_{index + 1:03d}"
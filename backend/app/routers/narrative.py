@@ -1,18 +1,94 @@
+import json
 import logging
-from fastapi import APIRouter, HTTPException
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 from app.models.analysis import AnalysisResult
+from app.models.job import Job, JobPriority
+from app.services.jobs import (
+    CallbackURLError,
+    InMemoryJobStore,
+    JobQueue,
+    QueueFullError,
+    SQLiteJobStore,
+    check_callback_url,
+)
 from app.services.narrative import NarrativeResponse, narrative_service
+from app.services.resilience import (
+    CircuitOpenError,
+    UpstreamAuthError,
+    UpstreamError,
+    UpstreamRateLimitError,
+    UpstreamTimeoutError,
+)
 from app.config.settings import settings
+from app.middleware.rate_limit import rate_limit_headers
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
+async def _run_narrative_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    analysis = AnalysisResult.model_validate(payload)
+    result = await narrative_service.generate_narrative_async(analysis)
+    return result.model_dump()
+
+
+def _is_retryable(error: Exception) -> bool:
+    """
+    Retry only when the circuit was open. Timeouts, throttling and outages
+    were already retried by the resilience layer, so retrying the job too
+    would multiply the upstream calls (3 job attempts x 3 calls each).
+    """
+    return isinstance(error, CircuitOpenError)
+
+
+narrative_jobs = JobQueue(
+    handler=_run_narrative_job,
+    store=(
+        SQLiteJobStore(settings.narrative_job_store_path)
+        if settings.narrative_job_store_path
+        else InMemoryJobStore()
+    ),
+    workers=settings.narrative_job_workers,
+    max_queue=settings.narrative_job_max_queue,
+    max_attempts=settings.narrative_job_max_attempts,
+    retry_backoff_seconds=settings.narrative_job_retry_backoff_seconds,
+    ttl_seconds=settings.narrative_job_ttl_seconds,
+    callback_timeout_seconds=settings.narrative_job_callback_timeout_seconds,
+    callback_allowed_hosts=settings.narrative_job_callback_allowed_hosts,
+    is_retryable=_is_retryable,
+)
+
+
+async def enforce_ai_rate_limit(request: Request) -> None:
+    """Charge the deferred AI rate-limit policy set up by the middleware."""
+    charge = getattr(request.state, "charge_rate_limit", None)
+    if charge is None:
+        return
+    decision = await charge()
+    if not decision.allowed:
+        raise HTTPException(
+            status_code=429,
+            detail="Rate limit exceeded. Please try again later.",
+            headers=rate_limit_headers(decision),
+        )
+
+
 @router.post("/narrative", response_model=NarrativeResponse)
-async def generate_narrative(analysis: AnalysisResult):
+async def generate_narrative(
+    analysis: AnalysisResult, request: Request, response: Response
+):
     """Generate AI-powered narrative analysis using Dartmouth Chat AI."""
 
+    # Identical requests are served from cache without using AI quota
+    cached = await narrative_service.get_cached_async(analysis)
+    if cached is not None:
+        response.headers["X-Cache"] = "HIT"
+        return cached
+
     if not settings.dartmouth_ai_api_key:
         logger.error("Dartmouth AI API key not configured")
         raise HTTPException(
@@ -20,32 +96,165 @@ async def generate_narrative(analysis: AnalysisResult):
             detail="Narrative analysis is not available. Configure DARTMOUTH_AI_API_KEY."
         )
 
+    await enforce_ai_rate_limit(request)
+    response.headers["X-Cache"] = "MISS"
+
     try:
-        result = narrative_service.generate_narrative(analysis)
+        result = await narrative_service.generate_narrative_async(analysis)
         return result
-    except ValueError as e:
-        logger.error(f"Configuration error: {e}")
+    except Exception as e:
+        raise _http_error(e)
+
+
+@router.post("/narrative/stream")
+async def stream_narrative(analysis: AnalysisResult, request: Request):
+    """
+    Stream narrative analysis as Server-Sent Events. Emits "paragraph",
+    "bullet" and "experienceSuggestion" events as soon as each item is
+    complete, then a final "narrative" event with the full response.
+    """
+    cached = await narrative_service.get_cached_async(analysis)
+    if cached is not None:
+        events = _iterate(narrative_service.replay_events(cached))
+        return StreamingResponse(
+            _sse(events), media_type="text/event-stream", headers={"X-Cache": "HIT"}
+        )
+
+    if not settings.dartmouth_ai_api_key:
+        logger.error("Dartmouth AI API key not configured")
         raise HTTPException(
             status_code=503,
-            detail=str(e)
+            detail="Narrative analysis is not available. Configure DARTMOUTH_AI_API_KEY."
         )
-    except Exception as e:
-        error_str = str(e).lower()
-        logger.error(f"Error generating narrative: {e}", exc_info=True)
 
-        if "authentication" in error_str or "api_key" in error_str or "invalid" in error_str:
-            raise HTTPException(
-                status_code=401,
-                detail="Dartmouth AI authentication failed. Please check your API key."
-            )
+    await enforce_ai_rate_limit(request)
+    return StreamingResponse(
+        _sse(narrative_service.stream_narrative(analysis)),
+        media_type="text/event-stream",
+        headers={"X-Cache": "MISS"},
+    )
+
+
+@router.post("/narrative/jobs", response_model=Job, status_code=202)
+async def create_narrative_job(
+    analysis: AnalysisResult,
+    request: Request,
+    response: Response,
+    priority: JobPriority = "normal",
+    callback_url: Optional[str] = None,
+):
+    """
+    Queue narrative generation and return the job immediately. Poll
+    GET /narrative/jobs/{id}, or pass callback_url to have the finished
+    job POSTed back.
+    """
+    if callback_url:
+        try:
+            await check_callback_url(callback_url, settings.narrative_job_callback_allowed_hosts)
+        except CallbackURLError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    payload = analysis.model_dump(mode="json")
+
+    cached = await narrative_service.get_cached_async(analysis)
+    if cached is not None:
+        response.headers["X-Cache"] = "HIT"
+        job = await narrative_jobs.record(payload, cached.model_dump(), callback_url=callback_url)
+        response.headers["Location"] = f"{request.url.path}/{job.id}"
+        return job
+
+    if not settings.dartmouth_ai_api_key:
+        logger.error("Dartmouth AI API key not configured")
+        raise HTTPException(
+            status_code=503,
+            detail="Narrative analysis is not available. Configure DARTMOUTH_AI_API_KEY."
+        )
 
-        if "rate" in error_str or "quota" in error_str or "429" in error_str:
-            raise HTTPException(
-                status_code=429,
-                detail="Rate limit exceeded. Please try again in a moment."
-            )
+    await enforce_ai_rate_limit(request)
+    response.headers["X-Cache"] = "MISS"
 
+    try:
+        job = await narrative_jobs.submit(payload, priority=priority, callback_url=callback_url)
+    except QueueFullError as e:
+        logger.warning(str(e))
         raise HTTPException(
-            status_code=500,
-            detail=f"Failed to generate narrative: {str(e)}"
+            status_code=503,
+            detail="Too many narrative jobs queued. Please try again shortly.",
+            headers={"Retry-After": "10"},
         )
+
+    response.headers["Location"] = f"{request.url.path}/{job.id}"
+    return job
+
+
+@router.get("/narrative/jobs/{job_id}", response_model=Job)
+async def get_narrative_job(job_id: str):
+    """Status of a queued narrative job, with its result once finished."""
+    job = await narrative_jobs.get_async(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/narrative/cache-stats")
+async def narrative_cache_stats() -> Dict[str, int]:
+    """Hit/miss counters for the narrative response cache."""
+    if narrative_service.cache is None:
+        return {}
+    return narrative_service.cache.stats()
+
+
+def _http_error(error: Exception) -> HTTPException:
+    """Map a narrative generation failure to the response the client sees."""
+    if isinstance(error, ValueError):
+        logger.error(f"Configuration error: {error}")
+        return HTTPException(status_code=503, detail=str(error))
+
+    logger.error(f"Error generating narrative: {error}", exc_info=True)
+    headers = None
+    if isinstance(error, UpstreamError) and error.retry_after is not None:
+        headers = {"Retry-After": str(max(1, round(error.retry_after)))}
+
+    if isinstance(error, UpstreamAuthError):
+        return HTTPException(
+            status_code=401,
+            detail="Dartmouth AI authentication failed. Please check your API key."
+        )
+    if isinstance(error, UpstreamRateLimitError):
+        return HTTPException(
+            status_code=429,
+            detail="Rate limit exceeded. Please try again in a moment.",
+            headers=headers,
+        )
+    if isinstance(error, CircuitOpenError):
+        return HTTPException(
+            status_code=503,
+            detail="Narrative analysis is temporarily unavailable. Please try again shortly.",
+            headers=headers,
+        )
+    if isinstance(error, UpstreamTimeoutError):
+        return HTTPException(status_code=504, detail="Dartmouth AI did not respond in time.")
+    if isinstance(error, UpstreamError):
+        return HTTPException(status_code=502, detail=f"Dartmouth AI request failed: {error}")
+
+    return HTTPException(
+        status_code=500,
+        detail=f"Failed to generate narrative: {str(error)}"
+    )
+
+
+async def _sse(events: AsyncIterator[Tuple[str, Any]]) -> AsyncIterator[str]:
+    try:
+        async for event, data in events:
+            if isinstance(data, BaseModel):
+                data = data.model_dump()
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    except Exception as e:
+        error = _http_error(e)
+        payload = json.dumps({"status": error.status_code, "detail": error.detail})
+        yield f"event: error\ndata: {payload}\n\n"
+
+
+async def _iterate(items) -> AsyncIterator[Any]:
+    for item in items:
+        yield item
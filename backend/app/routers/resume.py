@@ -1,49 +1,358 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from typing import List
-import shutil
+import asyncio
+import json
 import os
-from pathlib import Path
+import queue
+import time
+from concurrent.futures import Future
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+from app.config.settings import settings
+from app.models.batch import BatchParseResult
 from app.models.bullet_point import BulletPoint
-from app.services.parser import ResumeParser
+from app.services.parse_cache import ParseCache
+from app.services.parser import (
+    BatchEntry,
+    parse_batch,
+    parse_resume_file,
+    stream_resume_file,
+)
+from app.services.worker_pool import JobTimeoutError, PoolSaturatedError, WorkerPool
+from app.utils.file_handler import (
+    BufferedUpload,
+    UploadTooLargeError,
+    ensure_upload_dir,
+    get_file_extension,
+    read_upload,
+)
+from app.utils.metrics import run_captured, span
+from app.utils.zip_stream import iter_zip_members
 
 router = APIRouter()
-parser = ResumeParser()
+parse_pool = WorkerPool(
+    max_workers=settings.parse_pool_workers,
+    max_queue=settings.parse_pool_max_queue,
+    timeout_seconds=settings.parse_timeout_seconds,
+)
+parse_cache = ParseCache(
+    max_entries=settings.parse_cache_max_entries,
+    ttl_seconds=settings.parse_cache_ttl_seconds,
+    disk_dir=settings.parse_cache_dir or None,
+    disk_max_bytes=settings.parse_cache_disk_max_bytes,
+)
 
-UPLOAD_DIR = Path("/tmp/uploads")
-UPLOAD_DIR.mkdir(exist_ok=True)
+# How often a streaming parse wakes up to check on its job while no bullet
+# arrives; also bounds how long a disconnected client holds a thread
+STREAM_POLL_SECONDS = 0.5
 
+# Only used for uploads larger than settings.upload_spill_threshold
+UPLOAD_DIR = ensure_upload_dir("/tmp/uploads")
 
-@router.post("/parse-resume", response_model=List[BulletPoint])
-async def parse_resume(file: UploadFile = File(...)):
-    """
-    Upload and parse a resume file (PDF or DOCX).
-    Returns extracted bullet points with formatting.
-    """
+# "legacy" expands formatting spans to per-character lists for old clients
+FORMATTING_QUERY = Query("spans", pattern="^(spans|legacy)$")
+
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+
+async def _read_resume_upload(file: UploadFile) -> Tuple[BufferedUpload, str]:
+    """Validate the file type and buffer the upload."""
     # Validate file type
-    if not file.filename or not file.filename.endswith((".pdf", ".docx")):
+    file_type = get_file_extension(file.filename or "")
+    if file_type not in ("pdf", "docx"):
         raise HTTPException(
             status_code=400, detail="Only PDF and DOCX files are supported"
         )
 
-    # Save uploaded file
-    file_path = UPLOAD_DIR / file.filename
+    # Read upload into memory (large files spill to a unique temp file)
     try:
-        with file_path.open("wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        with span("upload_read"):
+            upload = await read_upload(
+                file,
+                spill_dir=UPLOAD_DIR,
+                spill_threshold=settings.upload_spill_threshold,
+                max_size=settings.max_upload_size,
+            )
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"File upload failed: {str(e)}")
 
-    # Parse file based on extension
+    return upload, file_type
+
+
+@router.post("/parse-resume", response_model=List[BulletPoint])
+async def parse_resume(
+    file: UploadFile = File(...), formatting: str = FORMATTING_QUERY
+):
+    """
+    Upload and parse a resume file (PDF or DOCX).
+    Returns extracted bullet points with formatting.
+    """
+    upload, file_type = await _read_resume_upload(file)
+
+    # Repeat uploads of the same file skip parsing entirely
+    cache_key = ParseCache.make_key(upload.sha256, file_type)
+    cached = await parse_cache.get_async(cache_key)
+    if cached is not None:
+        upload.cleanup()
+        return _bullets_response(cached, formatting)
+
+    # Parse file in the worker pool so the event loop stays responsive
     try:
-        if file.filename.endswith(".pdf"):
-            bullets = parser.parse_pdf(str(file_path))
-        else:  # .docx
-            bullets = parser.parse_docx(str(file_path))
+        bullets = await parse_pool.run(parse_resume_file, upload.source, file_type)
+    except PoolSaturatedError:
+        raise HTTPException(
+            status_code=503,
+            detail="Resume parser is busy. Please try again in a moment.",
+            headers={"Retry-After": "5"},
+        )
+    except JobTimeoutError:
+        raise HTTPException(status_code=504, detail="Parsing timed out")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Parsing failed: {str(e)}")
     finally:
-        # Clean up uploaded file
-        if file_path.exists():
-            os.remove(file_path)
+        # Clean up spilled file, if any
+        upload.cleanup()
+
+    await parse_cache.set_async(cache_key, bullets)
+    return _bullets_response(bullets, formatting)
+
+
+@router.post("/parse-resume/stream")
+async def parse_resume_stream(
+    file: UploadFile = File(...),
+    stream_format: str = Query("ndjson", alias="format", pattern="^(ndjson|sse)$"),
+    formatting: str = FORMATTING_QUERY,
+):
+    """
+    Upload and parse a resume, streaming each bullet as soon as it is
+    extracted. Emits "bullet" events followed by one "summary" event
+    (or an "error" event if parsing fails part way).
+    """
+    upload, file_type = await _read_resume_upload(file)
+
+    cache_key = ParseCache.make_key(upload.sha256, file_type)
+    cached = await parse_cache.get_async(cache_key)
+
+    # Parsed in the worker pool, which puts bullets on a queue as it goes;
+    # submitted here so a saturated pool fails before the response starts
+    job: Optional[Future] = None
+    timeout = settings.parse_timeout_seconds
+    if cached is None:
+        sink = parse_pool.queue()
+        try:
+            job = parse_pool.submit(
+                run_captured,
+                stream_resume_file,
+                upload.source,
+                file_type,
+                sink,
+                time.time() + timeout,
+            )
+        except PoolSaturatedError:
+            upload.cleanup()
+            raise HTTPException(
+                status_code=503,
+                detail="Resume parser is busy. Please try again in a moment.",
+                headers={"Retry-After": "5"},
+            )
 
+    released = False
+
+    def release() -> None:
+        # Called from the response however it ends, including when the
+        # body never starts, so the job and spilled file cannot leak
+        nonlocal released
+        if released:
+            return
+        released = True
+        if job is not None:
+            job.cancel()
+        upload.cleanup()
+
+    async def events() -> AsyncIterator[str]:
+        start = time.perf_counter()
+        first_bullet_ms = None
+        bullets: List[BulletPoint] = []
+
+        try:
+            if job is None:
+                source = _iterate_list(cached)
+            else:
+                source = _iterate_job(job, sink, timeout)
+
+            async for bullet in source:
+                if first_bullet_ms is None:
+                    first_bullet_ms = _elapsed_ms(start)
+                bullets.append(bullet)
+                yield _format_event(
+                    "bullet", _dump_bullet(bullet, formatting), stream_format
+                )
+        except TimeoutError:
+            yield _format_event(
+                "error", {"detail": "Parsing timed out"}, stream_format
+            )
+            return
+        except Exception as e:
+            yield _format_event(
+                "error", {"detail": f"Parsing failed: {str(e)}"}, stream_format
+            )
+            return
+        finally:
+            release()
+
+        if cached is None:
+            await parse_cache.set_async(cache_key, bullets)
+
+        summary = {
+            "count": len(bullets),
+            "elapsed_ms": _elapsed_ms(start),
+            "first_bullet_ms": first_bullet_ms,
+            "cached": cached is not None,
+        }
+        yield _format_event("summary", summary, stream_format)
+
+    try:
+        return _ReleasingStreamingResponse(
+            events(), release, media_type=STREAM_MEDIA_TYPES[stream_format]
+        )
+    except BaseException:
+        release()
+        raise
+
+
+@router.post("/parse-resume/batch", response_model=BatchParseResult)
+async def parse_resume_batch(
+    files: List[UploadFile] = File(...), formatting: str = FORMATTING_QUERY
+):
+    """
+    Upload and parse many resumes at once. Accepts any mix of PDF, DOCX and
+    ZIP files (ZIP members are expanded). Returns bullets and errors keyed
+    by filename.
+    """
+    result = await parse_batch(
+        _iter_batch_entries(files),
+        parse_pool,
+        deadline_seconds=settings.parse_batch_deadline_seconds,
+        timeout_seconds=settings.parse_timeout_seconds,
+        max_files=settings.parse_batch_max_files,
+        cache=parse_cache,
+    )
+
+    if formatting == "legacy":
+        return JSONResponse(
+            {
+                "results": {
+                    name: [b.to_legacy() for b in bullets]
+                    for name, bullets in result.results.items()
+                },
+                "errors": result.errors,
+            }
+        )
+    return result
+
+
+@router.get("/parse-resume/cache-stats")
+async def parse_cache_stats() -> Dict[str, int]:
+    """Hit/miss counters for the parse result cache."""
+    return parse_cache.stats()
+
+
+def _iter_batch_entries(files: List[UploadFile]) -> Iterator[BatchEntry]:
+    """(name, read, error) for each uploaded file and ZIP member; runs on a thread."""
+    for upload in files:
+        filename = upload.filename or "unnamed"
+
+        if get_file_extension(filename) == "zip":
+            try:
+                yield from iter_zip_members(upload.file, settings.max_upload_size)
+            except Exception as e:
+                yield filename, None, f"Invalid ZIP archive: {str(e)}"
+            continue
+
+        size = upload.file.seek(0, os.SEEK_END)
+        upload.file.seek(0)
+        if size > settings.max_upload_size:
+            yield filename, None, (
+                f"File exceeds maximum upload size of {settings.max_upload_size} bytes"
+            )
+            continue
+        yield filename, upload.file.read, None
+
+
+class _ReleasingStreamingResponse(StreamingResponse):
+    """StreamingResponse that calls ``release`` however sending it ends."""
+
+    def __init__(self, content, release: Callable[[], None], **kwargs) -> None:
+        super().__init__(content, **kwargs)
+        self._release = release
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._release()
+
+
+def _bullets_response(bullets: List[BulletPoint], formatting: str):
+    if formatting == "legacy":
+        return JSONResponse([b.to_legacy() for b in bullets])
     return bullets
+
+
+def _dump_bullet(bullet: BulletPoint, formatting: str) -> dict:
+    if formatting == "legacy":
+        return bullet.to_legacy()
+    return bullet.model_dump()
+
+
+async def _iterate_list(items: List[BulletPoint]) -> AsyncIterator[BulletPoint]:
+    for item in items:
+        yield item
+
+
+async def _iterate_job(
+    job: Future, sink: "queue.Queue", timeout: float
+) -> AsyncIterator[BulletPoint]:
+    """
+    Bullets a stream_resume_file job puts on ``sink``, then its outcome.
+    Raises JobTimeoutError once ``timeout`` passes, whether or not bullets
+    are still arriving.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    outcome = asyncio.ensure_future(parse_pool.wait(job, timeout))
+    try:
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise JobTimeoutError("Parsing timed out")
+            try:
+                bullet = await asyncio.to_thread(
+                    sink.get, timeout=min(remaining, STREAM_POLL_SECONDS)
+                )
+            except queue.Empty:
+                if outcome.done():
+                    # A job that returned has already put its final None;
+                    # one that failed (e.g. the worker died) may not have
+                    outcome.result()
+                continue
+            if bullet is None:
+                break
+            yield bullet
+        await outcome
+    finally:
+        outcome.cancel()
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+def _format_event(event_type: str, data: dict, stream_format: str) -> str:
+    if stream_format == "sse":
+        return f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
+    return json.dumps({"type": event_type, "data": data}) + "\n"
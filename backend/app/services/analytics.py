@@ -1,6 +1,6 @@
-from typing import List
+from typing import Dict, List, Optional
 from app.models.bin import Bin
-from app.models.analysis import Analytics, Distribution
+from app.models.analysis import Analytics, AnalyticsEvent, Distribution
 
 
 class AnalyticsService:
@@ -21,9 +21,12 @@ class AnalyticsService:
         distribution = []
         for bin in bins:
             count = len(bin.bullets)
-            percentage = round((count / total_bullets) * 100, 1)
             distribution.append(
-                Distribution(bin_id=bin.id, count=count, percentage=percentage)
+                Distribution(
+                    bin_id=bin.id,
+                    count=count,
+                    percentage=self._percentage(count, total_bullets),
+                )
             )
 
         # Find top category
@@ -41,10 +44,14 @@ class AnalyticsService:
         self, distribution: List[Distribution], bins: List[Bin]
     ) -> List[str]:
         """Generate personalized suggestions based on distribution."""
-        suggestions = []
-
         # Create a map of bin_id to label
         bin_map = {bin.id: bin.label for bin in bins}
+        return self._suggestions_for(distribution, bin_map, len(bins))
+
+    def _suggestions_for(
+        self, distribution: List[Distribution], bin_map: Dict[str, str], bin_count: int
+    ) -> List[str]:
+        suggestions = []
 
         for dist in distribution:
             label = bin_map[dist.bin_id]
@@ -63,7 +70,142 @@ class AnalyticsService:
                 )
 
         # Add general insights
-        if len([d for d in distribution if d.count > 0]) == len(bins):
+        if len([d for d in distribution if d.count > 0]) == bin_count:
             suggestions.append("Well-balanced profile across all categories!")
 
         return suggestions[:5]  # Limit to top 5 suggestions
+
+    @staticmethod
+    def _percentage(count: int, total: int) -> float:
+        return round((count / total) * 100, 1)
+
+
+class IncrementalAnalytics:
+    """
+    Analytics for one student's session, updated from move/add/remove
+    events instead of rescanning every bin.
+
+    Each event is O(1): it adjusts per-bin counts and the total. Building
+    the Analytics result touches each bin once (there are only a handful),
+    and is cached until the next event. The result is always identical to
+    AnalyticsService.calculate_analytics on the equivalent bins.
+    """
+
+    def __init__(self, bins: List[Bin], service: Optional[AnalyticsService] = None) -> None:
+        self._service = service or AnalyticsService()
+        self._bin_ids = [bin.id for bin in bins]
+        self._bin_labels = [bin.label for bin in bins]
+        self._labels = {bin.id: bin.label for bin in bins}
+        self._index = {bin_id: i for i, bin_id in reversed(list(enumerate(self._bin_ids)))}
+        self._counts = [len(bin.bullets) for bin in bins]
+        self._bullet_bins: Dict[str, int] = {}
+        for i, bin in enumerate(bins):
+            for bullet in bin.bullets:
+                self._bullet_bins[bullet.id] = i
+        self._total = sum(self._counts)
+        self._cached: Optional[Analytics] = None
+
+    @property
+    def total(self) -> int:
+        return self._total
+
+    def apply(self, event: AnalyticsEvent) -> None:
+        """Apply one event; raises ValueError for unknown bullets or bins."""
+        if event.type == "add":
+            self.add(event.bullet_id, self._require_bin(event))
+        elif event.type == "remove":
+            self.remove(event.bullet_id)
+        else:
+            self.move(event.bullet_id, self._require_bin(event))
+
+    def apply_all(self, events: List[AnalyticsEvent]) -> None:
+        """Apply events in order; if any is invalid, none of them are kept."""
+        undo = []
+        try:
+            for event in events:
+                previous = self._bullet_bins.get(event.bullet_id)
+                self.apply(event)
+                undo.append((event, previous))
+        except ValueError:
+            for event, previous in reversed(undo):
+                if event.type == "add":
+                    self.remove(event.bullet_id)
+                elif event.type == "remove":
+                    self.add(event.bullet_id, self._bin_ids[previous])
+                else:
+                    self.move(event.bullet_id, self._bin_ids[previous])
+            raise
+
+    def add(self, bullet_id: str, bin_id: str) -> None:
+        if bullet_id in self._bullet_bins:
+            raise ValueError(f"Bullet '{bullet_id}' is already categorized")
+        index = self._bin_index(bin_id)
+        self._bullet_bins[bullet_id] = index
+        self._counts[index] += 1
+        self._total += 1
+        self._cached = None
+
+    def remove(self, bullet_id: str) -> None:
+        index = self._bullet_index(bullet_id)
+        del self._bullet_bins[bullet_id]
+        self._counts[index] -= 1
+        self._total -= 1
+        self._cached = None
+
+    def move(self, bullet_id: str, bin_id: str) -> None:
+        source = self._bullet_index(bullet_id)
+        target = self._bin_index(bin_id)
+        if source == target:
+            return
+        self._bullet_bins[bullet_id] = target
+        self._counts[source] -= 1
+        self._counts[target] += 1
+        self._cached = None
+
+    def analytics(self) -> Analytics:
+        if self._cached is None:
+            self._cached = self._build()
+        return self._cached.model_copy(deep=True)
+
+    def _build(self) -> Analytics:
+        if self._total == 0:
+            return Analytics(
+                distribution=[],
+                top_category="None",
+                suggestions=["Start categorizing your bullets to see insights!"],
+            )
+
+        distribution = [
+            Distribution(
+                bin_id=bin_id,
+                count=count,
+                percentage=self._service._percentage(count, self._total),
+            )
+            for bin_id, count in zip(self._bin_ids, self._counts)
+        ]
+        # First bin with the highest count, matching max() over the bins
+        top = max(range(len(self._counts)), key=self._counts.__getitem__)
+        return Analytics(
+            distribution=distribution,
+            top_category=self._bin_labels[top],
+            suggestions=self._service._suggestions_for(
+                distribution, self._labels, len(self._bin_ids)
+            ),
+        )
+
+    def _require_bin(self, event: AnalyticsEvent) -> str:
+        if event.bin_id is None:
+            raise ValueError(f"'{event.type}' events need a bin_id")
+        return event.bin_id
+
+    def _bin_index(self, bin_id: str) -> int:
+        try:
+            return self._index[bin_id]
+        except KeyError:
+            raise ValueError(f"Unknown bin '{bin_id}'")
+
+    def _bullet_index(self, bullet_id: str) -> int:
+        try:
+            return self._bullet_bins[bullet_id]
+        except KeyError:
+            raise ValueError(f"Unknown bullet '{bullet_id}'")
@@ -0,0 +1,177 @@
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from app.models.analysis import AnalysisResult
+from app.models.cohort import CohortBinStats, CohortReport
+
+PERCENTILES = (10, 25, 50, 75, 90)
+# AnalyticsService keeps only the first five suggestions of each analysis
+MAX_SUGGESTIONS = 5
+HISTOGRAM_EDGES = np.linspace(0, 100, 11)
+
+
+@dataclass
+class CohortFrame:
+    """
+    Columnar view of many analyses: one row per analysis, one column per
+    (bin id, label) pair in order of first appearance, so a renamed bin is
+    a separate category.
+
+    ``counts`` holds bullets per bin, ``present`` marks which bins each
+    analysis actually has, and ``position`` is each bin's index within its
+    own analysis (-1 where absent), used to break top-category ties the
+    way AnalyticsService does.
+    """
+
+    bin_ids: List[str]
+    labels: List[str]
+    counts: np.ndarray  # (analyses, bins) int64
+    present: np.ndarray  # (analyses, bins) bool
+    position: np.ndarray  # (analyses, bins) int64
+
+    @classmethod
+    def from_results(cls, results: Sequence[AnalysisResult]) -> "CohortFrame":
+        columns: Dict[Tuple[str, str], int] = {}
+        rows, cols, values, positions = [], [], [], []
+
+        # One pass over the objects; everything after this is vectorized
+        for row, result in enumerate(results):
+            for index, bin in enumerate(result.bins):
+                col = columns.setdefault((bin.id, bin.label), len(columns))
+                rows.append(row)
+                cols.append(col)
+                values.append(len(bin.bullets))
+                positions.append(index)
+
+        shape = (len(results), len(columns))
+        counts = np.zeros(shape, dtype=np.int64)
+        present = np.zeros(shape, dtype=bool)
+        position = np.full(shape, -1, dtype=np.int64)
+        counts[rows, cols] = values
+        present[rows, cols] = True
+        position[rows, cols] = positions
+        return cls(
+            [bin_id for bin_id, _ in columns],
+            [label for _, label in columns],
+            counts,
+            present,
+            position,
+        )
+
+
+class CohortAnalyticsService:
+    """Term-wide aggregates over many analyses, computed with NumPy."""
+
+    def summarize(self, frame: CohortFrame) -> CohortReport:
+        counts, present = frame.counts, frame.present
+        totals = counts.sum(axis=1)
+        categorized = totals > 0
+
+        # Same arithmetic and rounding as AnalyticsService, row by row
+        with np.errstate(divide="ignore", invalid="ignore"):
+            percentages = _round1(counts / totals[:, None] * 100)
+
+        # Per-bin suggestion rules, only evaluated for analyses with bullets
+        # and only counted where the suggestion survives the truncation
+        active = present & categorized[:, None]
+        rules = {
+            "underrepresented": active & (percentages < 15) & (counts > 0),
+            "dominant": active & (percentages > 40),
+            "empty": active & (counts == 0),
+        }
+        shown = _first_per_row(
+            rules["underrepresented"] | rules["dominant"] | rules["empty"],
+            np.where(present, frame.position, counts.shape[1]),
+            MAX_SUGGESTIONS,
+        )
+        triggers = {name: (fired & shown).sum(axis=0) for name, fired in rules.items()}
+
+        bins = [
+            self._bin_stats(
+                frame,
+                col,
+                counts[:, col],
+                percentages[:, col],
+                active[:, col],
+                {name: int(fired[col]) for name, fired in triggers.items()},
+            )
+            for col in range(len(frame.bin_ids))
+        ]
+
+        # First bin with the highest count wins, as with max() over bins:
+        # rank by count, then by earlier position within the analysis
+        width = counts.shape[1] + 1
+        rank = np.where(present, counts * width + (width - frame.position), -1)
+        top = rank.argmax(axis=1)[categorized] if width > 1 else np.zeros(0, dtype=np.int64)
+        top_frequency = np.bincount(top, minlength=len(frame.bin_ids))
+        top_categories: Dict[str, int] = {}
+        for label, count in zip(frame.labels, top_frequency):
+            if count:
+                top_categories[label] = top_categories.get(label, 0) + int(count)
+
+        balanced = categorized & ((counts > 0) | ~present).all(axis=1)
+
+        return CohortReport(
+            total_results=len(totals),
+            uncategorized_results=int((~categorized).sum()),
+            bins=bins,
+            top_categories=top_categories,
+            balanced_profiles=int(balanced.sum()),
+        )
+
+    def _bin_stats(
+        self,
+        frame: CohortFrame,
+        col: int,
+        counts: np.ndarray,
+        percentages: np.ndarray,
+        active: np.ndarray,
+        triggers: Dict[str, int],
+    ) -> CohortBinStats:
+        values = percentages[active]
+        if values.size:
+            percentiles = np.percentile(values, PERCENTILES)
+            histogram = np.histogram(values, bins=HISTOGRAM_EDGES)[0]
+            mean_count = float(counts[active].mean())
+            mean_percentage = float(values.mean())
+        else:
+            percentiles = np.zeros(len(PERCENTILES))
+            histogram = np.zeros(len(HISTOGRAM_EDGES) - 1, dtype=np.int64)
+            mean_count = mean_percentage = 0.0
+
+        return CohortBinStats(
+            bin_id=frame.bin_ids[col],
+            label=frame.labels[col],
+            results=int(active.sum()),
+            mean_count=round(mean_count, 2),
+            mean_percentage=round(mean_percentage, 2),
+            percentiles={f"p{p}": round(float(v), 2) for p, v in zip(PERCENTILES, percentiles)},
+            histogram=histogram.tolist(),
+            **triggers,
+        )
+
+
+def _first_per_row(mask: np.ndarray, order: np.ndarray, limit: int) -> np.ndarray:
+    """The first ``limit`` set entries of each row of mask, ranked by order."""
+    columns = np.argsort(order, axis=1, kind="stable")
+    ranked = np.take_along_axis(mask, columns, axis=1)
+    kept = ranked & (np.cumsum(ranked, axis=1) <= limit)
+    result = np.zeros_like(mask)
+    np.put_along_axis(result, columns, kept, axis=1)
+    return result
+
+
+def _round1(values: np.ndarray) -> np.ndarray:
+    """
+    Round to one decimal exactly like Python's round(). np.round scales by
+    10 first, which can disagree on values that sit on a .x5 boundary, so
+    those few are redone with round().
+    """
+    rounded = np.round(values, 1)
+    scaled = np.abs(values * 10) % 1
+    ties = np.nonzero(np.isclose(scaled, 0.5, rtol=0, atol=1e-9))
+    for index in zip(*ties):
+        rounded[index] = round(float(values[index]), 1)
+    return rounded
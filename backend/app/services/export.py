@@ -3,10 +3,57 @@ from datetime import datetime
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.platypus import PageBreak, SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 from reportlab.lib import colors
+from reportlab.platypus.flowables import Flowable
+from functools import lru_cache
 from io import BytesIO
+import os
+import tempfile
+import time
+from xml.sax.saxutils import escape
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple
 from app.models.analysis import AnalysisResult
+from app.utils.formatting import merge_formatting_spans
+from app.utils.metrics import span
+
+
+class ReportTemplate:
+    """
+    Paragraph and table styles for the PDF report. Building the sample
+    stylesheet and table style is a noticeable part of a small export, so
+    this is built once per process (see report_template) and shared.
+    """
+
+    def __init__(self) -> None:
+        styles = getSampleStyleSheet()
+        self.title = ParagraphStyle(
+            "CustomTitle",
+            parent=styles["Heading1"],
+            fontSize=24,
+            textColor=colors.HexColor("#1F2937"),
+            spaceAfter=30,
+        )
+        self.heading = styles["Heading2"]
+        self.bin_heading = styles["Heading3"]
+        self.body = styles["Normal"]
+        self.table = TableStyle(
+            [
+                ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
+                ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                ("FONTSIZE", (0, 0), (-1, 0), 12),
+                ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
+                ("BACKGROUND", (0, 1), (-1, -1), colors.beige),
+                ("GRID", (0, 0), (-1, -1), 1, colors.black),
+            ]
+        )
+
+
+@lru_cache(maxsize=None)
+def report_template() -> ReportTemplate:
+    return ReportTemplate()
 
 
 class ExportService:
@@ -26,56 +73,49 @@ class ExportService:
     def export_to_pdf(self, result: AnalysisResult) -> BytesIO:
         """Export analysis result to PDF document."""
         buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
-        styles = getSampleStyleSheet()
+        self.render_pdf(result, buffer)
+        buffer.seek(0)
+        return buffer
+
+    def render_pdf(self, result: AnalysisResult, output: BinaryIO) -> None:
+        """Render the PDF report for one result into a file-like object."""
+        doc = SimpleDocTemplate(output, pagesize=letter)
+        with span("report_story"):
+            story = self.build_story(result)
+        with span("pdf_build"):
+            doc.build(story)
+
+    def build_story(self, result: AnalysisResult) -> List[Flowable]:
+        """Flowables for one result's report, using the shared template."""
+        template = report_template()
         story = []
 
         # Title
-        title_style = ParagraphStyle(
-            "CustomTitle",
-            parent=styles["Heading1"],
-            fontSize=24,
-            textColor=colors.HexColor("#1F2937"),
-            spaceAfter=30,
-        )
-        title = Paragraph(
-            f"Career Design Analysis - {result.timestamp.strftime('%B %d, %Y')}",
-            title_style,
+        story.append(
+            Paragraph(
+                f"Career Design Analysis - {result.timestamp.strftime('%B %d, %Y')}",
+                template.title,
+            )
         )
-        story.append(title)
         story.append(Spacer(1, 0.2 * inch))
 
         # Analytics Summary
-        heading_style = styles["Heading2"]
-        story.append(Paragraph("Distribution Overview", heading_style))
+        story.append(Paragraph("Distribution Overview", template.heading))
         story.append(Spacer(1, 0.1 * inch))
 
         # Create distribution table
+        labels = {b.id: b.label for b in result.bins}
         table_data = [["Category", "Count", "Percentage"]]
         for dist in result.analytics.distribution:
-            bin_label = next(b.label for b in result.bins if b.id == dist.bin_id)
-            table_data.append([bin_label, str(dist.count), f"{dist.percentage}%"])
+            table_data.append([labels[dist.bin_id], str(dist.count), f"{dist.percentage}%"])
 
         table = Table(table_data)
-        table.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
-                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                    ("FONTSIZE", (0, 0), (-1, 0), 12),
-                    ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
-                    ("BACKGROUND", (0, 1), (-1, -1), colors.beige),
-                    ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                ]
-            )
-        )
+        table.setStyle(template.table)
         story.append(table)
         story.append(Spacer(1, 0.3 * inch))
 
         # Bullets by Category
-        story.append(Paragraph("Categorized Bullets", heading_style))
+        story.append(Paragraph("Categorized Bullets", template.heading))
         story.append(Spacer(1, 0.1 * inch))
 
         for bin in result.bins:
@@ -83,7 +123,7 @@ class ExportService:
                 # Bin header with color
                 bin_header = Paragraph(
                     f"<font color='{bin.color}'><b>{bin.label}</b></font> ({len(bin.bullets)} bullets)",
-                    styles["Heading3"],
+                    template.bin_heading,
                 )
                 story.append(bin_header)
 
@@ -92,25 +132,117 @@ class ExportService:
                     bullet_text = self._format_bullet_text(
                         bullet.text, bullet.formatting
                     )
-                    bullet_para = Paragraph(f"• {bullet_text}", styles["Normal"])
-                    story.append(bullet_para)
+                    story.append(Paragraph(f"• {bullet_text}", template.body))
 
                 story.append(Spacer(1, 0.2 * inch))
 
         # Insights
-        story.append(Paragraph("Insights & Suggestions", heading_style))
+        story.append(Paragraph("Insights & Suggestions", template.heading))
         story.append(Spacer(1, 0.1 * inch))
 
         for suggestion in result.analytics.suggestions:
-            suggestion_para = Paragraph(f"• {suggestion}", styles["Normal"])
-            story.append(suggestion_para)
-
-        # Build PDF
-        doc.build(story)
-        buffer.seek(0)
-        return buffer
+            story.append(Paragraph(f"• {suggestion}", template.body))
+
+        return story
+
+    def render_combined_pdf(
+        self,
+        named_results: List[Tuple[str, AnalysisResult]],
+        output: BinaryIO,
+        on_report: Optional[Callable[[str, Optional[str]], None]] = None,
+    ) -> Dict[str, str]:
+        """
+        Render many reports into one PDF, each starting on a new page.
+        Reports that fail are left out and listed on a final page; returns
+        name -> error for those. ``on_report`` is called with (name, error
+        or None) as each report is laid out, before the document is built.
+        """
+        template = report_template()
+        story: List[Flowable] = []
+        errors: Dict[str, str] = {}
+
+        for name, result in named_results:
+            try:
+                with span("report_story"):
+                    report = self.build_story(result)
+            except Exception as e:
+                errors[name] = f"Export failed: {str(e)}"
+                if on_report is not None:
+                    on_report(name, errors[name])
+                continue
+            if on_report is not None:
+                on_report(name, None)
+            if story:
+                story.append(PageBreak())
+            story.extend(report)
+
+        if errors:
+            if story:
+                story.append(PageBreak())
+            story.append(Paragraph("Reports Not Included", template.heading))
+            for name, error in errors.items():
+                story.append(Paragraph(f"• {escape(name)}: {escape(error)}", template.body))
+
+        with span("pdf_build"):
+            SimpleDocTemplate(output, pagesize=letter).build(story)
+        return errors
 
     def _format_bullet_text(self, text: str, formatting) -> str:
-        """Apply formatting to text for PDF (simplified)."""
-        # For now, return plain text
-        return text
+        """Apply bold/italic spans as ReportLab paragraph markup."""
+        return merge_formatting_spans(formatting.spans, text)
+
+
+_worker_exporter = ExportService()
+
+
+def render_pdf_file(
+    result: AnalysisResult, directory: str, expires_at: Optional[float] = None
+) -> str:
+    """
+    Render a PDF report into a new file under ``directory`` and return its
+    path. Module-level so it can be pickled and run inside a worker process;
+    the caller owns (and must delete) the file.
+
+    If the render finishes after ``expires_at`` (a time.time() value), the
+    caller has stopped waiting, so the file is deleted instead.
+    """
+    fd, path = tempfile.mkstemp(suffix=".pdf", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as output:
+            _worker_exporter.render_pdf(result, output)
+        _check_expiry(expires_at)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path
+
+
+def render_combined_pdf_file(
+    named_results: List[Tuple[str, AnalysisResult]],
+    directory: str,
+    progress: Any = None,
+    expires_at: Optional[float] = None,
+) -> Tuple[str, Dict[str, str]]:
+    """
+    Worker-side counterpart of ExportService.render_combined_pdf. If given,
+    ``progress`` (a WorkerPool.queue()) gets (name, error) per report, then
+    None once the job ends.
+    """
+    on_report = None if progress is None else lambda name, error: progress.put((name, error))
+    fd, path = tempfile.mkstemp(suffix=".pdf", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as output:
+            errors = _worker_exporter.render_combined_pdf(named_results, output, on_report)
+        _check_expiry(expires_at)
+    except BaseException:
+        os.unlink(path)
+        raise
+    finally:
+        if progress is not None:
+            progress.put(None)
+    return path, errors
+
+
+def _check_expiry(expires_at: Optional[float]) -> None:
+    if expires_at is not None and time.time() > expires_at:
+        raise TimeoutError("Export finished after its deadline; output discarded")
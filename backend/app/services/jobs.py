@@ -0,0 +1,380 @@
+import asyncio
+import ipaddress
+import itertools
+import json
+import logging
+import socket
+import sqlite3
+import uuid
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set
+from urllib.parse import urlparse
+
+import httpx
+
+from app.models.job import Job, JobPriority
+
+logger = logging.getLogger(__name__)
+
+# Lower runs first
+PRIORITY_ORDER: Dict[str, int] = {"high": 0, "normal": 1, "low": 2}
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+class CallbackURLError(ValueError):
+    """Raised when a callback URL could reach a host it should not."""
+
+
+async def check_callback_url(url: str, allowed_hosts: Sequence[str] = ()) -> None:
+    """
+    Reject callback URLs that could be used to reach internal services.
+
+    With an allow-list, only those hosts are accepted. Without one, the
+    host must resolve to public addresses only, so private, loopback and
+    link-local targets (e.g. cloud metadata endpoints) are refused.
+    """
+    parsed = urlparse(url)
+    try:
+        port = parsed.port
+    except ValueError:
+        raise CallbackURLError("callback_url has an invalid port")
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise CallbackURLError("callback_url must be an http(s) URL")
+
+    host = parsed.hostname
+    if allowed_hosts:
+        if host not in {h.lower() for h in allowed_hosts}:
+            raise CallbackURLError(f"callback_url host {host} is not allowed")
+        return
+
+    loop = asyncio.get_running_loop()
+    try:
+        infos = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except socket.gaierror:
+        raise CallbackURLError(f"callback_url host {host} does not resolve")
+
+    for *_, sockaddr in infos:
+        address = ipaddress.ip_address(sockaddr[0].split("%")[0])
+        if address.version == 6 and address.ipv4_mapped is not None:
+            address = address.ipv4_mapped
+        if not address.is_global:
+            raise CallbackURLError(f"callback_url host {host} is not a public address")
+
+
+class InMemoryJobStore:
+    """Process-local job store; jobs are lost on restart."""
+
+    blocking = False
+
+    def __init__(self) -> None:
+        self._jobs: Dict[str, Job] = {}
+        self._lock = Lock()
+
+    def save(self, job: Job) -> None:
+        with self._lock:
+            self._jobs[job.id] = job.model_copy()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.model_copy() if job is not None else None
+
+    def unfinished(self) -> List[Job]:
+        with self._lock:
+            return [job.model_copy() for job in self._jobs.values() if not job.finished]
+
+    def prune(self, finished_before: datetime) -> int:
+        with self._lock:
+            expired = [
+                job_id
+                for job_id, job in self._jobs.items()
+                if job.finished and job.updated_at < finished_before
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+            return len(expired)
+
+
+class SQLiteJobStore:
+    """
+    Job store backed by a SQLite file so queued jobs survive a restart.
+    Unfinished jobs are picked up again by JobQueue.start(). Every call
+    does file I/O, so JobQueue makes them on a thread.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str) -> None:
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, status TEXT NOT NULL, updated_at TEXT NOT NULL, "
+                "data TEXT NOT NULL, payload TEXT NOT NULL)"
+            )
+
+    def save(self, job: Job) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (id, status, updated_at, data, payload) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    job.id,
+                    job.status,
+                    job.updated_at.isoformat(),
+                    job.model_dump_json(),
+                    json.dumps(job.payload),
+                ),
+            )
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, payload FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return self._load(row) if row else None
+
+    def unfinished(self) -> List[Job]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data, payload FROM jobs WHERE status IN ('queued', 'running')"
+            ).fetchall()
+        return [self._load(row) for row in rows]
+
+    def prune(self, finished_before: datetime) -> int:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM jobs WHERE status IN ('succeeded', 'failed') AND updated_at < ?",
+                (finished_before.isoformat(),),
+            )
+            return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _load(self, row) -> Job:
+        job = Job.model_validate_json(row[0])
+        job.payload = json.loads(row[1])
+        return job
+
+
+class JobQueue:
+    """
+    Bounded background queue for slow async work.
+
+    submit() stores the job and returns immediately; ``workers`` tasks run
+    jobs in priority order, retrying failures up to ``max_attempts`` times
+    with exponential backoff. When a job finishes, its status is POSTed to
+    the job's callback URL if one was given and check_callback_url still
+    accepts it.
+    """
+
+    def __init__(
+        self,
+        handler: JobHandler,
+        store=None,
+        workers: int = 2,
+        max_queue: int = 100,
+        max_attempts: int = 3,
+        retry_backoff_seconds: float = 2.0,
+        ttl_seconds: Optional[float] = None,
+        callback_timeout_seconds: float = 10.0,
+        callback_allowed_hosts: Sequence[str] = (),
+        is_retryable: Callable[[Exception], bool] = lambda e: True,
+    ) -> None:
+        self.handler = handler
+        self.store = store if store is not None else InMemoryJobStore()
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_attempts = max_attempts
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.ttl_seconds = ttl_seconds
+        self.callback_timeout_seconds = callback_timeout_seconds
+        self.callback_allowed_hosts = callback_allowed_hosts
+        self.is_retryable = is_retryable
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: List[asyncio.Task] = []
+        self._callbacks: Set[asyncio.Task] = set()
+        self._pending = 0  # queued or waiting to be retried
+        self._seq = itertools.count()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def start(self) -> None:
+        """Start workers on the running loop and requeue unfinished jobs."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.PriorityQueue()
+        self._pending = 0
+        self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+
+        for job in await self._call_store(self.store.unfinished):
+            job.status = "queued"
+            await self._call_store(self.store.save, job)
+            self._enqueue(job)
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks + list(self._callbacks), []
+        self._callbacks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop = None
+        self._queue = None
+
+    async def submit(
+        self,
+        payload: Dict[str, Any],
+        priority: JobPriority = "normal",
+        callback_url: Optional[str] = None,
+    ) -> Job:
+        await self.start()
+        if self._pending >= self.max_queue:
+            raise QueueFullError(f"Job queue is full ({self._pending}/{self.max_queue} jobs)")
+
+        now = datetime.utcnow()
+        job = Job(
+            id=uuid.uuid4().hex,
+            priority=priority,
+            created_at=now,
+            updated_at=now,
+            callback_url=callback_url,
+            payload=payload,
+        )
+        await self._call_store(self.store.save, job)
+        self._enqueue(job)
+        return job
+
+    async def record(
+        self,
+        payload: Dict[str, Any],
+        result: Dict[str, Any],
+        callback_url: Optional[str] = None,
+    ) -> Job:
+        """
+        Store an already-finished job, e.g. one answered from a cache. Its
+        callback, if any, is delivered in the background.
+        """
+        now = datetime.utcnow()
+        job = Job(
+            id=uuid.uuid4().hex,
+            status="succeeded",
+            created_at=now,
+            updated_at=now,
+            callback_url=callback_url,
+            result=result,
+            payload=payload,
+        )
+        await self._call_store(self.store.save, job)
+        if callback_url:
+            task = asyncio.ensure_future(self._notify(job.model_copy()))
+            self._callbacks.add(task)
+            task.add_done_callback(self._callbacks.discard)
+        await self._prune()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.store.get(job_id)
+
+    async def get_async(self, job_id: str) -> Optional[Job]:
+        """get() for use on the event loop."""
+        return await self._call_store(self.store.get, job_id)
+
+    def _enqueue(self, job: Job) -> None:
+        self._pending += 1
+        self._queue.put_nowait((PRIORITY_ORDER[job.priority], next(self._seq), job.id))
+
+    async def _worker(self) -> None:
+        while True:
+            _, _, job_id = await self._queue.get()
+            self._pending -= 1
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                logger.error(f"Job worker error for {job_id}: {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        job = await self._call_store(self.store.get, job_id)
+        if job is None or job.finished:
+            return
+
+        job.status = "running"
+        job.attempts += 1
+        await self._touch(job)
+
+        try:
+            job.result = await self.handler(job.payload)
+            job.status = "succeeded"
+            job.error = None
+        except Exception as e:
+            job.error = str(e)
+            if job.attempts < self.max_attempts and self.is_retryable(e):
+                delay = self.retry_backoff_seconds * 2 ** (job.attempts - 1)
+                logger.warning(f"Job {job.id} failed (attempt {job.attempts}), retrying in {delay}s: {e}")
+                job.status = "queued"
+                await self._touch(job)
+                self._pending += 1
+                self._loop.call_later(delay, self._requeue, job)
+                return
+            logger.error(f"Job {job.id} failed after {job.attempts} attempts: {e}")
+            job.status = "failed"
+
+        await self._touch(job)
+        if job.callback_url:
+            await self._notify(job)
+        await self._prune()
+
+    def _requeue(self, job: Job) -> None:
+        if self._queue is None:
+            return
+        self._pending -= 1
+        self._enqueue(job)
+
+    async def _touch(self, job: Job) -> None:
+        job.updated_at = datetime.utcnow()
+        await self._call_store(self.store.save, job)
+
+    async def _notify(self, job: Job) -> None:
+        job.callback_delivered = await self._deliver_callback(job)
+        await self._call_store(self.store.save, job)
+
+    async def _call_store(self, method: Callable[..., Any], *args: Any) -> Any:
+        """Call a store method, on a thread if the store does blocking I/O."""
+        if self.store.blocking:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    async def _deliver_callback(self, job: Job) -> bool:
+        try:
+            # Checked again here: the host may resolve differently by now.
+            # Redirects are not followed, so they cannot lead elsewhere.
+            await check_callback_url(job.callback_url, self.callback_allowed_hosts)
+            async with httpx.AsyncClient(
+                timeout=self.callback_timeout_seconds, follow_redirects=False
+            ) as client:
+                response = await client.post(job.callback_url, json=job.model_dump(mode="json"))
+            response.raise_for_status()
+            return True
+        except Exception as e:
+            logger.warning(f"Callback for job {job.id} to {job.callback_url} failed: {e}")
+            return False
+
+    async def _prune(self) -> None:
+        if self.ttl_seconds is not None:
+            finished_before = datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+            await self._call_store(self.store.prune, finished_before)
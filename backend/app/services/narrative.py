@@ -1,12 +1,28 @@
+import asyncio
+import hashlib
 import json
 import logging
-from typing import List, Optional
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
-from openai import OpenAI
+import httpx
+from openai import AsyncOpenAI, OpenAI
 from pydantic import BaseModel
 
 from app.config.settings import settings
 from app.models.analysis import AnalysisResult
+from app.services.prompt_builder import ExperiencePromptBuilder, estimate_tokens
+from app.services.resilience import (
+    CircuitBreaker,
+    LatencyTracker,
+    ResilientCaller,
+    RetryPolicy,
+    classify_error,
+)
+from app.utils.cache import TieredCache
+from app.utils.json_stream import IncrementalJSONParser
+from app.utils.metrics import record_span, span, timed
+from app.utils.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
@@ -25,42 +41,298 @@ class NarrativeResponse(BaseModel):
     experienceSuggestions: List[ExperienceSuggestion] = []
 
 
+class NarrativeCache(TieredCache):
+    """
+    Response cache keyed on a canonical hash of the full completion request
+    (rendered prompts, model and sampling settings), so any change to the
+    prompt template or model naturally misses.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: Optional[float] = None,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: Optional[int] = None,
+    ) -> None:
+        super().__init__(
+            max_entries=max_entries,
+            ttl_seconds=ttl_seconds,
+            disk_dir=disk_dir,
+            serialize=lambda response: response.model_dump_json(),
+            deserialize=NarrativeResponse.model_validate_json,
+            copy=lambda response: response.model_copy(deep=True),
+            disk_max_bytes=disk_max_bytes,
+        )
+
+    @staticmethod
+    def make_key(params: Dict[str, Any]) -> str:
+        canonical = json.dumps(params, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
 class NarrativeService:
     """Service for generating AI-powered narrative analysis using Dartmouth Chat AI."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        model: Optional[str] = None,
+        cache: Optional[NarrativeCache] = None,
+    ):
+        self.cache = cache
+        self._api_key = api_key
+        self._base_url = base_url
+        self.model = model or settings.dartmouth_ai_model
         self._client = None
+        self._async_client = None
+        self._limiter = None
+        # Identical concurrent requests share one upstream completion
+        self._flights = SingleFlight(wait_timeout=settings.narrative_coalesce_wait_seconds)
+        self.resilience = ResilientCaller(
+            retry=RetryPolicy(
+                max_attempts=settings.narrative_retry_max_attempts,
+                base_delay=settings.narrative_retry_base_delay_seconds,
+                max_delay=settings.narrative_retry_max_delay_seconds,
+            ),
+            breaker=CircuitBreaker(
+                failure_threshold=settings.narrative_breaker_failure_threshold,
+                reset_timeout=settings.narrative_breaker_reset_seconds,
+            ),
+            latency=LatencyTracker(min_samples=settings.narrative_hedge_min_samples),
+            hedge_percentile=settings.narrative_hedge_percentile or None,
+        )
+        self._prompt_builder = ExperiencePromptBuilder(
+            max_bullet_chars=settings.narrative_max_bullet_chars
+        )
+
+    @property
+    def api_key(self) -> str:
+        if self._api_key is not None:
+            return self._api_key
+        return settings.dartmouth_ai_api_key
+
+    @property
+    def base_url(self) -> str:
+        return self._base_url or settings.dartmouth_ai_base_url
 
     @property
     def client(self):
         """Lazy initialization of Dartmouth Chat AI client."""
         if self._client is None:
-            if not settings.dartmouth_ai_api_key:
+            if not self.api_key:
                 raise ValueError("Dartmouth AI API key is not configured")
             self._client = OpenAI(
-                api_key=settings.dartmouth_ai_api_key,
-                base_url=settings.dartmouth_ai_base_url,
+                api_key=self.api_key,
+                base_url=self.base_url,
+                timeout=self._timeout(),
+                max_retries=0,  # retries are handled by self.resilience
             )
         return self._client
 
+    @property
+    def async_client(self):
+        """Lazy initialization of the shared, connection-pooled async client."""
+        if self._async_client is None:
+            if not self.api_key:
+                raise ValueError("Dartmouth AI API key is not configured")
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.narrative_pool_max_connections,
+                    max_keepalive_connections=settings.narrative_pool_max_keepalive,
+                ),
+                timeout=self._timeout(),
+            )
+            self._async_client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                http_client=http_client,
+                max_retries=0,
+            )
+        return self._async_client
+
+    @property
+    def limiter(self) -> asyncio.Semaphore:
+        """Caps concurrent upstream calls from this process."""
+        if self._limiter is None:
+            self._limiter = asyncio.Semaphore(settings.narrative_max_concurrency)
+        return self._limiter
+
+    async def aclose(self) -> None:
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+
+    def get_cached(self, analysis: AnalysisResult) -> Optional[NarrativeResponse]:
+        """Return a cached narrative for an identical request, if any."""
+        if self.cache is None or not analysis.onboardingData:
+            return None
+        return self.cache.get(NarrativeCache.make_key(self._completion_params(analysis)))
+
+    async def get_cached_async(self, analysis: AnalysisResult) -> Optional[NarrativeResponse]:
+        """get_cached for use in routes; the disk tier is read on a thread."""
+        if self.cache is None or not analysis.onboardingData:
+            return None
+        key = NarrativeCache.make_key(self._completion_params(analysis))
+        return await self.cache.get_async(key)
+
     def generate_narrative(self, analysis: AnalysisResult) -> NarrativeResponse:
         """Generate narrative guidance based on student's workshop journey."""
 
         if not analysis.onboardingData:
-            return NarrativeResponse(
-                paragraph="Complete the onboarding steps to receive personalized narrative guidance.",
-                bullets=[
-                    "Identify your defining word",
-                    "Select your career value",
-                    "Categorize your experiences",
-                ],
-                experienceSuggestions=[],
+            return self._onboarding_required_response()
+
+        params = self._completion_params(analysis)
+        self._log_request(analysis)
+        response = self._flights.do(
+            NarrativeCache.make_key(params), lambda: self._create(params)
+        )
+        return self._store(params, self._parse_completion(response))
+
+    async def generate_narrative_async(
+        self, analysis: AnalysisResult
+    ) -> NarrativeResponse:
+        """Non-blocking variant of generate_narrative for use in routes."""
+
+        if not analysis.onboardingData:
+            return self._onboarding_required_response()
+
+        params = self._completion_params(analysis)
+        self._log_request(analysis)
+        response = await self._flights.do_async(
+            NarrativeCache.make_key(params), lambda: self._create_async(params)
+        )
+        return await self._store_async(params, self._parse_completion(response))
+
+    def _create(self, params: Dict[str, Any]):
+        with span("ai_completion"):
+            return self.resilience.call(
+                lambda: self.client.chat.completions.create(**params)
             )
 
+    async def _create_async(self, params: Dict[str, Any]):
+        with span("ai_completion"):
+            return await self.resilience.call_async(lambda: self._create_once_async(params))
+
+    async def _create_once_async(self, params: Dict[str, Any]):
+        async with self.limiter:
+            return await self.async_client.chat.completions.create(**params)
+
+    async def stream_narrative(
+        self, analysis: AnalysisResult
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Stream a narrative as (event, data) pairs while the model is still
+        generating: "paragraph" (str), one "bullet" (str) per strategy and one
+        "experienceSuggestion" (ExperienceSuggestion) per item, each as soon
+        as it is complete, then "narrative" with the validated response.
+        """
+        if not analysis.onboardingData:
+            for event in self.replay_events(self._onboarding_required_response()):
+                yield event
+            return
+
+        params = self._completion_params(analysis)
+        self._log_request(analysis)
+        parser = IncrementalJSONParser(max_depth=2)
+        content: List[str] = []
+
+        async with self.limiter:
+            # Only opening the stream is retried; events may already have
+            # been sent to the client once it is flowing
+            with span("ai_stream_open"):
+                stream = await self.resilience.call_async(
+                    lambda: self.async_client.chat.completions.create(**params, stream=True),
+                    hedge=False,
+                )
+            # ai_stream covers only consuming the stream; opening it is ai_stream_open
+            start = time.perf_counter()
+            try:
+                async for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if not delta:
+                        continue
+                    content.append(delta)
+                    for path, value in parser.feed(delta):
+                        event = self._stream_event(path, value)
+                        if event is not None:
+                            yield event
+            except Exception as e:
+                error = classify_error(e)
+                if error is None:
+                    raise
+                raise error from e
+            finally:
+                record_span("ai_stream", time.perf_counter() - start)
+
+        result = await self._store_async(params, self._parse_content("".join(content)))
+        yield "narrative", result
+
+    def _stream_event(self, path, value) -> Optional[Tuple[str, Any]]:
+        if path == ("paragraph",) and isinstance(value, str):
+            return "paragraph", value
+        if len(path) != 2 or not isinstance(path[1], int):
+            return None
+        if path[0] == "bullets" and isinstance(value, str):
+            return "bullet", value
+        if path[0] == "experienceSuggestions" and isinstance(value, dict):
+            return "experienceSuggestion", self._parse_suggestion(value)
+        return None
+
+    def replay_events(self, result: NarrativeResponse) -> List[Tuple[str, Any]]:
+        """Stream events for an already complete response (e.g. a cache hit)."""
+        events: List[Tuple[str, Any]] = [("paragraph", result.paragraph)]
+        events.extend(("bullet", bullet) for bullet in result.bullets)
+        events.extend(
+            ("experienceSuggestion", exp) for exp in result.experienceSuggestions
+        )
+        events.append(("narrative", result))
+        return events
+
+    def _store(
+        self, params: Dict[str, Any], result: NarrativeResponse
+    ) -> NarrativeResponse:
+        if self.cache is not None:
+            self.cache.set(NarrativeCache.make_key(params), result)
+        return result
+
+    async def _store_async(
+        self, params: Dict[str, Any], result: NarrativeResponse
+    ) -> NarrativeResponse:
+        if self.cache is not None:
+            await self.cache.set_async(NarrativeCache.make_key(params), result)
+        return result
+
+    def _log_request(self, analysis: AnalysisResult) -> None:
+        onboarding = analysis.onboardingData
+        logger.info(
+            f"Generating narrative for word: {onboarding.word}, value: {onboarding.careerValue}"
+        )
+
+    def _timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(
+            settings.narrative_read_timeout_seconds,
+            connect=settings.narrative_connect_timeout_seconds,
+        )
+
+    def _onboarding_required_response(self) -> NarrativeResponse:
+        return NarrativeResponse(
+            paragraph="Complete the onboarding steps to receive personalized narrative guidance.",
+            bullets=[
+                "Identify your defining word",
+                "Select your career value",
+                "Categorize your experiences",
+            ],
+            experienceSuggestions=[],
+        )
+
+    @timed("prompt_build")
+    def _completion_params(self, analysis: AnalysisResult) -> Dict[str, Any]:
+        """Build the chat completion request for an analysis."""
         # Build context from analysis data
         onboarding = analysis.onboardingData
         distribution_summary = self._format_distribution(analysis)
-        experiences_detailed = self._format_experiences_detailed(analysis)
 
         system_prompt = """You are a career storytelling strategist helping students at Dartmouth College's Center for Career Design craft their professional narrative.
 
@@ -100,7 +372,8 @@ For experienceSuggestions:
 - The "reframe" should be a verbal framing suggestion, like "When discussing this, emphasize how you served as a [WORD] by..."
 - Keep explanations concise (1-2 sentences)"""
 
-        user_prompt = f"""Student's Workshop Journey:
+        def render_user_prompt(experiences_detailed: str) -> str:
+            return f"""Student's Workshop Journey:
 
 DEFINING WORD: {onboarding.word}
 CAREER VALUE: {onboarding.careerValue}
@@ -119,37 +392,39 @@ DETAILED EXPERIENCES BY CATEGORY:
 
 Analyze these specific experiences through the lens of "{onboarding.word}" and provide reframing suggestions for experiences that don't naturally align with this word. Help the student see how to tell their story consistently around "{onboarding.word}" even when the original experience framing doesn't emphasize it."""
 
-        logger.info(
-            f"Generating narrative for word: {onboarding.word}, value: {onboarding.careerValue}"
+        # Whatever the fixed parts of the prompt leave of the budget goes to
+        # the experiences section
+        fixed_tokens = estimate_tokens(system_prompt) + estimate_tokens(
+            render_user_prompt("")
+        )
+        experiences_detailed = self._format_experiences_detailed(
+            analysis, settings.narrative_input_token_budget - fixed_tokens
         )
+        user_prompt = render_user_prompt(experiences_detailed)
+
         logger.debug(f"Experiences to analyze:\n{experiences_detailed}")
 
-        response = self.client.chat.completions.create(
-            model=settings.dartmouth_ai_model,
-            messages=[
+        return {
+            "model": self.model,
+            "messages": [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt},
             ],
-            temperature=0.7,
-            max_tokens=1500,
-        )
+            "temperature": 0.7,
+            "max_tokens": 1500,
+        }
 
-        content = response.choices[0].message.content
+    def _parse_completion(self, response) -> NarrativeResponse:
+        return self._parse_content(response.choices[0].message.content)
+
+    def _parse_content(self, content: str) -> NarrativeResponse:
         logger.debug(f"AI response: {content}")
 
         result = json.loads(content)
 
         experience_suggestions = []
         for exp in result.get("experienceSuggestions", []):
-            experience_suggestions.append(
-                ExperienceSuggestion(
-                    original=exp.get("original", ""),
-                    category=exp.get("category", ""),
-                    alignment=exp.get("alignment", "moderate"),
-                    reframe=exp.get("reframe"),
-                    explanation=exp.get("explanation", ""),
-                )
-            )
+            experience_suggestions.append(self._parse_suggestion(exp))
 
         return NarrativeResponse(
             paragraph=result.get("paragraph", ""),
@@ -157,6 +432,15 @@ Analyze these specific experiences through the lens of "{onboarding.word}" and p
             experienceSuggestions=experience_suggestions,
         )
 
+    def _parse_suggestion(self, exp: Dict[str, Any]) -> ExperienceSuggestion:
+        return ExperienceSuggestion(
+            original=exp.get("original", ""),
+            category=exp.get("category", ""),
+            alignment=exp.get("alignment", "moderate"),
+            reframe=exp.get("reframe"),
+            explanation=exp.get("explanation", ""),
+        )
+
     def _format_distribution(self, analysis: AnalysisResult) -> str:
         """Format distribution data for the prompt."""
         lines = []
@@ -167,18 +451,26 @@ Analyze these specific experiences through the lens of "{onboarding.word}" and p
             lines.append(f"- {bin_label}: {dist.count} items ({dist.percentage}%)")
         return "\n".join(lines)
 
-    def _format_experiences_detailed(self, analysis: AnalysisResult) -> str:
+    def _format_experiences_detailed(
+        self, analysis: AnalysisResult, token_budget: Optional[int] = None
+    ) -> str:
         """Format experiences with full text for detailed analysis."""
-        lines = []
-        for bin in analysis.bins:
-            if bin.bullets:
-                lines.append(f"\n=== {bin.label.upper()} ===")
-                for i, bullet in enumerate(bin.bullets, 1):
-                    text = bullet.text[:300]
-                    if len(bullet.text) > 300:
-                        text += "..."
-                    lines.append(f"{i}. {text}")
-        return "\n".join(lines) if lines else "No experiences categorized yet."
-
-
-narrative_service = NarrativeService()
+        text, report = self._prompt_builder.build(analysis.bins, token_budget)
+        if report.dropped:
+            logger.info(
+                f"Prompt budget: kept {report.included} experiences "
+                f"(~{report.estimated_tokens} tokens), dropped "
+                f"{len(report.dropped_duplicates)} near-duplicates and "
+                f"{len(report.dropped_for_budget)} over budget"
+            )
+        return text
+
+
+narrative_service = NarrativeService(
+    cache=NarrativeCache(
+        max_entries=settings.narrative_cache_max_entries,
+        ttl_seconds=settings.narrative_cache_ttl_seconds,
+        disk_dir=settings.narrative_cache_dir or None,
+        disk_max_bytes=settings.narrative_cache_disk_max_bytes,
+    )
+)
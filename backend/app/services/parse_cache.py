@@ -0,0 +1,50 @@
+import json
+from typing import List, Optional
+
+from app.models.bullet_point import BulletPoint
+from app.services.parser import ResumeParser
+from app.utils.cache import TieredCache
+
+
+class ParseCache(TieredCache):
+    """
+    Content-addressed cache of parse results.
+
+    Keys combine the SHA-256 of the uploaded bytes with the file type and
+    ResumeParser.VERSION, so bumping the parser version invalidates every
+    entry. Lookups hit the in-process LRU first and fall back to the
+    optional on-disk tier. Every lookup returns fresh BulletPoint copies.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: Optional[float] = None,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: Optional[int] = None,
+    ) -> None:
+        super().__init__(
+            max_entries=max_entries,
+            ttl_seconds=ttl_seconds,
+            disk_dir=disk_dir,
+            serialize=_dump_bullets,
+            deserialize=_load_bullets,
+            copy=_copy_bullets,
+            disk_max_bytes=disk_max_bytes,
+        )
+
+    @staticmethod
+    def make_key(content_sha256: str, file_type: str) -> str:
+        return f"{ResumeParser.VERSION}:{file_type}:{content_sha256}"
+
+
+def _copy_bullets(bullets: List[BulletPoint]) -> List[BulletPoint]:
+    return [b.model_copy(deep=True) for b in bullets]
+
+
+def _dump_bullets(bullets: List[BulletPoint]) -> str:
+    return json.dumps([b.model_dump() for b in bullets])
+
+
+def _load_bullets(raw: str) -> List[BulletPoint]:
+    return [BulletPoint.model_validate(b) for b in json.loads(raw)]
@@ -1,16 +1,63 @@
+import asyncio
+import hashlib
+import os
 import re
 import uuid
-from typing import List
+from functools import partial
+from io import BytesIO
+from time import perf_counter, time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 import pdfplumber
 from docx import Document
 
-from app.models.bullet_point import BulletPoint, FormattingInfo
+from app.models.batch import BatchParseResult
+from app.models.bullet_point import BulletPoint, FormattingInfo, FormattingSpan
+from app.services.worker_pool import JobTimeoutError, PoolSaturatedError, WorkerPool
+from app.utils.file_handler import get_file_extension, unique_filename
+from app.utils.metrics import record_span, span
+from app.utils.zip_stream import iter_zip_members
+
+if TYPE_CHECKING:
+    from app.services.parse_cache import ParseCache
+
+# A resume can be a path on disk, raw bytes, or an open binary file
+ResumeSource = Union[str, os.PathLike, bytes, bytearray, memoryview, BinaryIO]
+
+# parse_batch input: (name, read, error), where read() returns the file's
+# content and is only called once the file is about to be parsed
+BatchEntry = Tuple[str, Optional[Callable[[], Union[str, bytes]]], Optional[str]]
+
+# parse_many input: named sources, or a zip archive (path or binary file)
+BatchSources = Union[
+    Mapping[str, ResumeSource],
+    Iterable[Tuple[str, ResumeSource]],
+    str,
+    os.PathLike,
+    BinaryIO,
+]
 
 
 class ResumeParser:
     """Service for extracting bullet points from resume files."""
 
+    # Bump whenever extraction output changes; invalidates cached parses
+    VERSION = "4"
+
     BULLET_PATTERNS = [
         r"^\s*•\s+",
         r"^\s*●\s+",
@@ -34,49 +81,239 @@ class ResumeParser:
     BULLET_PREFIX_RE = re.compile("|".join(BULLET_PATTERNS))
     BULLET_ONLY_RE = re.compile("|".join(BULLET_ONLY_PATTERNS))
 
+    # Common resume section titles, recognized even in title case
+    SECTION_HEADINGS = [
+        "education",
+        "(?:work |professional |relevant |volunteer )?experience",
+        "(?:technical )?skills",
+        "projects",
+        "leadership",
+        "activities",
+        "awards",
+        "honors",
+        "certifications",
+        "publications",
+        "interests",
+        "summary",
+        "objective",
+        "(?:relevant )?coursework",
+    ]
+
+    # A section title, or a short label ending in a colon
+    HEADER_PATTERN = r"(?:(?i:{})):?|.{{0,59}}:".format("|".join(SECTION_HEADINGS))
+    HEADER_RE = re.compile(rf"(?:{HEADER_PATTERN})$", re.DOTALL)
+
+    # Classifies a stripped line in one match: the matched group names the
+    # kind. Markers mirror BULLET_PATTERNS and BULLET_ONLY_PATTERNS.
+    LINE_RE = re.compile(
+        r"(?P<bullet>(?:[•●▪○\-–*\uf0b7]|\d+\.)\s+(?P<text>.*))"
+        r"|(?P<bullet_only>[•●▪○\uf0b7])$"
+        rf"|(?P<header>{HEADER_PATTERN})$",
+        re.DOTALL,
+    )
+    # Longest line that can be a header by capitalization alone
+    UPPERCASE_HEADER_MAX_LEN = 50
+
+    # Font name fragments, e.g. "ABCDEF+Helvetica-BoldOblique"
+    BOLD_FONT_RE = re.compile(r"bold|black|heavy|semibold|demi", re.IGNORECASE)
+    ITALIC_FONT_RE = re.compile(r"italic|oblique", re.IGNORECASE)
+    # Font names cached by _font_style; the worker parser lives for the process
+    FONT_STYLE_CACHE_SIZE = 1024
+
+    def __init__(self) -> None:
+        self._font_styles: Dict[str, Tuple[bool, bool]] = {}
+
     # =========================
     # PDF PARSING (pdfplumber)
     # =========================
 
-    def parse_pdf(self, file_path: str) -> List[BulletPoint]:
-        all_text = ""
-
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text()
-                if text:
-                    all_text += text + "\n"
+    def parse_pdf(self, source: ResumeSource) -> List[BulletPoint]:
+        return list(self.iter_pdf_bullets(source))
+
+    def iter_pdf_bullets(
+        self, source: ResumeSource, expires_at: Optional[float] = None
+    ) -> Iterator[BulletPoint]:
+        """
+        Yield bullets page by page as soon as each one is finalized.
+
+        Only one page of layout objects is held at a time, and the bullet
+        state machine carries over page boundaries so a bullet that wraps
+        onto the next page is still a single bullet. Raises TimeoutError
+        before any page that starts after ``expires_at`` (a time.time()
+        value).
+        """
+        state = _BulletStateMachine(self)
+
+        # Summed across the document and recorded once, not per line
+        extract_seconds = 0.0
+
+        with span("pdf_open"):
+            pdf = pdfplumber.open(self._open_source(source))
+        try:
+            with pdf:
+                for page in pdf.pages:
+                    _check_deadline(expires_at)
+                    with span("pdf_layout"):
+                        lines = list(self._iter_pdf_lines(page))
+                        page.get_textmap.cache_clear()
+                        page.flush_cache()
+                    for line, spans in lines:
+                        start = perf_counter()
+                        bullet = state.feed(line, spans)
+                        extract_seconds += perf_counter() - start
+                        if bullet is not None:
+                            yield bullet
+
+            bullet = state.close()
+            if bullet is not None:
+                yield bullet
+        finally:
+            record_span("bullet_extract", extract_seconds)
+
+    def _iter_pdf_lines(self, page) -> Iterator[Tuple[str, List[FormattingSpan]]]:
+        """
+        Yield (text, spans) per line of a page.
+
+        Lines come from the same text map page.extract_text() joins, so the
+        text is exactly what it returns. Bold/italic is resolved from each
+        character's font (cached per font name); the spaces pdfplumber
+        inserts between words have no character and join same-style runs.
+        """
+        font_style = self._font_style
+        pieces: List[str] = []
+        spans: List[FormattingSpan] = []
+        length = 0
+        spaced = False
+
+        for text, char in page.get_textmap().tuples:
+            if text == "\n":
+                yield "".join(pieces), spans
+                pieces, spans, length, spaced = [], [], 0, False
+                continue
 
-        return self._extract_bullets_from_text(all_text)
+            if char is None:
+                spaced = True
+            else:
+                bold, italic = font_style(char["fontname"])
+                if bold or italic:
+                    span = (length, length + len(text), bold, italic)
+                    _append_span(spans, span, after_space=spaced)
+                spaced = False
+
+            pieces.append(text)
+            length += len(text)
+
+        if pieces:
+            yield "".join(pieces), spans
+
+    def _font_style(self, fontname: str) -> Tuple[bool, bool]:
+        # Drop the per-document subset tag ("ABCDEF+") so the cache is keyed
+        # by font, not by font and document
+        if len(fontname) > 7 and fontname[6] == "+":
+            fontname = fontname[7:]
+        style = self._font_styles.get(fontname)
+        if style is None:
+            style = (
+                bool(self.BOLD_FONT_RE.search(fontname)),
+                bool(self.ITALIC_FONT_RE.search(fontname)),
+            )
+            if len(self._font_styles) >= self.FONT_STYLE_CACHE_SIZE:
+                self._font_styles.clear()
+            self._font_styles[fontname] = style
+        return style
 
     # =========================
     # DOCX PARSING
     # =========================
 
-    def parse_docx(self, file_path: str) -> List[BulletPoint]:
-        doc = Document(file_path)
-        bullets: List[BulletPoint] = []
+    def parse_docx(self, source: ResumeSource) -> List[BulletPoint]:
+        return list(self.iter_docx_bullets(source))
+
+    def iter_docx_bullets(
+        self, source: ResumeSource, expires_at: Optional[float] = None
+    ) -> Iterator[BulletPoint]:
+        with span("docx_open"):
+            doc = Document(self._open_source(source))
+        extract_seconds = 0.0
+
+        try:
+            for idx, paragraph in enumerate(doc.paragraphs):
+                _check_deadline(expires_at)
+                start = perf_counter()
+                bullet = self._docx_bullet(paragraph, idx)
+                extract_seconds += perf_counter() - start
+                if bullet is not None:
+                    yield bullet
+        finally:
+            record_span("bullet_extract", extract_seconds)
+
+    def _docx_bullet(self, paragraph, idx: int) -> Optional[BulletPoint]:
+        if not self._is_docx_bullet_paragraph(paragraph):
+            return None
+
+        clean_text, removed_prefix = self._clean_bullet_text_with_prefix_len(
+            paragraph.text
+        )
 
-        for idx, paragraph in enumerate(doc.paragraphs):
-            if self._is_docx_bullet_paragraph(paragraph):
-                clean_text, removed_prefix = self._clean_bullet_text_with_prefix_len(
-                    paragraph.text
-                )
-
-                formatting = self._extract_formatting_from_paragraph(
-                    paragraph, removed_prefix, len(clean_text)
-                )
-
-                bullets.append(
-                    BulletPoint(
-                        id=str(uuid.uuid4()),
-                        text=clean_text,
-                        formatting=formatting,
-                        original_index=idx,
-                    )
-                )
+        formatting = self._extract_formatting_from_paragraph(
+            paragraph, removed_prefix, len(clean_text)
+        )
 
-        return bullets
+        return BulletPoint(
+            id=str(uuid.uuid4()),
+            text=clean_text,
+            formatting=formatting,
+            original_index=idx,
+        )
+
+    # =========================
+    # BATCH PARSING
+    # =========================
+
+    def parse_many(
+        self,
+        sources: BatchSources,
+        pool: WorkerPool,
+        deadline_seconds: Optional[float] = None,
+        max_file_size: Optional[int] = None,
+    ) -> BatchParseResult:
+        """
+        Parse many resumes on a WorkerPool; a blocking wrapper around
+        parse_batch for scripts. Files that fail, have an unsupported type,
+        or are not done by the deadline are reported in `errors` keyed by
+        filename.
+        """
+        entries = self._iter_batch_entries(sources, max_file_size)
+        return asyncio.run(parse_batch(entries, pool, deadline_seconds=deadline_seconds))
+
+    def _iter_batch_entries(
+        self, sources: BatchSources, max_file_size: Optional[int]
+    ) -> Iterator[BatchEntry]:
+        if isinstance(sources, (str, os.PathLike)) or hasattr(sources, "read"):
+            yield from iter_zip_members(sources, max_file_size or float("inf"))
+            return
+
+        items = sources.items() if isinstance(sources, Mapping) else sources
+        for name, source in items:
+            yield name, partial(self._picklable_source, source), None
+
+    def _picklable_source(self, source: ResumeSource) -> Union[str, bytes]:
+        """Convert a source into a form that can be sent to a worker process."""
+        if isinstance(source, memoryview):
+            return source.tobytes()
+        if isinstance(source, os.PathLike):
+            return os.fspath(source)
+        if hasattr(source, "read"):
+            return source.read()
+        return source
+
+    def _open_source(self, source: ResumeSource):
+        """Normalize a source into something pdfplumber/python-docx can open."""
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return BytesIO(source)
+        if isinstance(source, os.PathLike):
+            return os.fspath(source)
+        return source
 
     # =========================
     # CORE BULLET EXTRACTION
@@ -86,87 +323,50 @@ class ResumeParser:
         s = (line or "").strip()
         if not s:
             return False
-
-        letters = [c for c in s if c.isalpha()]
-        if letters:
-            uppercase_ratio = sum(c.isupper() for c in letters) / len(letters)
-            if uppercase_ratio > 0.8 and len(s) <= 50:
-                return True
-
-        if s.endswith(":") and len(s) <= 60:
-            return True
-
-        return False
+        return self.HEADER_RE.match(s) is not None or self._is_uppercase_header(s)
+
+    def _classify_line(self, line: str) -> Tuple[str, Optional[re.Match]]:
+        """
+        Classify a stripped line as "blank", "bullet", "bullet_only",
+        "header" or "text". For "bullet" the match's "text" group is the
+        bullet text after the marker.
+        """
+        if not line:
+            return "blank", None
+        m = self.LINE_RE.match(line)
+        if m is not None:
+            return m.lastgroup, m
+        if self._is_uppercase_header(line):
+            return "header", None
+        return "text", None
+
+    def _is_uppercase_header(self, s: str) -> bool:
+        """More than 80% of the letters are uppercase, in a short line."""
+        if len(s) > self.UPPERCASE_HEADER_MAX_LEN:
+            return False
+        upper = other = 0
+        for c in s:
+            # Letters only: Ⓐ, Ⅻ and friends are uppercase but not alphabetic
+            if c.isalpha():
+                if c.isupper():
+                    upper += 1
+                else:
+                    other += 1
+        return upper > 4 * other
 
     def _extract_bullets_from_text(self, text: str) -> List[BulletPoint]:
-        lines = [(ln or "").rstrip() for ln in (text or "").splitlines()]
+        state = _BulletStateMachine(self)
         bullets: List[BulletPoint] = []
 
-        i = 0
-        while i < len(lines):
-            raw = lines[i]
-            line = raw.strip()
-
-            if not line:
-                i += 1
-                continue
-
-            original_index = i
-            parts: List[str] = []
-            started = False
-
-            # Case 1: bullet + text on same line
-            if self.BULLET_PREFIX_RE.match(line):
-                started = True
-                first = self.BULLET_PREFIX_RE.sub("", line, count=1).strip()
-                if first:
-                    parts.append(first)
-                i += 1
-
-            # Case 2: bullet marker alone
-            elif self.BULLET_ONLY_RE.match(line):
-                started = True
-                i += 1
-
-            if not started:
-                i += 1
-                continue
-
-            # Consume continuation lines
-            while i < len(lines):
-                nxt_raw = lines[i]
-                nxt = nxt_raw.strip()
-
-                if not nxt:
-                    i += 1
-                    break
-
-                if self.BULLET_PREFIX_RE.match(nxt) or self.BULLET_ONLY_RE.match(nxt):
-                    break
-
-                if self._looks_like_header(nxt):
-                    break
-
-                parts.append(nxt)
-                i += 1
-
-            clean_text = " ".join(parts).strip()
-            if not clean_text:
-                continue
-
-            formatting = FormattingInfo(
-                bold=[False] * len(clean_text),
-                italic=[False] * len(clean_text),
-            )
+        with span("bullet_extract"):
+            for line in (text or "").splitlines():
+                bullet = state.feed(line)
+                if bullet is not None:
+                    bullets.append(bullet)
 
-            bullets.append(
-                BulletPoint(
-                    id=str(uuid.uuid4()),
-                    text=clean_text,
-                    formatting=formatting,
-                    original_index=original_index,
-                )
-            )
+            bullet = state.close()
+            if bullet is not None:
+                bullets.append(bullet)
 
         return bullets
 
@@ -200,26 +400,294 @@ class ResumeParser:
     def _extract_formatting_from_paragraph(
         self, paragraph, removed_prefix_len: int, clean_len: int
     ) -> FormattingInfo:
-        bold = []
-        italic = []
+        spans: List[FormattingSpan] = []
+        offset = -removed_prefix_len
 
         for run in paragraph.runs:
             n = len(run.text or "")
-            bold_val = bool(run.bold) if run.bold is not None else False
-            italic_val = bool(run.italic) if run.italic is not None else False
-            bold.extend([bold_val] * n)
-            italic.extend([italic_val] * n)
-
-        bold = bold[removed_prefix_len:]
-        italic = italic[removed_prefix_len:]
-
-        if len(bold) < clean_len:
-            bold.extend([False] * (clean_len - len(bold)))
-        if len(italic) < clean_len:
-            italic.extend([False] * (clean_len - len(italic)))
-
-        return FormattingInfo(
-            bold=bold[:clean_len],
-            italic=italic[:clean_len],
+            start = max(offset, 0)
+            end = min(offset + n, clean_len)
+            offset += n
+
+            style = (bool(run.bold), bool(run.italic))
+            if start >= end or not any(style):
+                continue
+
+            # Merge with the previous span when adjacent runs share a style
+            if spans and spans[-1][1] == start and spans[-1][2:] == style:
+                spans[-1] = (spans[-1][0], end, *style)
+            else:
+                spans.append((start, end, *style))
+
+        return FormattingInfo(spans=spans)
+
+
+class _BulletStateMachine:
+    """
+    Incremental bullet extractor. Lines are fed one at a time; a bullet is
+    returned as soon as the line that ends it (blank line, next bullet or
+    header) arrives, and close() flushes the last one.
+    """
+
+    def __init__(self, parser: ResumeParser) -> None:
+        self._parser = parser
+        self._line_index = 0
+        self._parts: List[str] = []
+        self._spans: List[FormattingSpan] = []
+        self._length = 0
+        self._start_index: Optional[int] = None
+
+    def feed(
+        self, raw_line: str, spans: Sequence[FormattingSpan] = ()
+    ) -> Optional[BulletPoint]:
+        """Feed one line; spans are (start, end, bold, italic) within raw_line."""
+        raw_line = raw_line or ""
+        line = raw_line.strip()
+        indent = len(raw_line) - len(raw_line.lstrip())
+        index = self._line_index
+        self._line_index += 1
+
+        kind, m = self._parser._classify_line(line)
+
+        finished = None
+        if self._start_index is not None:
+            # Consume continuation lines
+            if kind == "blank":
+                return self._finish()
+            if kind == "text":
+                self._append_part(line, spans, indent)
+                return None
+            finished = self._finish()
+
+        # Case 1: bullet + text on same line
+        if kind == "bullet":
+            self._start_index = index
+            self._append_part(m.group("text"), spans, indent + m.start("text"))
+
+        # Case 2: bullet marker alone
+        elif kind == "bullet_only":
+            self._start_index = index
+
+        return finished
+
+    def close(self) -> Optional[BulletPoint]:
+        if self._start_index is None:
+            return None
+        return self._finish()
+
+    def _append_part(
+        self, text: str, spans: Sequence[FormattingSpan], offset: int
+    ) -> None:
+        """Add a line fragment that starts at `offset` in its source line."""
+        joined = bool(self._parts)
+        if joined:
+            self._length += 1  # joining space
+
+        for start, end, bold, italic in spans:
+            start = max(start - offset, 0)
+            end = min(end - offset, len(text))
+            if start < end:
+                span = (self._length + start, self._length + end, bold, italic)
+                _append_span(self._spans, span, after_space=joined and start == 0)
+
+        self._parts.append(text)
+        self._length += len(text)
+
+    def _finish(self) -> Optional[BulletPoint]:
+        clean_text = " ".join(self._parts).strip()
+        original_index = self._start_index
+        formatting = FormattingInfo(spans=self._spans)
+        self._parts = []
+        self._spans = []
+        self._length = 0
+        self._start_index = None
+
+        if not clean_text:
+            return None
+
+        return BulletPoint(
+            id=str(uuid.uuid4()),
+            text=clean_text,
+            formatting=formatting,
+            original_index=original_index,
         )
 
+
+def _append_span(
+    spans: List[FormattingSpan], span: FormattingSpan, after_space: bool = False
+) -> None:
+    """
+    Append a span, extending the previous one if it has the same style and
+    is contiguous, or separated only by a joining space (after_space).
+    """
+    if spans:
+        last = spans[-1]
+        gap = span[0] - last[1]
+        if last[2:] == span[2:] and (gap == 0 or (gap == 1 and after_space)):
+            spans[-1] = (last[0], span[1], *span[2:])
+            return
+    spans.append(span)
+
+
+_worker_parser = ResumeParser()
+
+
+def parse_resume_file(source: ResumeSource, file_type: str) -> List[BulletPoint]:
+    """
+    Parse a resume by file type ("pdf" or "docx"). Module-level so it can be
+    pickled and run inside a worker process.
+    """
+    if file_type == "pdf":
+        return _worker_parser.parse_pdf(source)
+    return _worker_parser.parse_docx(source)
+
+
+def iter_resume_file(
+    source: ResumeSource, file_type: str, expires_at: Optional[float] = None
+) -> Iterator[BulletPoint]:
+    """Streaming counterpart of parse_resume_file."""
+    if file_type == "pdf":
+        return _worker_parser.iter_pdf_bullets(source, expires_at)
+    return _worker_parser.iter_docx_bullets(source, expires_at)
+
+
+def stream_resume_file(
+    source: ResumeSource, file_type: str, sink: Any, expires_at: Optional[float] = None
+) -> int:
+    """
+    Parse a resume in a worker process, putting each bullet on ``sink``
+    (a WorkerPool.queue()) as soon as it is finalized, then None. Returns
+    the number of bullets.
+    """
+    count = 0
+    try:
+        for bullet in iter_resume_file(source, file_type, expires_at):
+            sink.put(bullet)
+            count += 1
+    finally:
+        sink.put(None)
+    return count
+
+
+async def parse_batch(
+    entries: Iterable[BatchEntry],
+    pool: WorkerPool,
+    deadline_seconds: Optional[float] = None,
+    timeout_seconds: Optional[float] = None,
+    max_files: Optional[int] = None,
+    cache: Optional["ParseCache"] = None,
+) -> BatchParseResult:
+    """
+    Parse many resumes on a shared WorkerPool.
+
+    Entries are advanced and read on a thread, one at a time, and only as
+    many files as the pool has workers are held in memory. Files past the
+    deadline or the max_files cap are reported without being read. Names
+    are disambiguated as "name (2).ext"; errors are keyed by name.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + deadline_seconds if deadline_seconds is not None else None
+    result = BatchParseResult()
+    window = asyncio.Semaphore(pool.max_workers)
+    seen: Dict[str, int] = {}
+    tasks = []
+    count = 0
+
+    async def parse_entry(name: str, data: Union[str, bytes], file_type: str) -> None:
+        try:
+            result.results[name] = await _parse_batch_entry(
+                pool, data, file_type, deadline, timeout_seconds, cache
+            )
+        except JobTimeoutError as e:
+            result.errors[name] = str(e)
+        except Exception as e:
+            result.errors[name] = f"Parsing failed: {str(e)}"
+        finally:
+            window.release()
+
+    iterator = iter(entries)
+    try:
+        while True:
+            await window.acquire()
+            entry = await asyncio.to_thread(next, iterator, None)
+            if entry is None:
+                window.release()
+                break
+
+            name, read, error = entry
+            name = unique_filename(name, seen)
+            count += 1
+            file_type = get_file_extension(name)
+            if max_files is not None and count > max_files:
+                error = f"Batch is limited to {max_files} files"
+            elif error is None and file_type not in ("pdf", "docx"):
+                error = "Only PDF and DOCX files are supported"
+            elif error is None and deadline is not None and loop.time() >= deadline:
+                error = "Batch deadline exceeded"
+
+            if error is None:
+                try:
+                    data = await asyncio.to_thread(read)
+                except Exception as e:
+                    error = f"Parsing failed: {str(e)}"
+
+            if error is not None:
+                result.errors[name] = error
+                window.release()
+                continue
+
+            tasks.append(asyncio.ensure_future(parse_entry(name, data, file_type)))
+
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+    return result
+
+
+async def _parse_batch_entry(
+    pool: WorkerPool,
+    data: Union[str, bytes],
+    file_type: str,
+    deadline: Optional[float],
+    timeout_seconds: Optional[float],
+    cache: Optional["ParseCache"],
+) -> List[BulletPoint]:
+    """Parse one batch file on the pool, waiting for a free slot."""
+    loop = asyncio.get_running_loop()
+
+    cache_key = None
+    if cache is not None and isinstance(data, bytes):
+        cache_key = cache.make_key(hashlib.sha256(data).hexdigest(), file_type)
+        cached = await cache.get_async(cache_key)
+        if cached is not None:
+            return cached
+
+    while True:
+        timeout = timeout_seconds
+        if deadline is not None:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise JobTimeoutError("Batch deadline exceeded")
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        try:
+            bullets = await pool.run(parse_resume_file, data, file_type, timeout=timeout)
+            break
+        except JobTimeoutError:
+            # The job's timeout is cut short near the deadline; only report
+            # the batch deadline if that is what actually ran out
+            if deadline is not None and loop.time() >= deadline:
+                raise JobTimeoutError("Batch deadline exceeded")
+            raise JobTimeoutError("Parsing timed out")
+        except PoolSaturatedError:
+            # Shared with interactive uploads; back off instead of failing
+            await asyncio.sleep(0.05)
+
+    if cache_key is not None:
+        await cache.set_async(cache_key, bullets)
+    return bullets
+
+
+def _check_deadline(expires_at: Optional[float]) -> None:
+    if expires_at is not None and time() > expires_at:
+        raise TimeoutError("Parsing timed out")
@@ -0,0 +1,170 @@
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional
+
+from app.models.bin import Bin
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+METRIC_RE = re.compile(r"\d")
+
+# Words that carry no signal for ranking or near-duplicate detection
+STOPWORDS = frozenset(
+    "a an and as at by for from in into of on or the to with was were is are "
+    "our my their its this that these those over via per".split()
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token for English text)."""
+    return math.ceil(len(text) / 4)
+
+
+@dataclass
+class PromptReport:
+    """What the prompt builder kept and left out."""
+
+    estimated_tokens: int = 0
+    included: int = 0
+    dropped_duplicates: List[str] = field(default_factory=list)
+    dropped_for_budget: List[str] = field(default_factory=list)
+
+    @property
+    def dropped(self) -> int:
+        return len(self.dropped_duplicates) + len(self.dropped_for_budget)
+
+
+@dataclass
+class _Candidate:
+    bin_index: int
+    position: int
+    text: str
+    words: FrozenSet[str]
+    score: float
+
+
+class ExperiencePromptBuilder:
+    """
+    Renders the "experiences by category" prompt section within a token
+    budget.
+
+    Near-duplicate bullets (e.g. the same bullet placed in two bins) are
+    collapsed, bullets are ranked within each bin, and bins take turns
+    contributing their best remaining bullet so every category stays
+    represented when the budget runs out.
+    """
+
+    def __init__(
+        self,
+        max_bullet_chars: int = 300,
+        duplicate_threshold: float = 0.8,
+    ) -> None:
+        self.max_bullet_chars = max_bullet_chars
+        self.duplicate_threshold = duplicate_threshold
+
+    def build(self, bins: List[Bin], token_budget: Optional[int] = None):
+        """Return (section_text, PromptReport)."""
+        report = PromptReport()
+        per_bin = self._rank(self._deduplicate(self._candidates(bins), report))
+
+        # Headers are charged up front, and a bin's omission note as soon as
+        # it is certain to need one, so the rendered section stays within
+        # the budget. Costs include the joining newline and assume the
+        # widest number the bin can need.
+        selected: Dict[int, List[_Candidate]] = {i: [] for i in per_bin}
+        used = sum(estimate_tokens(f"\n{self._header(bins[i])}") for i in per_bin)
+        needs_note = {i: len(per_bin[i]) < len(bins[i].bullets) for i in per_bin}
+        note_charged = {i: False for i in per_bin}
+
+        # Round-robin over bins, best bullet first
+        queues = {i: list(candidates) for i, candidates in per_bin.items()}
+        while any(queues.values()):
+            for i in list(queues):
+                if not queues[i]:
+                    continue
+                candidate = queues[i].pop(0)
+                cost = estimate_tokens(f"\n{len(bins[i].bullets)}. {candidate.text}")
+                note_cost = 0
+                if (needs_note[i] or queues[i]) and not note_charged[i]:
+                    note_cost = estimate_tokens(f"\n{self._omitted_note(len(bins[i].bullets))}")
+                if token_budget is not None and used + cost + note_cost > token_budget:
+                    report.dropped_for_budget.append(candidate.text)
+                    needs_note[i] = True
+                    continue
+                selected[i].append(candidate)
+                note_charged[i] = note_charged[i] or note_cost > 0
+                used += cost + note_cost
+
+        lines = []
+        for i, bin in enumerate(bins):
+            chosen = sorted(selected.get(i, []), key=lambda c: c.position)
+            if not chosen:
+                continue
+            lines.append(self._header(bin))
+            for n, candidate in enumerate(chosen, 1):
+                lines.append(f"{n}. {candidate.text}")
+            omitted = len(bin.bullets) - len(chosen)
+            if omitted:
+                lines.append(self._omitted_note(omitted))
+            report.included += len(chosen)
+
+        total = sum(len(bin.bullets) for bin in bins)
+        if lines:
+            text = "\n".join(lines)
+        elif total:
+            text = f"({total} experiences omitted to fit the prompt budget)"
+        else:
+            text = "No experiences categorized yet."
+        report.estimated_tokens = estimate_tokens(text)
+        return text, report
+
+    def _header(self, bin: Bin) -> str:
+        return f"\n=== {bin.label.upper()} ==="
+
+    def _omitted_note(self, omitted: int) -> str:
+        return f"(+{omitted} similar or lower-priority experiences omitted)"
+
+    def _candidates(self, bins: List[Bin]) -> List[_Candidate]:
+        candidates = []
+        for bin_index, bin in enumerate(bins):
+            for position, bullet in enumerate(bin.bullets):
+                text = bullet.text[: self.max_bullet_chars]
+                if len(bullet.text) > self.max_bullet_chars:
+                    text += "..."
+                words = frozenset(WORD_RE.findall(bullet.text.lower())) - STOPWORDS
+                candidates.append(
+                    _Candidate(bin_index, position, text, words, self._score(text, words))
+                )
+        return candidates
+
+    def _score(self, text: str, words: FrozenSet[str]) -> float:
+        """Prefer specific bullets: more distinct content words, and metrics."""
+        score = float(min(len(words), 30))
+        if METRIC_RE.search(text):
+            score += 5
+        return score
+
+    def _deduplicate(
+        self, candidates: List[_Candidate], report: PromptReport
+    ) -> List[_Candidate]:
+        kept: List[_Candidate] = []
+        for candidate in sorted(candidates, key=lambda c: -c.score):
+            if any(self._similar(candidate, other) for other in kept):
+                report.dropped_duplicates.append(candidate.text)
+            else:
+                kept.append(candidate)
+        return kept
+
+    def _similar(self, a: _Candidate, b: _Candidate) -> bool:
+        if not a.words or not b.words:
+            return a.text == b.text
+        overlap = len(a.words & b.words) / len(a.words | b.words)
+        return overlap >= self.duplicate_threshold
+
+    def _rank(self, candidates: List[_Candidate]) -> Dict[int, List[_Candidate]]:
+        per_bin: Dict[int, List[_Candidate]] = {}
+        for candidate in candidates:
+            per_bin.setdefault(candidate.bin_index, []).append(candidate)
+        for ranked in per_bin.values():
+            ranked.sort(key=lambda c: (-c.score, c.position))
+        return per_bin
@@ -0,0 +1,324 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from threading import Lock
+from typing import Any, Awaitable, Callable, Deque, Optional
+
+import httpx
+import openai
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamError(Exception):
+    """An AI upstream failure, classified so callers need not inspect messages."""
+
+    retryable = False
+
+    def __init__(
+        self,
+        message: str,
+        status_code: Optional[int] = None,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class UpstreamAuthError(UpstreamError):
+    """The upstream rejected our credentials (401/403)."""
+
+
+class UpstreamBadRequestError(UpstreamError):
+    """The upstream rejected the request itself (other 4xx)."""
+
+
+class UpstreamRateLimitError(UpstreamError):
+    """The upstream is throttling us (429)."""
+
+    retryable = True
+
+
+class UpstreamTimeoutError(UpstreamError):
+    """The upstream did not answer in time."""
+
+    retryable = True
+
+
+class UpstreamUnavailableError(UpstreamError):
+    """Connection failures and 5xx responses."""
+
+    retryable = True
+
+
+class CircuitOpenError(UpstreamError):
+    """Raised without calling the upstream while the circuit breaker is open."""
+
+    retryable = True
+
+
+def classify_error(error: BaseException) -> Optional[UpstreamError]:
+    """Map an OpenAI/httpx exception to an UpstreamError, or None if unrelated."""
+    if isinstance(error, UpstreamError):
+        return error
+    if isinstance(error, (openai.APITimeoutError, httpx.TimeoutException, asyncio.TimeoutError)):
+        return UpstreamTimeoutError("AI upstream timed out")
+    if isinstance(error, (openai.APIConnectionError, httpx.TransportError)):
+        return UpstreamUnavailableError(f"Could not reach AI upstream: {error}")
+    if isinstance(error, openai.APIStatusError):
+        status = error.status_code
+        message = f"AI upstream returned {status}: {error.message}"
+        if status in (401, 403):
+            return UpstreamAuthError(message, status)
+        if status == 429:
+            return UpstreamRateLimitError(message, status, _retry_after(error.response))
+        if status == 408:
+            return UpstreamTimeoutError(message, status)
+        if status >= 500:
+            return UpstreamUnavailableError(message, status, _retry_after(error.response))
+        return UpstreamBadRequestError(message, status)
+    return None
+
+
+def _retry_after(response: Optional[httpx.Response]) -> Optional[float]:
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, honouring upstream Retry-After."""
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+    ) -> None:
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to wait after the given (zero-based) failed attempt."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+
+class CircuitBreaker:
+    """
+    Fails fast after ``failure_threshold`` consecutive upstream failures.
+
+    Once open, calls are rejected with CircuitOpenError for
+    ``reset_timeout`` seconds; then a single probe call is let through and
+    its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if self._probing or self._clock() - self._opened_at >= self.reset_timeout:
+                return "half_open"
+            return "open"
+
+    def before_call(self) -> bool:
+        """Raise CircuitOpenError or let the call through; True if it is the probe."""
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            remaining = self._opened_at + self.reset_timeout - self._clock()
+            if remaining > 0 or self._probing:
+                raise CircuitOpenError(
+                    "AI upstream is unavailable, failing fast",
+                    retry_after=max(remaining, 1.0),
+                )
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                if self._opened_at is None or self._probing:
+                    logger.warning("AI upstream circuit breaker opened")
+                self._opened_at = self._clock()
+                self._probing = False
+
+    def abandon_probe(self) -> None:
+        """
+        The probe ended without an upstream outcome (cancelled, or failed
+        for an unrelated reason): re-open without counting a failure, so
+        another probe is let through after ``reset_timeout``.
+        """
+        with self._lock:
+            if self._probing:
+                self._opened_at = self._clock()
+                self._probing = False
+
+
+class LatencyTracker:
+    """Sliding window of recent call latencies."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20) -> None:
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """None until enough samples have been seen to be meaningful."""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+class ResilientCaller:
+    """
+    Runs upstream calls with typed errors, retries and a circuit breaker.
+
+    Retryable failures (429, 5xx, timeouts, connection errors) are retried
+    with jittered backoff. In the async path, when ``hedge_percentile`` is
+    set, a second identical request is started if the first has not
+    answered within that latency percentile, and whichever finishes first
+    wins.
+    """
+
+    def __init__(
+        self,
+        retry: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        latency: Optional[LatencyTracker] = None,
+        hedge_percentile: Optional[float] = None,
+    ) -> None:
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.latency = latency or LatencyTracker()
+        self.hedge_percentile = hedge_percentile
+
+    def call(self, fn: Callable[[], Any]) -> Any:
+        for attempt in range(self.retry.max_attempts):
+            probe = self.breaker.before_call()
+            start = time.perf_counter()
+            try:
+                result = fn()
+            except Exception as e:
+                error = self._on_failure(e, attempt, probe)
+                time.sleep(self.retry.delay(attempt, error.retry_after))
+                continue
+            except BaseException:
+                if probe:
+                    self.breaker.abandon_probe()
+                raise
+            self._on_success(time.perf_counter() - start)
+            return result
+
+    async def call_async(
+        self, fn: Callable[[], Awaitable[Any]], hedge: bool = True
+    ) -> Any:
+        for attempt in range(self.retry.max_attempts):
+            probe = self.breaker.before_call()
+            start = time.perf_counter()
+            try:
+                if hedge:
+                    result = await self._hedged(fn)
+                else:
+                    result = await fn()
+            except Exception as e:
+                error = self._on_failure(e, attempt, probe)
+                await asyncio.sleep(self.retry.delay(attempt, error.retry_after))
+                continue
+            except BaseException:
+                # Cancelled mid-call (e.g. the client disconnected): that says
+                # nothing about the upstream, but a half-open probe must not
+                # leave the circuit stuck half-open
+                if probe:
+                    self.breaker.abandon_probe()
+                raise
+            self._on_success(time.perf_counter() - start)
+            return result
+
+    def _on_success(self, elapsed: float) -> None:
+        self.breaker.record_success()
+        self.latency.record(elapsed)
+
+    def _on_failure(self, exc: Exception, attempt: int, probe: bool) -> UpstreamError:
+        """Classify a failure; raise it unless another attempt should be made."""
+        error = classify_error(exc)
+        if error is None:
+            # Not an upstream failure, but the half-open probe still has to
+            # give up its slot
+            if probe:
+                self.breaker.abandon_probe()
+            raise exc
+        if not error.retryable:
+            # The upstream answered, so it is healthy even if we are not
+            self.breaker.record_success()
+            raise error from exc
+
+        self.breaker.record_failure()
+        if attempt + 1 >= self.retry.max_attempts:
+            raise error from exc
+        logger.warning(f"{error} (attempt {attempt + 1}/{self.retry.max_attempts}), retrying")
+        return error
+
+    async def _hedged(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        threshold = (
+            self.latency.percentile(self.hedge_percentile)
+            if self.hedge_percentile is not None
+            else None
+        )
+        if threshold is None:
+            return await fn()
+
+        primary = asyncio.ensure_future(fn())
+        done, _ = await asyncio.wait({primary}, timeout=threshold)
+        if done:
+            return primary.result()
+
+        logger.info(f"AI upstream slower than {threshold:.2f}s, sending hedged request")
+        pending = {primary, asyncio.ensure_future(fn())}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
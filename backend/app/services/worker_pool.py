@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from threading import Lock
+from typing import Any, Callable, Optional
+
+from app.utils.metrics import record_spans, run_captured
+
+logger = logging.getLogger(__name__)
+
+
+class PoolSaturatedError(RuntimeError):
+    """Raised when a job is submitted while the pool is at capacity."""
+
+
+class JobTimeoutError(TimeoutError):
+    """Raised when a job does not finish within its timeout."""
+
+
+class WorkerPool:
+    """
+    Bounded executor for CPU-heavy work that must stay off the event loop.
+
+    At most ``max_workers`` jobs run at once and at most ``max_queue`` more
+    wait for a worker. Anything beyond that is rejected immediately with
+    ``PoolSaturatedError`` instead of piling up behind slow jobs.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        max_queue: int,
+        timeout_seconds: Optional[float] = None,
+        executor_factory: Callable[[int], Executor] = ProcessPoolExecutor,
+    ) -> None:
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout_seconds = timeout_seconds
+        self._executor_factory = executor_factory
+        self._executor: Optional[Executor] = None
+        self._manager = None
+        self._in_flight = 0
+        self._lock = Lock()
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def executor(self) -> Executor:
+        """Lazy initialization so importing the app does not fork workers."""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = self._executor_factory(self.max_workers)
+        return self._executor
+
+    def queue(self):
+        """
+        A queue that jobs can put partial results on while they run, e.g.
+        bullets as they are parsed. Backed by a lazily started manager
+        process, since plain multiprocessing queues cannot be sent to
+        pool workers.
+        """
+        with self._lock:
+            if self._manager is None:
+                self._manager = multiprocessing.Manager()
+            return self._manager.Queue()
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """Submit a job, failing fast if the pool is saturated."""
+        executor = self.executor
+
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                raise PoolSaturatedError(
+                    f"Worker pool is saturated ({self._in_flight}/{self.capacity} jobs)"
+                )
+            self._in_flight += 1
+
+        try:
+            future = executor.submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+
+        # The slot is only freed once the job has really finished (or was
+        # cancelled before starting), so abandoned jobs still count against
+        # capacity while they occupy a worker.
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    async def run(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        timeout: Optional[float] = None,
+        discard: Optional[Callable[[Any], None]] = None,
+    ) -> Any:
+        """
+        Run a job on the pool and await its result without blocking the loop.
+        Spans the job timed in the worker are recorded here.
+
+        If the caller stops waiting (timeout or cancellation) after the job
+        has started, ``discard`` is called with its result once it finishes,
+        e.g. to delete a file nobody will read.
+        """
+        return await self.wait(self.submit(run_captured, fn, *args), timeout, discard)
+
+    async def wait(
+        self,
+        future: Future,
+        timeout: Optional[float] = None,
+        discard: Optional[Callable[[Any], None]] = None,
+    ) -> Any:
+        """
+        The second half of run(), for a job submitted separately as
+        ``submit(run_captured, fn, *args)``, e.g. to fail fast before a
+        response starts.
+        """
+        timeout = self.timeout_seconds if timeout is None else timeout
+
+        try:
+            result, spans = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            self._abandon(future, discard)
+            raise JobTimeoutError(f"Job did not finish within {timeout} seconds")
+        except asyncio.CancelledError:
+            # Client went away; drop the job if it has not started yet.
+            self._abandon(future, discard)
+            raise
+
+        record_spans(spans)
+        return result
+
+    def _abandon(self, future: Future, discard: Optional[Callable[[Any], None]]) -> None:
+        if future.cancel() or discard is None:
+            return
+
+        def on_done(done: Future) -> None:
+            if done.cancelled() or done.exception() is not None:
+                return
+            try:
+                discard(done.result()[0])
+            except Exception as e:
+                logger.warning(f"Discarding an abandoned job's result failed: {e}")
+
+        future.add_done_callback(on_done)
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+            manager, self._manager = self._manager, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+        if manager is not None:
+            manager.shutdown()
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
@@ -0,0 +1,237 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from time import monotonic, time
+from typing import Any, Callable, Dict, Optional
+
+
+class LRUCache:
+    """Thread-safe in-process LRU cache with optional per-entry TTL."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: Optional[float] = None,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= self._clock():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        expires_at = (
+            self._clock() + self.ttl_seconds if self.ttl_seconds is not None else None
+        )
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskCache:
+    """
+    String cache persisted as one file per key, so entries survive restarts
+    and can be shared by workers on the same host.
+
+    Every ``sweep_every`` writes (and on startup) the directory is swept:
+    expired entries are removed, then the oldest until at most
+    ``max_entries`` files and ``max_bytes`` remain. Between sweeps the
+    cache can overshoot by up to ``sweep_every`` entries.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        sweep_every: int = 100,
+    ) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_every = sweep_every
+        self._writes = 0
+        self._lock = Lock()
+        self.sweep()
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        try:
+            if self.ttl_seconds is not None:
+                if path.stat().st_mtime + self.ttl_seconds <= time():
+                    path.unlink(missing_ok=True)
+                    return None
+            return path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    def set(self, key: str, value: str) -> None:
+        # Write then rename so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(value)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+        with self._lock:
+            self._writes += 1
+            due = self._writes % self.sweep_every == 0
+        if due:
+            self.sweep()
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    def sweep(self) -> int:
+        """Remove expired entries, then the oldest beyond the bounds. Returns the count."""
+        entries = []
+        for path in self.directory.glob("*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        now = time()
+        removed = 0
+        total_bytes = sum(size for _, size, _ in entries)
+        for index, (mtime, size, path) in enumerate(entries):
+            remaining = len(entries) - index
+            expired = self.ttl_seconds is not None and mtime + self.ttl_seconds <= now
+            if not (
+                expired
+                or (self.max_entries is not None and remaining > self.max_entries)
+                or (self.max_bytes is not None and total_bytes > self.max_bytes)
+            ):
+                break
+            path.unlink(missing_ok=True)
+            total_bytes -= size
+            removed += 1
+        return removed
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}.json"
+
+
+class TieredCache:
+    """
+    In-process LRU in front of an optional DiskCache, with hit/miss counters.
+
+    Values are kept as objects in memory; serialize/deserialize convert them
+    to and from strings for the disk tier, and ``copy`` is applied on the
+    way in and out so callers never share a cached object. Use
+    get_async/set_async on the event loop: disk I/O then runs on a thread.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: Optional[float] = None,
+        disk_dir: Optional[str] = None,
+        serialize: Callable[[Any], str] = str,
+        deserialize: Callable[[str], Any] = str,
+        copy: Callable[[Any], Any] = lambda value: value,
+        disk_max_bytes: Optional[int] = None,
+    ) -> None:
+        self._memory = LRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._disk = (
+            DiskCache(disk_dir, ttl_seconds=ttl_seconds, max_bytes=disk_max_bytes)
+            if disk_dir
+            else None
+        )
+        self._serialize = serialize
+        self._deserialize = deserialize
+        self._copy = copy
+        self._counts = {"hits": 0, "misses": 0, "memory_hits": 0, "disk_hits": 0}
+        self._lock = Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self._get_memory(key)
+        if value is not None or self._disk is None:
+            return value
+        return self._load_disk(key, self._disk.get(key))
+
+    async def get_async(self, key: str) -> Optional[Any]:
+        value = self._get_memory(key)
+        if value is not None or self._disk is None:
+            return value
+        return self._load_disk(key, await asyncio.to_thread(self._disk.get, key))
+
+    def set(self, key: str, value: Any) -> None:
+        self._memory.set(key, self._copy(value))
+        if self._disk is not None:
+            self._disk.set(key, self._serialize(value))
+
+    async def set_async(self, key: str, value: Any) -> None:
+        self._memory.set(key, self._copy(value))
+        if self._disk is not None:
+            await asyncio.to_thread(self._disk.set, key, self._serialize(value))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._counts)
+        stats["entries"] = len(self._memory)
+        return stats
+
+    def _get_memory(self, key: str) -> Optional[Any]:
+        value = self._memory.get(key)
+        if value is not None:
+            self._count("hits", "memory_hits")
+            return self._copy(value)
+        if self._disk is None:
+            self._count("misses")
+        return None
+
+    def _load_disk(self, key: str, raw: Optional[str]) -> Optional[Any]:
+        if raw is None:
+            self._count("misses")
+            return None
+        value = self._deserialize(raw)
+        self._memory.set(key, self._copy(value))
+        self._count("hits", "disk_hits")
+        return value
+
+    def _count(self, *names: str) -> None:
+        with self._lock:
+            for name in names:
+                self._counts[name] += 1
@@ -1,6 +1,39 @@
+import hashlib
 import os
+import tempfile
+import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Dict, Optional, Union
+
+if TYPE_CHECKING:
+    # Only for annotations, so the filename helpers stay usable in worker
+    # processes without importing the web framework
+    from fastapi import UploadFile
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured maximum size."""
+
+
+@dataclass
+class BufferedUpload:
+    """An upload held in memory, or spilled to a unique temp file if large."""
+
+    data: Optional[bytes]
+    path: Optional[Path]
+    size: int
+    sha256: str
+
+    @property
+    def source(self) -> Union[bytes, str]:
+        return self.data if self.data is not None else str(self.path)
+
+    def cleanup(self) -> None:
+        if self.path is not None:
+            cleanup_file(self.path)
 
 
 def ensure_upload_dir(path: str) -> Path:
@@ -16,8 +49,91 @@ def cleanup_file(file_path: Path) -> None:
         os.remove(file_path)
 
 
+def sweep_old_files(directory: Path, max_age_seconds: float) -> int:
+    """Delete files in directory last modified more than max_age_seconds ago."""
+    cutoff = time.time() - max_age_seconds
+    removed = 0
+    for entry in os.scandir(directory):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except FileNotFoundError:
+            continue  # removed concurrently, e.g. by its own request
+    return removed
+
+
+def unique_filename(name: str, seen: Dict[str, int]) -> str:
+    """Disambiguate repeated names as "name (2).ext", tracking counts in seen."""
+    seen[name] = seen.get(name, 0) + 1
+    if seen[name] == 1:
+        return name
+    stem, dot, ext = name.rpartition(".")
+    if not dot:
+        return f"{name} ({seen[name]})"
+    return f"{stem} ({seen[name]}).{ext}"
+
+
 def get_file_extension(filename: str) -> Optional[str]:
     """Get file extension from filename."""
     if "." in filename:
         return filename.rsplit(".", 1)[1].lower()
     return None
+
+
+async def read_upload(
+    upload: "UploadFile",
+    spill_dir: Path,
+    spill_threshold: int,
+    max_size: int,
+) -> BufferedUpload:
+    """
+    Stream an upload into memory, spilling to a uniquely named file in
+    spill_dir once it grows past spill_threshold bytes.
+    """
+    buffer = bytearray()
+    spill_file = None
+    size = 0
+    digest = hashlib.sha256()
+
+    try:
+        while True:
+            chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+
+            size += len(chunk)
+            if size > max_size:
+                raise UploadTooLargeError(
+                    f"File exceeds maximum upload size of {max_size} bytes"
+                )
+            digest.update(chunk)
+
+            if spill_file is not None:
+                spill_file.write(chunk)
+                continue
+
+            buffer += chunk
+            if len(buffer) > spill_threshold:
+                suffix = Path(upload.filename or "").suffix
+                spill_file = tempfile.NamedTemporaryFile(
+                    dir=spill_dir, suffix=suffix, delete=False
+                )
+                spill_file.write(buffer)
+                buffer = bytearray()
+    except BaseException:
+        if spill_file is not None:
+            spill_file.close()
+            cleanup_file(Path(spill_file.name))
+        raise
+
+    if spill_file is not None:
+        spill_file.close()
+        return BufferedUpload(
+            data=None, path=Path(spill_file.name), size=size, sha256=digest.hexdigest()
+        )
+
+    return BufferedUpload(
+        data=bytes(buffer), path=None, size=size, sha256=digest.hexdigest()
+    )
+
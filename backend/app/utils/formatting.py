@@ -1,44 +1,37 @@
 from typing import List
+from xml.sax.saxutils import escape
 
+from app.models.bullet_point import FormattingSpan
 
-def merge_formatting_spans(bold: List[bool], italic: List[bool], text: str) -> str:
+
+def merge_formatting_spans(spans: List[FormattingSpan], text: str) -> str:
     """
-    Convert character-level formatting to HTML-like spans.
-    Returns formatted string with <b> and <i> tags.
+    Convert formatting spans to HTML-like markup.
+    Returns escaped string with <b> and <i> tags.
     """
     if not text:
         return ""
 
     result = []
-    in_bold = False
-    in_italic = False
+    pos = 0
 
-    for i, char in enumerate(text):
-        is_bold = bold[i] if i < len(bold) else False
-        is_italic = italic[i] if i < len(italic) else False
+    for start, end, is_bold, is_italic in spans:
+        start = max(start, pos)
+        end = min(end, len(text))
+        if start >= end:
+            continue
 
-        # Handle bold transitions
-        if is_bold and not in_bold:
+        result.append(escape(text[pos:start]))
+        if is_bold:
             result.append("<b>")
-            in_bold = True
-        elif not is_bold and in_bold:
-            result.append("</b>")
-            in_bold = False
-
-        # Handle italic transitions
-        if is_italic and not in_italic:
+        if is_italic:
             result.append("<i>")
-            in_italic = True
-        elif not is_italic and in_italic:
+        result.append(escape(text[start:end]))
+        if is_italic:
             result.append("</i>")
-            in_italic = False
-
-        result.append(char)
-
-    # Close any remaining tags
-    if in_italic:
-        result.append("</i>")
-    if in_bold:
-        result.append("</b>")
+        if is_bold:
+            result.append("</b>")
+        pos = end
 
+    result.append(escape(text[pos:]))
     return "".join(result)
@@ -0,0 +1,134 @@
+import json
+import re
+from typing import Any, List, Optional, Tuple
+
+JSONPath = Tuple[Any, ...]
+
+# Characters that matter while scanning inside a JSON string
+_STRING_SPECIAL_RE = re.compile(r'["\\]')
+
+
+class _Frame:
+    __slots__ = ("kind", "path", "start", "key", "expecting")
+
+    def __init__(self, kind: str, path: JSONPath, start: int) -> None:
+        self.kind = kind  # "{" or "["
+        self.path = path
+        self.start = start
+        self.key: Any = 0 if kind == "[" else None
+        self.expecting = "value" if kind == "[" else "key"
+
+
+class IncrementalJSONParser:
+    """
+    Incremental parser for a single JSON object arriving in chunks.
+
+    feed() returns (path, value) for every value no deeper than max_depth
+    that became complete in that chunk, e.g. (("bullets", 0), "...") as
+    soon as the first bullet string is closed. Anything before the first
+    "{" (such as a markdown code fence) is ignored.
+    """
+
+    def __init__(self, max_depth: int = 2) -> None:
+        self.max_depth = max_depth
+        self._buf = ""
+        self._pos = 0
+        self._started = False
+        self._done = False
+        self._stack: List[_Frame] = []
+        self._in_string = False
+        self._string_start = 0
+        self._scalar_start: Optional[int] = None
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    @property
+    def text(self) -> str:
+        """The JSON text consumed so far, starting at the opening brace."""
+        return self._buf
+
+    def feed(self, chunk: str) -> List[Tuple[JSONPath, Any]]:
+        events: List[Tuple[JSONPath, Any]] = []
+        if self._done or not chunk:
+            return events
+
+        if not self._started:
+            brace = chunk.find("{")
+            if brace < 0:
+                return events
+            chunk = chunk[brace:]
+            self._started = True
+
+        self._buf += chunk
+        buf = self._buf
+        i = self._pos
+
+        while i < len(buf) and not self._done:
+            if self._in_string:
+                m = _STRING_SPECIAL_RE.search(buf, i)
+                if m is None:
+                    i = len(buf)
+                    break
+                if m.group() == "\\":
+                    if m.end() >= len(buf):
+                        # Escape split across chunks; wait for more input
+                        i = m.start()
+                        break
+                    i = m.end() + 1
+                    continue
+                self._in_string = False
+                i = m.end()
+                self._string_done(self._string_start, i, events)
+                continue
+
+            c = buf[i]
+
+            if self._scalar_start is not None and (c in ",}]" or c.isspace()):
+                self._value_done(self._scalar_start, i, events)
+                self._scalar_start = None
+
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+            elif c in "{[":
+                path = self._stack[-1].path + (self._stack[-1].key,) if self._stack else ()
+                self._stack.append(_Frame(c, path, i))
+            elif c in "}]":
+                frame = self._stack.pop()
+                if self._stack:
+                    self._value_done(frame.start, i + 1, events)
+                else:
+                    self._done = True
+            elif c == ":":
+                self._stack[-1].expecting = "value"
+            elif c == ",":
+                frame = self._stack[-1]
+                if frame.kind == "[":
+                    frame.key += 1
+                    frame.expecting = "value"
+                else:
+                    frame.expecting = "key"
+            elif not c.isspace() and self._scalar_start is None:
+                self._scalar_start = i
+
+            i += 1
+
+        self._pos = i
+        return events
+
+    def _string_done(self, start: int, end: int, events) -> None:
+        frame = self._stack[-1]
+        if frame.kind == "{" and frame.expecting == "key":
+            frame.key = json.loads(self._buf[start:end])
+            frame.expecting = "colon"
+        else:
+            self._value_done(start, end, events)
+
+    def _value_done(self, start: int, end: int, events) -> None:
+        frame = self._stack[-1]
+        path = frame.path + (frame.key,)
+        frame.expecting = "comma"
+        if len(path) <= self.max_depth:
+            events.append((path, json.loads(self._buf[start:end])))
@@ -0,0 +1,224 @@
+"""
+In-process counters and histograms, rendered in the Prometheus text format.
+
+Recording is a lock, a dict lookup and (for histograms) a bisect, so the
+instrumentation stays on in production. Work done in worker processes is
+timed with the same ``span`` calls; WorkerPool ships those timings back
+with the job's result (see ``run_captured``) and records them here.
+"""
+from bisect import bisect_left
+from contextvars import ContextVar
+from functools import wraps
+from threading import Lock
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+SpanRecord = Tuple[str, float]
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        with self._lock:
+            return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = dict(self._values)
+        if not values and not self.labelnames:
+            values[()] = 0.0
+        for labels, value in values.items():
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last is +Inf), sum, count]
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+        self._lock = Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *labels: str) -> int:
+        with self._lock:
+            series = self._series.get(labels)
+            return series[2] if series is not None else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: (list(s[0]), s[1], s[2]) for labels, s in self._series.items()}
+
+        names = self.labelnames + ("le",)
+        for labels, (counts, total, count) in series.items():
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                lines.append(f"{self.name}_bucket{_labels(names, labels + (le,))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Any] = {}
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.histogram(
+    "app_stage_duration_seconds",
+    "Time spent in instrumented hot-path stages.",
+    labelnames=("stage",),
+)
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency, until the response body is fully sent.",
+    labelnames=("method", "route", "status"),
+)
+RATE_LIMIT_REJECTIONS = registry.counter(
+    "rate_limit_rejections_total",
+    "Requests rejected by the rate limiter.",
+    labelnames=("policy",),
+)
+
+# Set by run_captured: spans are collected for the caller instead of recorded
+_captured: ContextVar[Optional[List[SpanRecord]]] = ContextVar("captured_spans", default=None)
+
+
+class span:
+    """
+    Context manager timing one stage into STAGE_SECONDS:
+
+        with span("pdf_build"):
+            doc.build(story)
+    """
+
+    __slots__ = ("stage", "_start")
+
+    def __init__(self, stage: str) -> None:
+        self.stage = stage
+
+    def __enter__(self) -> "span":
+        self._start = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        record_span(self.stage, perf_counter() - self._start)
+
+
+def timed(stage: str) -> Callable:
+    """Decorator form of span, timing every call of a function."""
+
+    def decorator(fn: Callable) -> Callable:
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def record_span(stage: str, elapsed: float) -> None:
+    """Record a stage timed by hand, e.g. summed across a generator's steps."""
+    captured = _captured.get()
+    if captured is not None:
+        captured.append((stage, elapsed))
+    else:
+        STAGE_SECONDS.observe(elapsed, stage)
+
+
+def run_captured(fn: Callable[..., Any], *args: Any) -> Tuple[Any, List[SpanRecord]]:
+    """
+    Run fn and return its result with the spans it timed, instead of
+    recording them. Module-level so it can be sent to a worker process.
+    """
+    spans: List[SpanRecord] = []
+    token = _captured.set(spans)
+    try:
+        result = fn(*args)
+    finally:
+        _captured.reset(token)
+    return result, spans
+
+
+def record_spans(spans: Sequence[SpanRecord]) -> None:
+    for stage, elapsed in spans:
+        STAGE_SECONDS.observe(elapsed, stage)
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return repr(float(value))
@@ -0,0 +1,72 @@
+import io
+import zipfile
+from functools import partial
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterator, Optional, Tuple, Union
+
+
+class _Sink(io.RawIOBase):
+    """Unseekable write target that hands back whatever was written since the last drain."""
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+class ZipStream:
+    """
+    Builds a ZIP archive incrementally for streaming responses.
+
+    Each add_* call returns the archive bytes produced by that member, so
+    only one member is ever held in memory and nothing needs to seek.
+    close() returns the trailing central directory.
+    """
+
+    def __init__(self, compression: int = zipfile.ZIP_DEFLATED) -> None:
+        self._sink = _Sink()
+        self._zip = zipfile.ZipFile(self._sink, "w", compression=compression)
+
+    def add_file(self, path: Union[str, Path], arcname: str) -> bytes:
+        self._zip.write(path, arcname)
+        return self._sink.drain()
+
+    def add_bytes(self, data: bytes, arcname: str) -> bytes:
+        self._zip.writestr(arcname, data)
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        self._zip.close()
+        return self._sink.drain()
+
+
+def iter_zip_members(
+    archive: Union[str, BinaryIO], max_member_size: int
+) -> Iterator[Tuple[str, Optional[Callable[[], bytes]], Optional[str]]]:
+    """
+    Lazily yield (name, read, error) for each file in a zip archive.
+
+    Only the central directory is walked; a member is decompressed when its
+    read() is called, which must happen before the iterator moves on.
+    Members larger than max_member_size are reported with an error instead.
+    """
+    with zipfile.ZipFile(archive) as zf:
+        for info in zf.infolist():
+            if info.is_dir():
+                continue
+            if info.file_size > max_member_size:
+                yield info.filename, None, (
+                    f"File exceeds maximum upload size of {max_member_size} bytes"
+                )
+                continue
+            yield info.filename, partial(zf.read, info), None
@@ -0,0 +1,76 @@
+"""
+Cohort report over many analyses: a per-analysis loop through
+AnalyticsService against CohortFrame + CohortAnalyticsService.
+
+    cd backend && python -m benchmarks.cohort_analytics --results 100000
+"""
+import argparse
+import random
+import time
+from datetime import datetime
+from typing import Dict, List
+
+from app.models.analysis import AnalysisResult, Analytics
+from app.models.bin import Bin
+from app.models.bullet_point import BulletPoint, FormattingInfo
+from app.services.analytics import AnalyticsService
+from app.services.cohort_analytics import CohortAnalyticsService, CohortFrame
+
+LABELS = ["Interests", "Skillset", "Values", "Strengths", "Experience", "Goals"]
+
+
+def make_results(count: int, seed: int = 0) -> List[AnalysisResult]:
+    rng = random.Random(seed)
+    bullet = BulletPoint(id="b", text="x", formatting=FormattingInfo(spans=[]), original_index=0)
+    analytics = Analytics(distribution=[], top_category="None", suggestions=[])
+    results = []
+    for _ in range(count):
+        bins = [
+            Bin(id=f"bin{b}", label=LABELS[b], color="#000", bullets=[bullet] * rng.randint(0, 12))
+            for b in range(rng.randint(3, len(LABELS)))
+        ]
+        results.append(
+            AnalysisResult(bins=bins, analytics=analytics, timestamp=datetime(2024, 1, 1))
+        )
+    return results
+
+
+def per_analysis(results: List[AnalysisResult]) -> Dict[str, int]:
+    """What a caller had to do before: recompute each analysis and tally."""
+    service = AnalyticsService()
+    top: Dict[str, int] = {}
+    for result in results:
+        analytics = service.calculate_analytics(result.bins)
+        if analytics.top_category != "None":
+            top[analytics.top_category] = top.get(analytics.top_category, 0) + 1
+    return top
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--results", type=int, default=100000)
+    args = parser.parse_args()
+
+    results = make_results(args.results)
+
+    start = time.perf_counter()
+    expected = per_analysis(results)
+    loop = time.perf_counter() - start
+
+    start = time.perf_counter()
+    frame = CohortFrame.from_results(results)
+    load = time.perf_counter() - start
+    start = time.perf_counter()
+    report = CohortAnalyticsService().summarize(frame)
+    summarize = time.perf_counter() - start
+
+    assert report.top_categories == expected
+    print(f"{args.results} analyses")
+    print(f"{'per-analysis loop':<22}{loop:>8.2f}s")
+    print(f"{'frame load':<22}{load:>8.2f}s")
+    print(f"{'vectorized summary':<22}{summarize:>8.2f}s")
+    print(f"{'speedup':<22}{loop / (load + summarize):>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
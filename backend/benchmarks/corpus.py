@@ -0,0 +1,265 @@
+"""
+Synthetic resume corpus for the benchmarks: PDF and DOCX resumes of
+varied sizes, bullet markers and formatting densities.
+
+    cd backend && python -m benchmarks.corpus --out /tmp/corpus
+
+Every resume is generated from a ResumeSpec and a seed, so the corpus is
+identical from run to run. PDFs use the Vera fonts bundled with
+reportlab, which only draw the "•" and "–" glyphs among the special
+markers; DOCX resumes use every marker ResumeParser recognizes, plus
+Word's own list numbering.
+"""
+import argparse
+import os
+import random
+from dataclasses import dataclass
+from datetime import datetime
+from io import BytesIO
+from typing import Iterator, List, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+import reportlab
+from docx import Document
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
+from app.models.analysis import AnalysisResult
+from app.models.bin import Bin
+from app.models.bullet_point import BulletPoint, FormattingInfo
+from app.services.analytics import AnalyticsService
+
+# (sections, bullets per section)
+SIZES = {"small": (3, 3), "medium": (5, 8), "large": (8, 20)}
+FORMATTING_DENSITIES = (0.0, 0.1, 0.3)
+
+# One marker per BULLET_PATTERNS entry; "word" is a Word list paragraph
+MARKER_NAMES = {
+    "•": "bullet",
+    "●": "circle",
+    "▪": "square",
+    "○": "ring",
+    "-": "dash",
+    "–": "endash",
+    "*": "star",
+    "1.": "numbered",
+    "\uf0b7": "wingdings",
+    "word": "word",
+}
+DOCX_MARKERS = tuple(MARKER_NAMES)
+PDF_MARKERS = ("•", "-", "–", "*", "1.")
+
+SECTIONS = [
+    "EXPERIENCE",
+    "Education",
+    "Projects",
+    "SKILLS",
+    "Leadership",
+    "Awards:",
+    "Volunteer Experience",
+    "Publications",
+]
+VERBS = ["Built", "Led", "Designed", "Shipped", "Reduced", "Mentored", "Automated", "Launched"]
+WORDS = (
+    "a team of engineers to deliver the new data pipeline reducing latency by "
+    "percent across services with python kubernetes and postgres for customers "
+    "while improving reliability test coverage and onboarding documentation"
+).split()
+
+
+@dataclass(frozen=True)
+class ResumeSpec:
+    size: str
+    marker: str
+    formatting_density: float  # fraction of words set in bold or italic
+    seed: int = 0
+
+    @property
+    def name(self) -> str:
+        marker = MARKER_NAMES[self.marker]
+        return f"{self.size}-{marker}-{int(self.formatting_density * 100)}-{self.seed}"
+
+    @property
+    def bullet_count(self) -> int:
+        sections, bullets = SIZES[self.size]
+        return sections * bullets
+
+
+def iter_specs(
+    markers: Sequence[str], seeds: int = 1, sizes: Sequence[str] = tuple(SIZES)
+) -> Iterator[ResumeSpec]:
+    """Every marker and formatting density at each size."""
+    combos = [(m, d) for m in markers for d in FORMATTING_DENSITIES]
+    for size in sizes:
+        for seed in range(seeds):
+            for marker, density in combos:
+                yield ResumeSpec(size, marker, density, seed)
+
+
+def resume_sections(spec: ResumeSpec) -> List[Tuple[str, List[List[Tuple[str, str]]]]]:
+    """
+    (heading, bullets) per section. Each bullet is a list of (word, style)
+    pairs, style being "", "b" or "i".
+    """
+    rng = random.Random(spec.name)
+    sections, bullets = SIZES[spec.size]
+    result = []
+    for heading in SECTIONS[:sections]:
+        items = []
+        for _ in range(bullets):
+            words = [rng.choice(VERBS)] + [rng.choice(WORDS) for _ in range(rng.randint(8, 24))]
+            items.append(
+                [
+                    (word, rng.choice("bi") if rng.random() < spec.formatting_density else "")
+                    for word in words
+                ]
+            )
+        result.append((heading, items))
+    return result
+
+
+def resume_text(spec: ResumeSpec) -> str:
+    """Plain-text rendering, as _extract_bullets_from_text would receive it."""
+    lines = ["Jordan Smith", "jordan@example.com | (555) 555-0100", ""]
+    for heading, items in resume_sections(spec):
+        lines.append(heading)
+        for n, words in enumerate(items, 1):
+            lines.append(f"{_marker(spec.marker, n)} {' '.join(w for w, _ in words)}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def make_pdf(spec: ResumeSpec) -> bytes:
+    if spec.marker not in PDF_MARKERS:
+        raise ValueError(f"Marker {spec.marker!r} cannot be drawn in a generated PDF")
+    _register_fonts()
+    body = ParagraphStyle("Body", fontName="Vera", fontSize=10, leading=13)
+    heading = ParagraphStyle("Heading", parent=body, fontName="Vera-Bold", fontSize=12, leading=16)
+
+    story = [Paragraph("Jordan Smith", heading), Paragraph("jordan@example.com", body)]
+    for title, items in resume_sections(spec):
+        story += [Spacer(1, 6), Paragraph(escape(title), heading)]
+        for n, words in enumerate(items, 1):
+            markup = " ".join(_markup(word, style) for word, style in words)
+            story.append(Paragraph(f"{escape(_marker(spec.marker, n))} {markup}", body))
+
+    buffer = BytesIO()
+    SimpleDocTemplate(buffer).build(story)
+    return buffer.getvalue()
+
+
+def make_docx(spec: ResumeSpec) -> bytes:
+    doc = Document()
+    doc.add_paragraph("Jordan Smith")
+    doc.add_paragraph("jordan@example.com | (555) 555-0100")
+    for title, items in resume_sections(spec):
+        doc.add_paragraph(title)
+        for n, words in enumerate(items, 1):
+            if spec.marker == "word":
+                paragraph = doc.add_paragraph(style="List Bullet")
+            else:
+                paragraph = doc.add_paragraph(f"{_marker(spec.marker, n)} ")
+            for style, text in _runs(words):
+                run = paragraph.add_run(text)
+                run.bold = style == "b"
+                run.italic = style == "i"
+
+    buffer = BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def make_analysis(spec: ResumeSpec) -> AnalysisResult:
+    """The resume's bullets sorted into one bin per section, with analytics."""
+    bins = []
+    for b, (title, items) in enumerate(resume_sections(spec)):
+        bullets = []
+        for i, words in enumerate(items):
+            spans, offset = [], 0
+            for style, text in _runs(words):
+                if style:
+                    spans.append((offset, offset + len(text), style == "b", style == "i"))
+                offset += len(text)
+            bullets.append(
+                BulletPoint(
+                    id=f"{b}-{i}",
+                    text=" ".join(word for word, _ in words),
+                    formatting=FormattingInfo(spans=spans),
+                    original_index=i,
+                )
+            )
+        bins.append(Bin(id=f"bin{b}", label=title.rstrip(":").title(), color="#3B82F6", bullets=bullets))
+    return AnalysisResult(
+        bins=bins,
+        analytics=AnalyticsService().calculate_analytics(bins),
+        timestamp=datetime(2024, 1, 1),
+    )
+
+
+def generate_corpus(
+    file_type: str, seeds: int = 1, sizes: Sequence[str] = tuple(SIZES)
+) -> List[Tuple[ResumeSpec, bytes]]:
+    """All specs for one file type ("pdf" or "docx") with their documents."""
+    if file_type == "pdf":
+        return [(spec, make_pdf(spec)) for spec in iter_specs(PDF_MARKERS, seeds, sizes)]
+    return [(spec, make_docx(spec)) for spec in iter_specs(DOCX_MARKERS, seeds, sizes)]
+
+
+def _marker(marker: str, n: int) -> str:
+    if marker == "word":
+        return "•"
+    return f"{n}." if marker == "1." else marker
+
+
+def _runs(words: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """Merge consecutive same-style words into (style, text) runs."""
+    runs: List[Tuple[str, str]] = []
+    for i, (word, style) in enumerate(words):
+        text = word if i == 0 else f" {word}"
+        if runs and runs[-1][0] == style:
+            runs[-1] = (style, runs[-1][1] + text)
+        else:
+            runs.append((style, text))
+    return runs
+
+
+def _markup(word: str, style: str) -> str:
+    word = escape(word)
+    return f"<{style}>{word}</{style}>" if style else word
+
+
+def _register_fonts() -> None:
+    if "Vera" in pdfmetrics.getRegisteredFontNames():
+        return
+    fonts = os.path.join(os.path.dirname(reportlab.__file__), "fonts")
+    # Names carry Bold/Oblique so the parser's font-name detection sees them
+    for name, filename in (
+        ("Vera", "Vera.ttf"),
+        ("Vera-Bold", "VeraBd.ttf"),
+        ("Vera-Oblique", "VeraIt.ttf"),
+        ("Vera-BoldOblique", "VeraBI.ttf"),
+    ):
+        pdfmetrics.registerFont(TTFont(name, os.path.join(fonts, filename)))
+    pdfmetrics.registerFontFamily(
+        "Vera", normal="Vera", bold="Vera-Bold", italic="Vera-Oblique", boldItalic="Vera-BoldOblique"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--seeds", type=int, default=1)
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    for file_type in ("pdf", "docx"):
+        for spec, data in generate_corpus(file_type, args.seeds):
+            with open(os.path.join(args.out, f"{spec.name}.{file_type}"), "wb") as f:
+                f.write(data)
+    print(f"Wrote corpus to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Per-export CPU time for ExportService.export_to_pdf, with the report
+template rebuilt for every export (the old behaviour) and shared.
+
+    cd backend && python -m benchmarks.export_pdf --exports 50
+"""
+import argparse
+import time
+from datetime import datetime
+
+from app.models.analysis import AnalysisResult, Analytics, Distribution
+from app.models.bin import Bin
+from app.models.bullet_point import BulletPoint, FormattingInfo
+from app.services.export import ExportService, report_template
+
+
+def make_result(bullets_per_bin: int, bins: int = 4) -> AnalysisResult:
+    result_bins = [
+        Bin(
+            id=f"bin{b}",
+            label=f"Category {b}",
+            color="#3B82F6",
+            bullets=[
+                BulletPoint(
+                    id=f"{b}-{i}",
+                    text=f"Led a team of {i + 2} to ship feature {i}, cutting costs by {i}%",
+                    formatting=FormattingInfo(spans=[(0, 3, True, False)]),
+                    original_index=i,
+                )
+                for i in range(bullets_per_bin)
+            ],
+        )
+        for b in range(bins)
+    ]
+    return AnalysisResult(
+        bins=result_bins,
+        analytics=Analytics(
+            distribution=[
+                Distribution(bin_id=b.id, count=bullets_per_bin, percentage=100 / bins)
+                for b in result_bins
+            ],
+            top_category="Category 0",
+            suggestions=["Balance your categories", "Quantify more outcomes"],
+        ),
+        timestamp=datetime(2024, 1, 1),
+    )
+
+
+def cpu_ms_per_export(result: AnalysisResult, exports: int, shared: bool) -> float:
+    service = ExportService()
+    service.export_to_pdf(result)  # warm up imports and font metrics
+    start = time.process_time()
+    for _ in range(exports):
+        if not shared:
+            report_template.cache_clear()
+        service.export_to_pdf(result)
+    return (time.process_time() - start) / exports * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--exports", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'report':<16}{'rebuilt ms':>12}{'shared ms':>12}{'saved':>8}")
+    for name, bullets in (("small (4x2)", 2), ("medium (4x10)", 10), ("large (4x50)", 50)):
+        result = make_result(bullets)
+        rebuilt = cpu_ms_per_export(result, args.exports, shared=False)
+        shared = cpu_ms_per_export(result, args.exports, shared=True)
+        print(f"{name:<16}{rebuilt:>12.2f}{shared:>12.2f}{1 - shared / rebuilt:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
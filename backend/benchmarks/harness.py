@@ -0,0 +1,131 @@
+"""
+Timing, memory and baseline helpers shared by the benchmark suite.
+
+Each case runs in a fresh process so its peak RSS is its own. Results are
+saved as JSON and can be compared against a saved baseline; a case
+regresses when its p95 latency or peak RSS grows, or its throughput
+drops, by more than the tolerance.
+"""
+import json
+import platform
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+@dataclass
+class Measurement:
+    name: str
+    unit: str
+    calls: int
+    throughput: float  # units per second
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    peak_rss_mb: Optional[float]
+
+
+def percentile(ordered: Sequence[float], p: float) -> float:
+    """Nearest-rank percentile of already sorted values, p in [0, 1]."""
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far."""
+    # ru_maxrss survives exec on Linux, so a spawned worker would report
+    # its parent's peak; VmHWM starts fresh with the new process image
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def measure(
+    name: str,
+    unit: str,
+    fn: Callable[[Any], Any],
+    items: Sequence[Any],
+    repeat: int = 1,
+) -> Measurement:
+    """Call fn once per item, ``repeat`` times over, after one warm-up call."""
+    fn(items[0])
+    latencies: List[float] = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for item in items:
+            t = time.perf_counter()
+            fn(item)
+            latencies.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return Measurement(
+        name=name,
+        unit=unit,
+        calls=len(latencies),
+        throughput=len(latencies) / elapsed,
+        p50_ms=percentile(latencies, 0.50) * 1000,
+        p95_ms=percentile(latencies, 0.95) * 1000,
+        p99_ms=percentile(latencies, 0.99) * 1000,
+        peak_rss_mb=peak_rss_mb(),
+    )
+
+
+def save_results(path: str, results: Dict[str, Measurement], quick: bool) -> None:
+    data = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "quick": quick,
+        "cases": {name: asdict(m) for name, m in results.items()},
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        data = json.load(f)
+    data["cases"] = {name: Measurement(**m) for name, m in data["cases"].items()}
+    return data
+
+
+def compare(
+    results: Dict[str, Measurement],
+    baseline: Dict[str, Measurement],
+    tolerance: float,
+) -> List[str]:
+    """Regressions against the baseline, one message each; empty if none."""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if current.p95_ms > base.p95_ms * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base.p95_ms:.2f}ms -> {current.p95_ms:.2f}ms")
+        if current.throughput < base.throughput * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {base.throughput:.1f} -> {current.throughput:.1f} {current.unit}/s"
+            )
+        if (
+            current.peak_rss_mb is not None
+            and base.peak_rss_mb is not None
+            and current.peak_rss_mb > base.peak_rss_mb * (1 + tolerance)
+        ):
+            regressions.append(
+                f"{name}: peak RSS {base.peak_rss_mb:.0f}MB -> {current.peak_rss_mb:.0f}MB"
+            )
+    return regressions
@@ -0,0 +1,60 @@
+"""
+Cost of the always-on instrumentation: one span, and the metrics
+middleware around a trivial ASGI app.
+
+    cd backend && python -m benchmarks.metrics_overhead --iterations 200000
+"""
+import argparse
+import asyncio
+import time
+
+from app.middleware.metrics import MetricsMiddleware
+from app.utils.metrics import span
+
+
+async def ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def drive(app, requests: int) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/api/ping", "headers": []}
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=200000)
+    args = parser.parse_args()
+    n = args.iterations
+
+    start = time.perf_counter()
+    for _ in range(n):
+        pass
+    empty = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(n):
+        with span("benchmark"):
+            pass
+    spans = time.perf_counter() - start - empty
+
+    bare = asyncio.run(drive(ok_app, n))
+    wrapped = asyncio.run(drive(MetricsMiddleware(ok_app), n))
+
+    print(f"{'span':<24}{spans / n * 1e9:>8.0f} ns")
+    print(f"{'middleware per request':<24}{(wrapped - bare) / n * 1e9:>8.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Line throughput of the text bullet extractor, using the single-pass line
+classifier against the previous per-line regex and header checks.
+
+    cd backend && python -m benchmarks.parser_lines --resumes 2000
+"""
+import argparse
+import random
+import time
+from typing import List, Optional, Sequence
+
+from app.models.bullet_point import BulletPoint, FormattingSpan
+from app.services.parser import ResumeParser, _BulletStateMachine
+
+SECTIONS = ["EDUCATION", "Work Experience", "Projects", "SKILLS", "Leadership:"]
+MARKERS = ["•", "-", "*", "1.", "●"]
+
+
+def make_text(resumes: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    words = "led built shipped team of engineers reducing latency by percent across services".split()
+    lines: List[str] = []
+    for _ in range(resumes):
+        lines += ["Jane Doe", "jane@example.com | (555) 555-5555", ""]
+        for section in SECTIONS:
+            lines.append(section)
+            for _ in range(rng.randint(2, 6)):
+                text = " ".join(rng.choice(words) for _ in range(rng.randint(6, 14)))
+                lines.append(f"  {rng.choice(MARKERS)} {text.capitalize()}")
+                for _ in range(rng.randint(0, 2)):
+                    lines.append("    " + " ".join(rng.choice(words) for _ in range(8)))
+            lines.append("")
+    return "\n".join(lines)
+
+
+class LegacyParser(ResumeParser):
+    """Header check as it was before the line classifier."""
+
+    def _looks_like_header(self, line: str) -> bool:
+        s = (line or "").strip()
+        if not s:
+            return False
+
+        letters = [c for c in s if c.isalpha()]
+        if letters:
+            uppercase_ratio = sum(c.isupper() for c in letters) / len(letters)
+            if uppercase_ratio > 0.8 and len(s) <= 50:
+                return True
+
+        if s.endswith(":") and len(s) <= 60:
+            return True
+
+        return False
+
+
+class LegacyStateMachine(_BulletStateMachine):
+    """feed() as it was: prefix/only regexes and the header check per line."""
+
+    def feed(
+        self, raw_line: str, spans: Sequence[FormattingSpan] = ()
+    ) -> Optional[BulletPoint]:
+        raw_line = raw_line or ""
+        line = raw_line.strip()
+        indent = len(raw_line) - len(raw_line.lstrip())
+        index = self._line_index
+        self._line_index += 1
+
+        finished = None
+        if self._start_index is not None:
+            if not line:
+                return self._finish()
+
+            if (
+                self._parser.BULLET_PREFIX_RE.match(line)
+                or self._parser.BULLET_ONLY_RE.match(line)
+                or self._parser._looks_like_header(line)
+            ):
+                finished = self._finish()
+            else:
+                self._append_part(line, spans, indent)
+                return None
+
+        if not line:
+            return finished
+
+        m = self._parser.BULLET_PREFIX_RE.match(line)
+        if m:
+            self._start_index = index
+            rest = line[m.end():]
+            first = rest.strip()
+            if first:
+                offset = indent + m.end() + len(rest) - len(rest.lstrip())
+                self._append_part(first, spans, offset)
+        elif self._parser.BULLET_ONLY_RE.match(line):
+            self._start_index = index
+
+        return finished
+
+
+def lines_per_second(make_state, lines: List[str], repeat: int = 3) -> float:
+    """Best of ``repeat`` runs through a fresh state machine."""
+    best = float("inf")
+    for _ in range(repeat):
+        state = make_state()
+        start = time.perf_counter()
+        for line in lines:
+            state.feed(line)
+        state.close()
+        best = min(best, time.perf_counter() - start)
+    return len(lines) / best
+
+
+def classify_legacy(parser: ResumeParser, line: str) -> bool:
+    return bool(
+        parser.BULLET_PREFIX_RE.match(line)
+        or parser.BULLET_ONLY_RE.match(line)
+        or parser._looks_like_header(line)
+    )
+
+
+def classify_merged(parser: ResumeParser, line: str) -> bool:
+    return parser._classify_line(line)[0] != "text"
+
+
+def classified_per_second(classify, parser: ResumeParser, lines: List[str]) -> float:
+    """Classification alone, without building bullets."""
+    stripped = [line.strip() for line in lines if line.strip()]
+    start = time.perf_counter()
+    for line in stripped:
+        classify(parser, line)
+    return len(stripped) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--resumes", type=int, default=2000)
+    args = parser.parse_args()
+
+    lines = make_text(args.resumes).splitlines()
+    rows = [
+        (
+            "extract",
+            lines_per_second(lambda: LegacyStateMachine(LegacyParser()), lines),
+            lines_per_second(lambda: _BulletStateMachine(ResumeParser()), lines),
+        ),
+        (
+            "classify only",
+            classified_per_second(classify_legacy, LegacyParser(), lines),
+            classified_per_second(classify_merged, ResumeParser(), lines),
+        ),
+    ]
+
+    print(f"{len(lines)} lines")
+    print(f"{'lines/s':<16}{'legacy':>12}{'merged':>12}{'speedup':>9}")
+    for name, legacy, merged in rows:
+        print(f"{name:<16}{legacy:>12,.0f}{merged:>12,.0f}{merged / legacy:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
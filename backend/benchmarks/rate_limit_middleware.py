@@ -0,0 +1,148 @@
+"""
+Compare per-request overhead of the ASGI rate-limit middleware against the
+previous BaseHTTPMiddleware implementation.
+
+    cd backend && python -m benchmarks.rate_limit_middleware --requests 5000
+
+Requests are driven straight through the ASGI interface (no sockets), so
+the numbers isolate middleware cost. "first byte" is the time until the
+first body chunk of a StreamingResponse reaches the server, which shows
+whether the middleware lets the body stream through.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.middleware.rate_limit import RateLimiter, RateLimitMiddleware, RateLimitPolicy
+
+LIMIT = 10**9  # never reject; we are measuring overhead only
+CHUNK_DELAY = 0.05
+
+
+class LegacyRateLimitMiddleware(BaseHTTPMiddleware):
+    """The BaseHTTPMiddleware-based limiter this middleware replaced."""
+
+    def __init__(self, app, limiter: RateLimiter) -> None:
+        super().__init__(app)
+        self._limiter = limiter
+
+    async def dispatch(self, request: Request, call_next):
+        if request.url.path.startswith("/api"):
+            client_ip = request.client.host if request.client else "unknown"
+            if not self._limiter.allow(f"{client_ip}:default", LIMIT, 60):
+                return JSONResponse(status_code=429, content={"detail": "Rate limit exceeded"})
+        return await call_next(request)
+
+
+def build_app(kind: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.get("/api/stream")
+    async def stream():
+        async def body():
+            for _ in range(3):
+                yield b"x" * 1024
+                await asyncio.sleep(CHUNK_DELAY)
+
+        return StreamingResponse(body())
+
+    if kind == "legacy":
+        app.add_middleware(LegacyRateLimitMiddleware, limiter=RateLimiter())
+    elif kind == "asgi":
+        app.add_middleware(
+            RateLimitMiddleware,
+            limiter=RateLimiter(),
+            policies=[RateLimitPolicy("default", LIMIT, 60, path_prefix="/api")],
+        )
+    return app
+
+
+async def call(app, path: str):
+    """Run one request; return (total seconds, seconds to first body chunk)."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 12345),
+        "server": ("bench", 80),
+    }
+    start = time.perf_counter()
+    first_byte = None
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()  # never disconnects
+
+    async def send(message):
+        nonlocal first_byte
+        if message["type"] == "http.response.body" and first_byte is None and message.get("body"):
+            first_byte = time.perf_counter() - start
+
+    await app(scope, receive, send)
+    return time.perf_counter() - start, first_byte
+
+
+async def bench(kind: str, requests: int, concurrency: int):
+    app = build_app(kind)
+    for _ in range(100):  # warm up
+        await call(app, "/api/ping")
+
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            latencies.append((await call(app, "/api/ping"))[0])
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+
+    first_bytes = [(await call(app, "/api/stream"))[1] for _ in range(5)]
+
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50_us": statistics.median(latencies) * 1e6,
+        "p99_us": latencies[int(0.99 * (len(latencies) - 1))] * 1e6,
+        "first_byte_ms": statistics.median(first_bytes) * 1e3,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'middleware':<12}{'req/s':>10}{'p50 us':>10}{'p99 us':>10}{'first byte ms':>15}")
+    for kind in ("none", "legacy", "asgi"):
+        r = asyncio.run(bench(kind, args.requests, args.concurrency))
+        print(
+            f"{kind:<12}{r['rps']:>10.0f}{r['p50_us']:>10.0f}{r['p99_us']:>10.0f}"
+            f"{r['first_byte_ms']:>15.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
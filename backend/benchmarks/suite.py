@@ -0,0 +1,132 @@
+"""
+Benchmark suite for parsing, export and analytics over a synthetic corpus.
+
+    cd backend && python -m benchmarks.suite --save benchmarks/baseline.json
+    cd backend && python -m benchmarks.suite --compare benchmarks/baseline.json
+
+Reports throughput, p50/p95/p99 latency and peak RSS per case. With
+--compare, exits non-zero if any case regressed by more than --tolerance
+against the baseline. Baselines are machine-specific; save one on the
+machine you compare on, and use --quick for both or neither.
+"""
+import argparse
+import multiprocessing
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Sequence
+
+from app.services.analytics import AnalyticsService
+from app.services.export import ExportService
+from app.services.parser import ResumeParser
+from benchmarks.corpus import (
+    DOCX_MARKERS,
+    SIZES,
+    generate_corpus,
+    iter_specs,
+    make_analysis,
+    resume_text,
+)
+from benchmarks.harness import Measurement, compare, load_results, measure, save_results
+
+QUICK_SIZES = ("small", "medium")
+
+_parser = ResumeParser()
+_exporter = ExportService()
+_analytics = AnalyticsService()
+
+
+def _sizes(quick: bool) -> Sequence[str]:
+    return QUICK_SIZES if quick else tuple(SIZES)
+
+
+def _pdf_corpus(quick: bool) -> List[bytes]:
+    return [data for _, data in generate_corpus("pdf", sizes=_sizes(quick))]
+
+
+def _docx_corpus(quick: bool) -> List[bytes]:
+    return [data for _, data in generate_corpus("docx", sizes=_sizes(quick))]
+
+
+def _texts(quick: bool) -> List[str]:
+    return [resume_text(spec) for spec in iter_specs(DOCX_MARKERS, sizes=_sizes(quick))]
+
+
+def _analyses(quick: bool) -> List[Any]:
+    return [make_analysis(spec) for spec in iter_specs(DOCX_MARKERS, sizes=_sizes(quick))]
+
+
+def _bins(quick: bool) -> List[Any]:
+    return [analysis.bins for analysis in _analyses(quick)]
+
+
+@dataclass
+class Case:
+    unit: str
+    prepare: Callable[[bool], List[Any]]  # quick -> inputs
+    run: Callable[[Any], Any]
+    repeat: int = 1
+
+
+CASES: Dict[str, Case] = {
+    "parse_pdf": Case("resumes", _pdf_corpus, _parser.parse_pdf),
+    "parse_docx": Case("resumes", _docx_corpus, _parser.parse_docx),
+    "extract_text": Case("resumes", _texts, _parser._extract_bullets_from_text, repeat=20),
+    "export_pdf": Case("reports", _analyses, _exporter.export_to_pdf),
+    "analytics": Case("analyses", _bins, _analytics.calculate_analytics, repeat=200),
+}
+
+
+def run_case(name: str, items: List[Any]) -> Measurement:
+    """Runs in a fresh worker process; module-level so it can be pickled."""
+    case = CASES[name]
+    return measure(name, case.unit, case.run, items, case.repeat)
+
+
+def run_isolated(name: str, quick: bool) -> Measurement:
+    items = CASES[name].prepare(quick)
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(run_case, name, items).result()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--quick", action="store_true", help="skip the large resumes")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--save", metavar="PATH", help="write results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="fail on regressions against a baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    print(
+        f"{'case':<14}{'calls':>7}{'throughput':>18}{'p50 ms':>9}{'p95 ms':>9}"
+        f"{'p99 ms':>9}{'peak RSS':>10}"
+    )
+    results: Dict[str, Measurement] = {}
+    for name in args.cases:
+        m = results[name] = run_isolated(name, args.quick)
+        rss = f"{m.peak_rss_mb:.0f}MB" if m.peak_rss_mb is not None else "-"
+        print(
+            f"{name:<14}{m.calls:>7}{m.throughput:>11.1f} {m.unit[:3]}/s"
+            f"{m.p50_ms:>9.2f}{m.p95_ms:>9.2f}{m.p99_ms:>9.2f}{rss:>10}"
+        )
+
+    if args.save:
+        save_results(args.save, results, args.quick)
+        print(f"Saved results to {args.save}")
+
+    if args.compare:
+        baseline = load_results(args.compare)
+        if baseline["quick"] != args.quick:
+            print("Warning: baseline and this run differ in --quick; results are not comparable")
+        regressions = compare(results, baseline["cases"], args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
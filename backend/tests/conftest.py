@@ -0,0 +1,22 @@
+import itertools
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app, rate_limiter
+from app.middleware.rate_limit import InMemoryRateLimitBackend
+
+_seeds = itertools.count(1000)
+
+
+@pytest.fixture
+def client():
+    # Every test starts with fresh rate-limit buckets
+    rate_limiter.backend = InMemoryRateLimitBackend()
+    return TestClient(app)
+
+
+@pytest.fixture
+def seed():
+    """A seed no other test has used, so generated resumes miss the parse cache."""
+    return next(_seeds)
@@ -0,0 +1,151 @@
+"""Local OpenAI-compatible chat completions server for narrative tests."""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+DEFAULT_CONTENT = json.dumps(
+    {
+        "paragraph": "Your word shows up across your experiences.",
+        "bullets": ["Lead with your word", "Connect projects to your value"],
+        "experienceSuggestions": [
+            {
+                "original": "Built ML pipeline",
+                "category": "Skillset",
+                "alignment": "strong",
+                "reframe": None,
+                "explanation": "Shows initiative.",
+            }
+        ],
+    }
+)
+
+
+class FakeUpstream:
+    """
+    Serves POST /chat/completions on a random local port.
+
+    Tests can set `content`, add `latency` (seconds), queue per-request
+    delays in `latencies`, or queue HTTP status codes in `failures` to be
+    returned before the next successful response.
+    """
+
+    def __init__(self, content: str = DEFAULT_CONTENT) -> None:
+        self.content = content
+        self.latency = 0.0
+        self.latencies: List[float] = []
+        self.failures: List[int] = []
+        self.requests: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeUpstream":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _next_latency(self) -> float:
+        with self._lock:
+            return self.latencies.pop(0) if self.latencies else self.latency
+
+    def _next_failure(self):
+        with self._lock:
+            return self.failures.pop(0) if self.failures else None
+
+    def _handler_class(self):
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def handle(self):
+                try:
+                    super().handle()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # client gave up, e.g. a cancelled hedged request
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                with upstream._lock:
+                    upstream.requests.append(body)
+
+                latency = upstream._next_latency()
+                if latency:
+                    time.sleep(latency)
+
+                status = upstream._next_failure()
+                if status is not None:
+                    self._send_json(
+                        status, {"error": {"message": f"Injected {status}", "type": "test"}}
+                    )
+                    return
+
+                if body.get("stream"):
+                    self._send_stream(body)
+                else:
+                    self._send_json(200, self._completion(body))
+
+            def _completion(self, body):
+                return {
+                    "id": "chatcmpl-test",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model", "test"),
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": upstream.content},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+                }
+
+            def _send_stream(self, body):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                content = upstream.content
+                for i in range(0, len(content), 16):
+                    chunk = {
+                        "id": "chatcmpl-test",
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": body.get("model", "test"),
+                        "choices": [
+                            {
+                                "index": 0,
+                                "delta": {"content": content[i:i + 16]},
+                                "finish_reason": None,
+                            }
+                        ],
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                    self.wfile.flush()
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+
+            def _send_json(self, status, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
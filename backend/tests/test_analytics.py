@@ -1,5 +1,8 @@
+import random
+
 import pytest
-from app.services.analytics import AnalyticsService
+from app.models.analysis import AnalyticsEvent
+from app.services.analytics import AnalyticsService, IncrementalAnalytics
 from app.models.bin import Bin
 from app.models.bullet_point import BulletPoint, FormattingInfo
 
@@ -139,3 +142,95 @@ class TestAnalyticsService:
 
         # Should not exceed 5 suggestions
         assert len(result.suggestions) <= 5
+
+
+def random_bins(rng: random.Random) -> list[Bin]:
+    bins = []
+    for b in range(rng.randint(1, 6)):
+        # Labels may repeat; ids are unique per student
+        label = rng.choice(["Interests", "Skillset", "Values", "Strengths"])
+        bullets = [create_bullet("x", f"{b}-{i}") for i in range(rng.randint(0, 12))]
+        bins.append(Bin(id=f"bin{b}", label=label, color="#000", bullets=bullets))
+    return bins
+
+
+def random_event(rng: random.Random, bins: list[Bin], next_id: int) -> AnalyticsEvent:
+    bullet_ids = [b.id for bin in bins for b in bin.bullets]
+    bin_id = rng.choice([bin.id for bin in bins])
+    kind = rng.choice(["add", "remove", "move", "move", "move"])
+    if kind == "add" or not bullet_ids:
+        return AnalyticsEvent(type="add", bullet_id=f"new-{next_id}", bin_id=bin_id)
+    return AnalyticsEvent(type=kind, bullet_id=rng.choice(bullet_ids), bin_id=bin_id)
+
+
+def apply_to_bins(bins: list[Bin], event: AnalyticsEvent) -> None:
+    """Reference implementation: edit the bins themselves."""
+    bullet = None
+    for bin in bins:
+        for b in bin.bullets:
+            if b.id == event.bullet_id:
+                bullet = b
+                bin.bullets = [x for x in bin.bullets if x.id != event.bullet_id]
+    if event.type == "add":
+        bullet = create_bullet("x", event.bullet_id)
+    if event.type in ("add", "move"):
+        next(bin for bin in bins if bin.id == event.bin_id).bullets.append(bullet)
+
+
+class TestIncrementalAnalytics:
+    @pytest.mark.parametrize("seed", range(50))
+    def test_matches_full_recomputation(self, analytics_service, seed):
+        rng = random.Random(seed)
+        bins = random_bins(rng)
+        session = IncrementalAnalytics(bins)
+
+        for step in range(60):
+            event = random_event(rng, bins, step)
+            session.apply(event)
+            apply_to_bins(bins, event)
+
+            expected = analytics_service.calculate_analytics(bins)
+            assert session.analytics().model_dump_json() == expected.model_dump_json()
+
+    def test_move_within_same_bin_is_noop(self, analytics_service):
+        bins = create_bins_with_bullets({"interests": 1, "skillset": 2})
+        session = IncrementalAnalytics(bins)
+
+        session.move("interests-0", "interests")
+
+        assert session.analytics() == analytics_service.calculate_analytics(bins)
+
+    def test_unknown_bullet_or_bin_rejected(self):
+        session = IncrementalAnalytics(create_bins_with_bullets({"interests": 1}))
+
+        with pytest.raises(ValueError):
+            session.remove("missing")
+        with pytest.raises(ValueError):
+            session.move("interests-0", "missing")
+        with pytest.raises(ValueError):
+            session.add("interests-0", "interests")
+
+    def test_apply_all_is_atomic(self, analytics_service):
+        bins = create_bins_with_bullets({"interests": 2, "skillset": 1})
+        session = IncrementalAnalytics(bins)
+        before = session.analytics()
+
+        with pytest.raises(ValueError):
+            session.apply_all(
+                [
+                    AnalyticsEvent(type="move", bullet_id="interests-0", bin_id="skillset"),
+                    AnalyticsEvent(type="remove", bullet_id="skillset-0"),
+                    AnalyticsEvent(type="add", bullet_id="new", bin_id="interests"),
+                    AnalyticsEvent(type="move", bullet_id="missing", bin_id="skillset"),
+                ]
+            )
+
+        assert session.analytics() == before
+        assert session.total == 3
+
+    def test_returned_analytics_not_shared(self):
+        session = IncrementalAnalytics(create_bins_with_bullets({"interests": 1}))
+
+        session.analytics().suggestions.append("mutated")
+
+        assert "mutated" not in session.analytics().suggestions
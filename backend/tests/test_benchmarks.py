@@ -0,0 +1,83 @@
+import pytest
+from app.services.parser import ResumeParser
+from benchmarks.corpus import (
+    DOCX_MARKERS,
+    PDF_MARKERS,
+    ResumeSpec,
+    make_analysis,
+    make_docx,
+    make_pdf,
+    resume_text,
+)
+from benchmarks.harness import Measurement, compare, percentile
+
+
+@pytest.fixture
+def parser():
+    return ResumeParser()
+
+
+def measurement(**overrides) -> Measurement:
+    values = dict(
+        name="case",
+        unit="items",
+        calls=100,
+        throughput=100.0,
+        p50_ms=5.0,
+        p95_ms=10.0,
+        p99_ms=12.0,
+        peak_rss_mb=100.0,
+    )
+    values.update(overrides)
+    return Measurement(**values)
+
+
+class TestCorpus:
+    @pytest.mark.parametrize("marker", DOCX_MARKERS)
+    def test_docx_and_text_parse_to_every_bullet(self, parser, marker):
+        spec = ResumeSpec("small", marker, 0.3)
+
+        docx_bullets = parser.parse_docx(make_docx(spec))
+        text_bullets = parser._extract_bullets_from_text(resume_text(spec))
+
+        assert len(docx_bullets) == spec.bullet_count
+        assert [b.text for b in text_bullets] == [b.text for b in docx_bullets]
+
+    @pytest.mark.parametrize("marker", PDF_MARKERS)
+    def test_pdf_parses_to_every_bullet(self, parser, marker):
+        spec = ResumeSpec("small", marker, 0.3)
+
+        bullets = parser.parse_pdf(make_pdf(spec))
+
+        assert len(bullets) == spec.bullet_count
+        assert any(b.formatting.spans for b in bullets)
+
+    def test_analysis_spans_match_styled_words(self):
+        analysis = make_analysis(ResumeSpec("small", "•", 0.3))
+
+        bullet = next(b for bin in analysis.bins for b in bin.bullets if b.formatting.spans)
+        start, end, bold, italic = bullet.formatting.spans[0]
+        assert bullet.text[start:end].strip()
+        assert bold != italic
+
+
+class TestHarness:
+    def test_percentile(self):
+        values = list(range(1, 101))
+
+        assert percentile(values, 0.50) == 51
+        assert percentile(values, 0.99) == 100
+
+    def test_compare_within_tolerance(self):
+        assert compare({"case": measurement(p95_ms=11.0)}, {"case": measurement()}, 0.25) == []
+
+    def test_compare_flags_regressions(self):
+        current = measurement(p95_ms=20.0, throughput=50.0, peak_rss_mb=200.0)
+
+        regressions = compare({"case": current}, {"case": measurement()}, 0.25)
+
+        assert len(regressions) == 3
+        assert regressions[0].startswith("case: p95")
+
+    def test_compare_ignores_new_cases(self):
+        assert compare({"new": measurement(p95_ms=99.0)}, {"case": measurement()}, 0.25) == []
@@ -0,0 +1,164 @@
+import random
+from datetime import datetime
+
+import numpy as np
+import pytest
+from app.config.settings import settings
+from app.models.analysis import AnalysisResult
+from app.routers import analytics as analytics_router
+from app.services.analytics import AnalyticsService
+from app.services.cohort_analytics import CohortAnalyticsService, CohortFrame, _round1
+from tests.test_analytics import create_bins_with_bullets, random_bins
+
+
+@pytest.fixture
+def service():
+    return CohortAnalyticsService()
+
+
+def make_results(seed: int, n: int) -> list[AnalysisResult]:
+    rng = random.Random(seed)
+    analytics = AnalyticsService()
+    results = []
+    for _ in range(n):
+        bins = random_bins(rng)
+        results.append(
+            AnalysisResult(
+                bins=bins,
+                analytics=analytics.calculate_analytics(bins),
+                timestamp=datetime(2024, 1, 1),
+            )
+        )
+    return results
+
+
+class TestCohortFrame:
+    def test_columns_follow_first_appearance(self):
+        first = create_bins_with_bullets({"interests": 2, "skillset": 1})
+        second = create_bins_with_bullets({"values": 3, "interests": 0})
+        results = [
+            AnalysisResult(bins=bins, analytics=AnalyticsService().calculate_analytics(bins), timestamp=datetime(2024, 1, 1))
+            for bins in (first, second)
+        ]
+
+        frame = CohortFrame.from_results(results)
+
+        assert frame.bin_ids == ["interests", "skillset", "values"]
+        assert frame.position.tolist() == [[0, 1, -1], [1, -1, 0]]
+        assert frame.counts.tolist() == [[2, 1, 0], [0, 0, 3]]
+        assert frame.present.tolist() == [[True, True, False], [True, False, True]]
+
+
+class TestCohortAnalytics:
+    @pytest.mark.parametrize("seed", range(5))
+    def test_matches_per_analysis_results(self, service, seed):
+        results = make_results(seed, 300)
+
+        report = service.summarize(CohortFrame.from_results(results))
+
+        top = {}
+        triggers = {}
+        for result in results:
+            if result.analytics.top_category != "None":
+                top[result.analytics.top_category] = top.get(result.analytics.top_category, 0) + 1
+            labels = {bin.id: bin.label for bin in result.bins}
+            fired = []
+            for dist in result.analytics.distribution:
+                key = (dist.bin_id, labels[dist.bin_id])
+                rule = (
+                    "underrepresented" if dist.percentage < 15 and dist.count > 0
+                    else "dominant" if dist.percentage > 40
+                    else "empty" if dist.count == 0
+                    else None
+                )
+                if rule:
+                    fired.append((key, rule))
+            # Only the suggestions the analysis actually shows; per-bin ones quote the label
+            shown = fired[:5]
+            assert len(shown) == len(
+                [s for s in result.analytics.suggestions if "'" in s]
+            )
+            for key, rule in shown:
+                triggers[key, rule] = triggers.get((key, rule), 0) + 1
+
+        assert report.total_results == 300
+        assert report.top_categories == top
+        for stats in report.bins:
+            for rule in ("underrepresented", "dominant", "empty"):
+                key = (stats.bin_id, stats.label)
+                assert getattr(stats, rule) == triggers.get((key, rule), 0)
+        assert report.balanced_profiles == sum(
+            1 for r in results if r.analytics.distribution and all(d.count for d in r.analytics.distribution)
+        )
+
+    def test_distribution_statistics(self, service):
+        results = make_results(7, 200)
+
+        report = service.summarize(CohortFrame.from_results(results))
+
+        for stats in report.bins:
+            percentages = [
+                d.percentage
+                for r in results
+                for d, bin in zip(r.analytics.distribution, r.bins)
+                if (bin.id, bin.label) == (stats.bin_id, stats.label)
+            ]
+            assert stats.results == len(percentages)
+            assert sum(stats.histogram) == len(percentages)
+            assert stats.percentiles["p50"] == pytest.approx(np.percentile(percentages, 50), abs=0.01)
+            assert stats.mean_percentage == pytest.approx(np.mean(percentages), abs=0.01)
+
+    def test_empty_cohort(self, service):
+        report = service.summarize(CohortFrame.from_results([]))
+
+        assert report.total_results == 0
+        assert report.bins == []
+        assert report.top_categories == {}
+
+    def test_rounding_matches_python(self):
+        values = np.array([count / total * 100 for total in range(1, 400) for count in range(total + 1)])
+
+        assert _round1(values).tolist() == [round(v, 1) for v in values]
+
+
+class TestCohortRoute:
+    def post(self, client, results):
+        body = "[" + ",".join(result.model_dump_json() for result in results) + "]"
+        return client.post(
+            "/api/analytics/cohort", content=body, headers={"content-type": "application/json"}
+        )
+
+    def test_report(self, client, service):
+        results = make_results(0, 20)
+
+        response = self.post(client, results)
+
+        assert response.status_code == 200
+        expected = service.summarize(CohortFrame.from_results(results))
+        assert response.json() == expected.model_dump(mode="json")
+
+    def test_body_size_checked_before_parsing(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "analytics_cohort_max_bytes", 100)
+
+        def fail(body):
+            raise AssertionError("body was parsed")
+
+        monkeypatch.setattr(analytics_router.cohort_results, "validate_json", fail)
+
+        response = self.post(client, make_results(0, 5))
+
+        assert response.status_code == 413
+        assert response.json()["detail"] == "Request body exceeds 100 bytes"
+
+    def test_result_count_limit(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "analytics_cohort_max_results", 2)
+
+        response = self.post(client, make_results(0, 3))
+
+        assert response.status_code == 413
+
+    def test_invalid_body(self, client):
+        response = client.post("/api/analytics/cohort", json=[{"bins": "nope"}])
+
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["loc"][:2] == ["body", 0]
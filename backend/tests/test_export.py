@@ -0,0 +1,144 @@
+import json
+import os
+import time
+from datetime import datetime
+from io import BytesIO
+
+import pdfplumber
+import pytest
+from app.models.analysis import AnalysisResult, Analytics, Distribution
+from app.models.bin import Bin
+from app.models.bullet_point import BulletPoint, FormattingInfo
+from app.services.export import ExportService, render_pdf_file, report_template
+
+
+@pytest.fixture
+def service():
+    return ExportService()
+
+
+@pytest.fixture
+def result():
+    bullets = [
+        BulletPoint(
+            id="1",
+            text="Led a team of 5 & shipped <v2>",
+            formatting=FormattingInfo(spans=[(0, 3, True, False)]),
+            original_index=0,
+        )
+    ]
+    return AnalysisResult(
+        bins=[
+            Bin(id="skillset", label="Skillset", color="#3B82F6", bullets=bullets),
+            Bin(id="values", label="Values", color="#10B981", bullets=[]),
+        ],
+        analytics=Analytics(
+            distribution=[
+                Distribution(bin_id="skillset", count=1, percentage=100.0),
+                Distribution(bin_id="values", count=0, percentage=0.0),
+            ],
+            top_category="Skillset",
+            suggestions=["Add more values experiences"],
+        ),
+        timestamp=datetime(2024, 3, 5),
+    )
+
+
+class TestExportService:
+    def test_export_json(self, service, result):
+        data = json.loads(service.export_to_json(result))
+
+        assert data["student_analysis"]["timestamp"] == "2024-03-05T00:00:00"
+        assert len(data["student_analysis"]["bins"]) == 2
+
+    def test_export_pdf_content(self, service, result):
+        with pdfplumber.open(service.export_to_pdf(result)) as pdf:
+            text = " ".join(page.extract_text() for page in pdf.pages).replace("\n", " ")
+
+        assert "Career Design Analysis - March 05, 2024" in text
+        assert "Skillset 1 100.0%" in text
+        assert "Values 0 0.0%" in text
+        assert "Led a team of 5 & shipped <v2>" in text
+        assert "Add more values experiences" in text
+
+    def test_template_built_once(self, service, result):
+        first = service.build_story(result)
+        second = service.build_story(result)
+
+        assert report_template() is report_template()
+        assert first[0].style is second[0].style
+
+    def test_unknown_distribution_bin_fails(self, service, result):
+        result.analytics.distribution.append(
+            Distribution(bin_id="missing", count=0, percentage=0.0)
+        )
+
+        with pytest.raises(KeyError):
+            service.build_story(result)
+
+
+class TestCombinedPdf:
+    def test_one_report_per_page_group(self, service, result):
+        output = BytesIO()
+
+        errors = service.render_combined_pdf([("a.pdf", result), ("b.pdf", result)], output)
+
+        output.seek(0)
+        with pdfplumber.open(output) as pdf:
+            titles = [p for p in pdf.pages if "Career Design Analysis" in p.extract_text()]
+        assert errors == {}
+        assert len(titles) == 2
+
+    def test_failed_reports_listed(self, service, result):
+        broken = result.model_copy(deep=True)
+        broken.analytics.distribution.append(
+            Distribution(bin_id="missing", count=0, percentage=0.0)
+        )
+        output = BytesIO()
+
+        errors = service.render_combined_pdf([("a.pdf", result), ("b.pdf", broken)], output)
+
+        output.seek(0)
+        with pdfplumber.open(output) as pdf:
+            last_page = pdf.pages[-1].extract_text()
+        assert list(errors) == ["b.pdf"]
+        assert "Reports Not Included" in last_page
+        assert "b.pdf" in last_page
+
+    def test_reports_each_result_as_laid_out(self, service, result):
+        broken = result.model_copy(deep=True)
+        broken.analytics.distribution.append(
+            Distribution(bin_id="missing", count=0, percentage=0.0)
+        )
+        reported = []
+
+        errors = service.render_combined_pdf(
+            [("a.pdf", result), ("b.pdf", broken)],
+            BytesIO(),
+            lambda name, error: reported.append((name, error)),
+        )
+
+        assert reported == [("a.pdf", None), ("b.pdf", errors["b.pdf"])]
+
+
+class TestRenderPdfFile:
+    def test_renders_to_file(self, result, tmp_path):
+        path = render_pdf_file(result, str(tmp_path))
+
+        with open(path, "rb") as f:
+            assert f.read(5) == b"%PDF-"
+        assert os.path.dirname(path) == str(tmp_path)
+
+    def test_failed_render_leaves_no_file(self, result, tmp_path):
+        result.analytics.distribution.append(
+            Distribution(bin_id="missing", count=0, percentage=0.0)
+        )
+
+        with pytest.raises(KeyError):
+            render_pdf_file(result, str(tmp_path))
+        assert os.listdir(tmp_path) == []
+
+    def test_render_past_deadline_leaves_no_file(self, result, tmp_path):
+        with pytest.raises(TimeoutError):
+            render_pdf_file(result, str(tmp_path), expires_at=time.time() - 1)
+        assert os.listdir(tmp_path) == []
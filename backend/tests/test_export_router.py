@@ -0,0 +1,201 @@
+import asyncio
+import json
+import time
+import zipfile
+from io import BytesIO
+
+import pytest
+
+from app.config.settings import settings
+from app.routers import export as export_router
+from app.services.worker_pool import JobTimeoutError, PoolSaturatedError
+from benchmarks.corpus import ResumeSpec, make_analysis
+
+
+def analysis_json(size: str = "small") -> dict:
+    return make_analysis(ResumeSpec(size, "•", 0.1)).model_dump(mode="json")
+
+
+def export_files() -> set:
+    return set(export_router.EXPORT_DIR.iterdir())
+
+
+def failing_run(error: Exception):
+    async def run(*args, **kwargs):
+        raise error
+
+    return run
+
+
+class TestExportPdf:
+    def test_streams_pdf_and_deletes_file(self, client):
+        before = export_files()
+
+        response = client.post("/api/export/pdf", json=analysis_json())
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/pdf"
+        assert response.content.startswith(b"%PDF-")
+        assert export_files() == before
+
+    def test_too_many_bullets(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "export_max_bullets", 5)
+
+        response = client.post("/api/export/pdf", json=analysis_json())
+
+        assert response.status_code == 413
+        assert response.json()["detail"] == "Too many bullets to export (9 > 5)"
+
+    @pytest.mark.parametrize(
+        "error, status",
+        [(PoolSaturatedError("busy"), 503), (JobTimeoutError("slow"), 504)],
+    )
+    def test_pool_errors(self, client, monkeypatch, error, status):
+        monkeypatch.setattr(export_router.export_pool, "run", failing_run(error))
+
+        response = client.post("/api/export/pdf", json=analysis_json())
+
+        assert response.status_code == status
+        if status == 503:
+            assert response.headers["retry-after"] == "5"
+
+    def test_sweeps_abandoned_renders(self, client, monkeypatch):
+        orphan = export_router.EXPORT_DIR / "orphan.pdf"
+        orphan.write_bytes(b"%PDF-")
+        monkeypatch.setattr(settings, "export_file_ttl_seconds", 0)
+        monkeypatch.setattr(export_router, "_last_sweep", float("-inf"))
+
+        client.post("/api/export/pdf", json=analysis_json())
+
+        assert not orphan.exists()
+
+
+def bulk_body(names, size: str = "small") -> dict:
+    return {"items": [{"name": name, "result": analysis_json(size)} for name in names]}
+
+
+class TestBulkExport:
+    def test_zip_contains_pdfs_and_manifest(self, client):
+        before = export_files()
+
+        response = client.post("/api/export/bulk", json=bulk_body(["Ada", "Ada", None]))
+
+        assert response.status_code == 200
+        archive = zipfile.ZipFile(BytesIO(response.content))
+        assert sorted(archive.namelist()) == [
+            "Ada (2).pdf",
+            "Ada.pdf",
+            "career_analysis_003.pdf",
+            "manifest.json",
+        ]
+        assert archive.read("Ada.pdf").startswith(b"%PDF-")
+        manifest = json.loads(archive.read("manifest.json"))
+        assert manifest["succeeded"] == 3
+        assert [item["file"] for item in manifest["items"]] == [
+            "Ada.pdf",
+            "Ada (2).pdf",
+            "career_analysis_003.pdf",
+        ]
+        assert export_files() == before
+
+        progress = client.get(f"/api/export/bulk/{response.headers['x-export-id']}").json()
+        assert progress["status"] == "done"
+        assert progress["completed"] == 3
+
+    def test_partial_failure_reported(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "export_max_bullets", 20)
+        body = {
+            "items": [
+                {"name": "small", "result": analysis_json("small")},
+                {"name": "big", "result": analysis_json("medium")},
+            ]
+        }
+
+        response = client.post("/api/export/bulk", json=body)
+
+        archive = zipfile.ZipFile(BytesIO(response.content))
+        manifest = json.loads(archive.read("manifest.json"))
+        assert sorted(archive.namelist()) == ["manifest.json", "small.pdf"]
+        assert manifest["failed"] == 1
+        assert manifest["items"][1] == {
+            "name": "big",
+            "file": None,
+            "status": "failed",
+            "error": "Too many bullets to export (40 > 20)",
+        }
+
+    def test_item_cap(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "export_bulk_max_items", 2)
+
+        response = client.post("/api/export/bulk", json=bulk_body(["a", "b", "c"]))
+
+        assert response.status_code == 413
+
+    def test_combined_pdf(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "export_max_bullets", 20)
+        body = {
+            "items": [
+                {"name": "small", "result": analysis_json("small")},
+                {"name": "big", "result": analysis_json("medium")},
+            ]
+        }
+        before = export_files()
+
+        response = client.post("/api/export/bulk?format=pdf", json=body)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/pdf"
+        assert response.content.startswith(b"%PDF-")
+        assert export_files() == before
+        progress = client.get(f"/api/export/bulk/{response.headers['x-export-id']}").json()
+        assert progress["status"] == "done"
+        assert progress["completed"] == 1
+        assert progress["failed"] == {"big.pdf": "Too many bullets to export (40 > 20)"}
+
+    def test_combined_pdf_total_is_capped(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "export_bulk_pdf_max_bullets", 30)
+        body = {"items": [{"name": str(i), "result": analysis_json()} for i in range(4)]}
+
+        response = client.post("/api/export/bulk?format=pdf", json=body)
+
+        assert response.status_code == 413
+        assert "36 requested" in response.json()["detail"]
+
+    def test_combined_pdf_progress_registered_before_rendering(self, client, monkeypatch):
+        registered = []
+        monkeypatch.setattr(
+            export_router.bulk_progress, "set", lambda key, value: registered.append(value)
+        )
+
+        async def run_job(*args, **kwargs):
+            assert [p.status for p in registered] == ["running"]
+            raise JobTimeoutError("Export deadline exceeded")
+
+        monkeypatch.setattr(export_router, "_run_export_job", run_job)
+        body = {"items": [{"name": "a", "result": analysis_json()}]}
+
+        with pytest.raises(JobTimeoutError):
+            client.post("/api/export/bulk?format=pdf", json=body)
+
+        assert registered[0].status == "cancelled"
+
+    def test_unknown_export_id(self, client):
+        assert client.get("/api/export/bulk/missing").status_code == 404
+
+
+class TestRunExportJob:
+    def test_gives_up_waiting_for_a_slot_at_deadline(self, monkeypatch):
+        monkeypatch.setattr(
+            export_router.export_pool, "run", failing_run(PoolSaturatedError("busy"))
+        )
+
+        async def scenario():
+            loop = asyncio.get_running_loop()
+            await export_router._run_export_job(
+                lambda: None, deadline=loop.time() + 0.1, discard=lambda _: None
+            )
+
+        start = time.monotonic()
+        with pytest.raises(JobTimeoutError):
+            asyncio.run(scenario())
+        assert time.monotonic() - start < 1.0
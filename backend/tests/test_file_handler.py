@@ -0,0 +1,63 @@
+import asyncio
+import os
+import time
+from io import BytesIO
+
+import pytest
+from fastapi import UploadFile
+from app.utils.file_handler import UploadTooLargeError, read_upload, sweep_old_files
+
+
+def make_upload(data: bytes, filename: str = "resume.pdf") -> UploadFile:
+    return UploadFile(file=BytesIO(data), filename=filename)
+
+
+class TestReadUpload:
+    def test_small_upload_stays_in_memory(self, tmp_path):
+        upload = asyncio.run(
+            read_upload(make_upload(b"abc"), tmp_path, spill_threshold=10, max_size=100)
+        )
+
+        assert upload.data == b"abc"
+        assert upload.path is None
+        assert list(tmp_path.iterdir()) == []
+
+    def test_large_upload_spills_to_unique_file(self, tmp_path):
+        data = b"x" * 50
+        first = asyncio.run(
+            read_upload(make_upload(data), tmp_path, spill_threshold=10, max_size=100)
+        )
+        second = asyncio.run(
+            read_upload(make_upload(data), tmp_path, spill_threshold=10, max_size=100)
+        )
+
+        assert first.data is None
+        assert first.path != second.path
+        assert first.path.suffix == ".pdf"
+        assert first.path.read_bytes() == data
+
+        first.cleanup()
+        second.cleanup()
+        assert list(tmp_path.iterdir()) == []
+
+    def test_rejects_oversized_upload(self, tmp_path):
+        with pytest.raises(UploadTooLargeError):
+            asyncio.run(
+                read_upload(
+                    make_upload(b"x" * 200), tmp_path, spill_threshold=10, max_size=100
+                )
+            )
+
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestSweepOldFiles:
+    def test_removes_only_old_files(self, tmp_path):
+        old, new = tmp_path / "old.pdf", tmp_path / "new.pdf"
+        old.write_bytes(b"x")
+        new.write_bytes(b"x")
+        an_hour_ago = time.time() - 3600
+        os.utime(old, (an_hour_ago, an_hour_ago))
+
+        assert sweep_old_files(tmp_path, max_age_seconds=60) == 1
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["new.pdf"]
@@ -0,0 +1,53 @@
+from app.models.bullet_point import FormattingInfo, spans_from_flags
+from app.utils.formatting import merge_formatting_spans
+
+
+class TestFormattingSpans:
+    def test_spans_from_flags(self):
+        bold = [True, True, False, False, True]
+        italic = [False, True, True, False, False]
+
+        assert spans_from_flags(bold, italic) == [
+            (0, 1, True, False),
+            (1, 2, True, True),
+            (2, 3, False, True),
+            (4, 5, True, False),
+        ]
+
+    def test_plain_text_has_no_spans(self):
+        assert spans_from_flags([False] * 10, [False] * 10) == []
+
+    def test_round_trip_through_flags(self):
+        bold = [False, True, True, False, True, True]
+        italic = [True, True, False, False, False, True]
+        formatting = FormattingInfo(spans=spans_from_flags(bold, italic))
+
+        assert formatting.to_flags(6) == (bold, italic)
+
+    def test_accepts_legacy_payload(self):
+        formatting = FormattingInfo.model_validate(
+            {"bold": [True, True, False], "italic": [False, False, False]}
+        )
+
+        assert formatting.spans == [(0, 2, True, False)]
+
+    def test_serializes_compactly(self):
+        formatting = FormattingInfo(spans=[(0, 4, True, False)])
+
+        assert formatting.model_dump_json() == '{"spans":[[0,4,true,false]]}'
+
+
+class TestMergeFormattingSpans:
+    def test_wraps_styled_spans(self):
+        text = "Led a team of five"
+        spans = [(0, 3, True, False), (6, 10, True, True)]
+
+        assert merge_formatting_spans(spans, text) == (
+            "<b>Led</b> a <b><i>team</i></b> of five"
+        )
+
+    def test_escapes_markup(self):
+        assert merge_formatting_spans([], "R&D <lab>") == "R&amp;D &lt;lab&gt;"
+
+    def test_empty_text(self):
+        assert merge_formatting_spans([(0, 3, True, False)], "") == ""
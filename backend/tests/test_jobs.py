@@ -0,0 +1,326 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from app.models.job import Job
+from app.services.jobs import (
+    CallbackURLError,
+    InMemoryJobStore,
+    JobQueue,
+    QueueFullError,
+    SQLiteJobStore,
+    check_callback_url,
+)
+from tests.fake_upstream import FakeUpstream
+
+
+async def wait_for_finish(queue: JobQueue, job_id: str, timeout: float = 2.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while loop.time() < deadline:
+        job = queue.get(job_id)
+        if job.finished:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+async def echo(payload):
+    return {"echo": payload["value"]}
+
+
+class TestJobQueue:
+    def test_job_runs_in_background(self):
+        queue = JobQueue(handler=echo)
+
+        async def scenario():
+            job = await queue.submit({"value": 1})
+            assert job.status == "queued"
+            try:
+                return await wait_for_finish(queue, job.id)
+            finally:
+                await queue.stop()
+
+        job = asyncio.run(scenario())
+
+        assert job.status == "succeeded"
+        assert job.result == {"echo": 1}
+        assert job.attempts == 1
+
+    def test_high_priority_runs_first(self):
+        order = []
+
+        async def record(payload):
+            order.append(payload["value"])
+            await asyncio.sleep(0)
+            return {}
+
+        queue = JobQueue(handler=record, workers=1)
+
+        async def scenario():
+            # Submitted before the worker gets a chance to run
+            low = await queue.submit({"value": "low"}, priority="low")
+            normal = await queue.submit({"value": "normal"})
+            high = await queue.submit({"value": "high"}, priority="high")
+            try:
+                for job in (low, normal, high):
+                    await wait_for_finish(queue, job.id)
+            finally:
+                await queue.stop()
+
+        asyncio.run(scenario())
+
+        assert order == ["high", "normal", "low"]
+
+    def test_retries_until_success(self):
+        attempts = []
+
+        async def flaky(payload):
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise RuntimeError("upstream hiccup")
+            return {"ok": True}
+
+        queue = JobQueue(handler=flaky, max_attempts=3, retry_backoff_seconds=0.01)
+
+        async def scenario():
+            job = await queue.submit({})
+            try:
+                return await wait_for_finish(queue, job.id)
+            finally:
+                await queue.stop()
+
+        job = asyncio.run(scenario())
+
+        assert job.status == "succeeded"
+        assert job.attempts == 3
+        assert job.error is None
+
+    def test_non_retryable_error_fails_immediately(self):
+        async def broken(payload):
+            raise ValueError("bad input")
+
+        queue = JobQueue(
+            handler=broken,
+            max_attempts=3,
+            retry_backoff_seconds=0.01,
+            is_retryable=lambda e: not isinstance(e, ValueError),
+        )
+
+        async def scenario():
+            job = await queue.submit({})
+            try:
+                return await wait_for_finish(queue, job.id)
+            finally:
+                await queue.stop()
+
+        job = asyncio.run(scenario())
+
+        assert job.status == "failed"
+        assert job.attempts == 1
+        assert job.error == "bad input"
+
+    def test_rejects_when_full(self):
+        async def slow(payload):
+            await asyncio.sleep(1)
+
+        queue = JobQueue(handler=slow, workers=1, max_queue=1)
+
+        async def scenario():
+            try:
+                await queue.submit({})
+                await asyncio.sleep(0.01)  # picked up by the worker
+                await queue.submit({})
+                with pytest.raises(QueueFullError):
+                    await queue.submit({})
+            finally:
+                await queue.stop()
+
+        asyncio.run(scenario())
+
+    def test_callback_posted_when_finished(self):
+        receiver = FakeUpstream().start()
+        queue = JobQueue(handler=echo, callback_allowed_hosts=["127.0.0.1"])
+
+        async def scenario():
+            job = await queue.submit({"value": 2}, callback_url=receiver.base_url)
+            try:
+                await wait_for_finish(queue, job.id)
+                for _ in range(100):
+                    if queue.get(job.id).callback_delivered is not None:
+                        break
+                    await asyncio.sleep(0.01)
+                return queue.get(job.id)
+            finally:
+                await queue.stop()
+
+        try:
+            job = asyncio.run(scenario())
+        finally:
+            receiver.stop()
+
+        assert job.callback_delivered is True
+        assert receiver.requests[0]["id"] == job.id
+        assert receiver.requests[0]["result"] == {"echo": 2}
+        assert "payload" not in receiver.requests[0]
+
+    def test_callback_to_private_address_not_delivered(self):
+        receiver = FakeUpstream().start()
+        queue = JobQueue(handler=echo)
+
+        async def scenario():
+            job = await queue.submit({"value": 2}, callback_url=receiver.base_url)
+            try:
+                await wait_for_finish(queue, job.id)
+                for _ in range(100):
+                    if queue.get(job.id).callback_delivered is not None:
+                        break
+                    await asyncio.sleep(0.01)
+                return queue.get(job.id)
+            finally:
+                await queue.stop()
+
+        try:
+            job = asyncio.run(scenario())
+        finally:
+            receiver.stop()
+
+        assert job.callback_delivered is False
+        assert receiver.requests == []
+
+
+    def test_recorded_job_delivers_callback(self):
+        receiver = FakeUpstream().start()
+        queue = JobQueue(handler=echo, callback_allowed_hosts=["127.0.0.1"])
+
+        async def scenario():
+            job = await queue.record({"value": 4}, {"echo": 4}, callback_url=receiver.base_url)
+            try:
+                for _ in range(100):
+                    if queue.get(job.id).callback_delivered is not None:
+                        break
+                    await asyncio.sleep(0.01)
+                return queue.get(job.id)
+            finally:
+                await queue.stop()
+
+        try:
+            job = asyncio.run(scenario())
+        finally:
+            receiver.stop()
+
+        assert job.status == "succeeded"
+        assert job.callback_delivered is True
+        assert receiver.requests[0]["result"] == {"echo": 4}
+
+
+class TestCheckCallbackURL:
+    @pytest.mark.parametrize(
+        "url",
+        [
+            "http://127.0.0.1:8000/hook",
+            "http://localhost/hook",
+            "http://10.0.0.5/hook",
+            "http://192.168.1.1/hook",
+            "http://169.254.169.254/latest/meta-data",
+            "http://[::1]/hook",
+            "http://[::ffff:127.0.0.1]/hook",
+            "http://0.0.0.0/hook",
+        ],
+    )
+    def test_rejects_internal_addresses(self, url):
+        with pytest.raises(CallbackURLError):
+            asyncio.run(check_callback_url(url))
+
+    @pytest.mark.parametrize("url", ["ftp://example.com/hook", "http:///hook", "http://host:port/"])
+    def test_rejects_malformed_urls(self, url):
+        with pytest.raises(CallbackURLError):
+            asyncio.run(check_callback_url(url))
+
+    def test_accepts_public_address(self):
+        asyncio.run(check_callback_url("https://93.184.216.34/hook"))
+
+    def test_allow_list(self):
+        asyncio.run(check_callback_url("http://127.0.0.1:9000/hook", ["127.0.0.1"]))
+        asyncio.run(check_callback_url("https://Hooks.Example.com/x", ["hooks.example.com"]))
+        with pytest.raises(CallbackURLError):
+            asyncio.run(check_callback_url("https://93.184.216.34/hook", ["hooks.example.com"]))
+
+
+class TestJobStores:
+    def test_finished_jobs_pruned(self):
+        store = InMemoryJobStore()
+        queue = JobQueue(handler=echo, store=store, ttl_seconds=0)
+
+        async def scenario():
+            job = await queue.submit({"value": 1})
+            await asyncio.sleep(0.05)
+            await queue.stop()
+            return job
+
+        job = asyncio.run(scenario())
+
+        assert store.get(job.id) is None
+
+    def test_recording_prunes_finished_jobs(self):
+        store = InMemoryJobStore()
+        queue = JobQueue(handler=echo, store=store, ttl_seconds=60)
+        old = datetime.utcnow() - timedelta(minutes=5)
+        store.save(
+            Job(id="old", status="succeeded", created_at=old, updated_at=old, payload={})
+        )
+
+        job = asyncio.run(queue.record({"value": 1}, {"echo": 1}))
+
+        assert store.get("old") is None
+        assert store.get(job.id) is not None
+
+    def test_sqlite_store_runs_off_the_event_loop(self, tmp_path):
+        store = SQLiteJobStore(str(tmp_path / "jobs.db"))
+        queue = JobQueue(handler=echo, store=store)
+        save = store.save
+        threads = []
+
+        def tracking_save(job):
+            threads.append(threading.get_ident())
+            save(job)
+
+        store.save = tracking_save
+
+        async def scenario():
+            job = await queue.submit({"value": 5})
+            try:
+                return await wait_for_finish(queue, job.id), threading.get_ident()
+            finally:
+                await queue.stop()
+
+        job, loop_thread = asyncio.run(scenario())
+
+        assert job.status == "succeeded"
+        assert threads and loop_thread not in threads
+
+    def test_sqlite_store_recovers_unfinished_jobs(self, tmp_path):
+        path = str(tmp_path / "jobs.db")
+
+        async def enqueue_only():
+            queue = JobQueue(handler=echo, store=SQLiteJobStore(path), workers=0)
+            job = await queue.submit({"value": 3})
+            await queue.stop()
+            return job.id
+
+        job_id = asyncio.run(enqueue_only())
+
+        async def restart():
+            queue = JobQueue(handler=echo, store=SQLiteJobStore(path))
+            await queue.start()
+            try:
+                return await wait_for_finish(queue, job_id)
+            finally:
+                await queue.stop()
+
+        job = asyncio.run(restart())
+
+        assert job.status == "succeeded"
+        assert job.result == {"echo": 3}
+        assert job.payload == {"value": 3}
@@ -0,0 +1,55 @@
+import json
+
+from app.utils.json_stream import IncrementalJSONParser
+
+DOCUMENT = {
+    "paragraph": 'She said "lead" \\ then followed through.',
+    "bullets": ["First, frame it", "Second]", ""],
+    "experienceSuggestions": [
+        {"original": "Built {things}", "alignment": "weak", "reframe": None, "n": [1, 2.5]}
+    ],
+    "count": -12,
+}
+
+
+def feed_in_chunks(text: str, size: int):
+    parser = IncrementalJSONParser(max_depth=2)
+    events = []
+    for i in range(0, len(text), size):
+        events.extend(parser.feed(text[i:i + size]))
+    return parser, events
+
+
+class TestIncrementalJSONParser:
+    def test_emits_items_at_any_chunk_size(self):
+        text = json.dumps(DOCUMENT, indent=2)
+        for size in (1, 2, 3, 7, 64, len(text)):
+            parser, events = feed_in_chunks(text, size)
+            values = dict(events)
+
+            assert parser.done
+            assert values[("paragraph",)] == DOCUMENT["paragraph"]
+            assert [values[("bullets", i)] for i in range(3)] == DOCUMENT["bullets"]
+            assert values[("experienceSuggestions", 0)] == DOCUMENT["experienceSuggestions"][0]
+            assert values[("count",)] == -12
+
+    def test_emits_items_before_document_is_complete(self):
+        text = json.dumps(DOCUMENT)
+        cut = text.index('"Second]"')
+        parser = IncrementalJSONParser()
+
+        events = parser.feed(text[:cut])
+
+        assert (("bullets", 0), "First, frame it") in events
+        assert not parser.done
+
+    def test_ignores_leading_code_fence(self):
+        parser, events = feed_in_chunks("```json\n" + json.dumps({"a": 1}) + "\n```", 4)
+
+        assert events == [(("a",), 1)]
+        assert parser.done
+
+    def test_respects_max_depth(self):
+        parser, events = feed_in_chunks(json.dumps({"a": {"b": {"c": 1}}}), 5)
+
+        assert [path for path, _ in events] == [("a", "b"), ("a",)]
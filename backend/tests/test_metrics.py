@@ -0,0 +1,165 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from app.middleware.metrics import MetricsMiddleware
+from app.services.worker_pool import WorkerPool
+from app.utils.metrics import (
+    HTTP_REQUEST_SECONDS,
+    STAGE_SECONDS,
+    Counter,
+    Histogram,
+    MetricsRegistry,
+    run_captured,
+    span,
+    timed,
+)
+
+
+def timed_job(x: int) -> int:
+    with span("test_worker_job"):
+        return x + 1
+
+
+@timed("test_decorated")
+def decorated(x: int) -> int:
+    return x * 2
+
+
+class TestCounter:
+    def test_inc_and_render(self):
+        counter = Counter("jobs_total", "Jobs.", labelnames=("kind",))
+        counter.inc("a")
+        counter.inc("a", amount=2)
+        counter.inc("b")
+
+        assert counter.value("a") == 3
+        assert counter.render() == [
+            "# HELP jobs_total Jobs.",
+            "# TYPE jobs_total counter",
+            'jobs_total{kind="a"} 3.0',
+            'jobs_total{kind="b"} 1.0',
+        ]
+
+    def test_unlabelled_counter_renders_zero(self):
+        assert Counter("idle_total", "Idle.").render()[-1] == "idle_total 0.0"
+
+
+class TestHistogram:
+    def test_buckets_are_cumulative(self):
+        histogram = Histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 5.0):
+            histogram.observe(value)
+
+        assert histogram.render()[2:] == [
+            'latency_seconds_bucket{le="0.1"} 2',
+            'latency_seconds_bucket{le="1.0"} 3',
+            'latency_seconds_bucket{le="+Inf"} 4',
+            "latency_seconds_sum 5.65",
+            "latency_seconds_count 4",
+        ]
+
+    def test_label_values_are_escaped(self):
+        histogram = Histogram("h", "H.", labelnames=("path",), buckets=(1.0,))
+        histogram.observe(0.5, 'a"b\\c')
+
+        assert 'h_count{path="a\\"b\\\\c"} 1' in histogram.render()
+
+    def test_registry_rejects_duplicate_names(self):
+        registry = MetricsRegistry()
+        registry.counter("dup_total", "Dup.")
+
+        with pytest.raises(ValueError):
+            registry.histogram("dup_total", "Dup.")
+
+    def test_registry_render(self):
+        registry = MetricsRegistry()
+        registry.counter("a_total", "A.").inc()
+        registry.histogram("b_seconds", "B.", buckets=(1.0,)).observe(0.5)
+
+        text = registry.render()
+
+        assert text.endswith("\n")
+        assert "# TYPE a_total counter\na_total 1.0\n# HELP b_seconds B." in text
+
+
+class TestSpans:
+    def test_span_records_stage(self):
+        before = STAGE_SECONDS.count("test_span")
+
+        with span("test_span"):
+            pass
+
+        assert STAGE_SECONDS.count("test_span") == before + 1
+
+    def test_span_records_on_error(self):
+        before = STAGE_SECONDS.count("test_span_error")
+
+        with pytest.raises(RuntimeError):
+            with span("test_span_error"):
+                raise RuntimeError("boom")
+
+        assert STAGE_SECONDS.count("test_span_error") == before + 1
+
+    def test_timed_decorator(self):
+        before = STAGE_SECONDS.count("test_decorated")
+
+        assert decorated(4) == 8
+        assert STAGE_SECONDS.count("test_decorated") == before + 1
+
+    def test_run_captured_returns_spans_instead_of_recording(self):
+        before = STAGE_SECONDS.count("test_worker_job")
+
+        result, spans = run_captured(timed_job, 1)
+
+        assert result == 2
+        assert [stage for stage, _ in spans] == ["test_worker_job"]
+        assert STAGE_SECONDS.count("test_worker_job") == before
+
+    @pytest.mark.parametrize("executor_factory", [ThreadPoolExecutor, None])
+    def test_worker_pool_records_worker_spans(self, executor_factory):
+        kwargs = {"executor_factory": executor_factory} if executor_factory else {}
+        pool = WorkerPool(max_workers=1, max_queue=1, **kwargs)
+        before = STAGE_SECONDS.count("test_worker_job")
+        try:
+            result = asyncio.run(pool.run(timed_job, 1))
+        finally:
+            pool.shutdown()
+
+        assert result == 2
+        assert STAGE_SECONDS.count("test_worker_job") == before + 1
+
+
+class TestMetricsMiddleware:
+    @pytest.fixture
+    def client(self):
+        app = FastAPI()
+
+        @app.get("/items/{item_id}")
+        async def get_item(item_id: str):
+            if item_id == "missing":
+                raise HTTPException(status_code=404)
+            return {"id": item_id}
+
+        app.add_middleware(MetricsMiddleware)
+        return TestClient(app)
+
+    def test_labels_by_route_template(self, client):
+        before = HTTP_REQUEST_SECONDS.count("GET", "/items/{item_id}", "200")
+
+        client.get("/items/1")
+        client.get("/items/2")
+
+        assert HTTP_REQUEST_SECONDS.count("GET", "/items/{item_id}", "200") == before + 2
+
+    def test_records_status_and_unmatched_routes(self, client):
+        missing = HTTP_REQUEST_SECONDS.count("GET", "/items/{item_id}", "404")
+        unmatched = HTTP_REQUEST_SECONDS.count("GET", "unmatched", "404")
+
+        client.get("/items/missing")
+        client.get("/nowhere")
+
+        assert HTTP_REQUEST_SECONDS.count("GET", "/items/{item_id}", "404") == missing + 1
+        assert HTTP_REQUEST_SECONDS.count("GET", "unmatched", "404") == unmatched + 1
@@ -0,0 +1,365 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+from app.config.settings import settings
+from app.models.analysis import AnalysisResult, Analytics, Distribution
+from app.models.bin import Bin
+from app.models.bullet_point import BulletPoint, FormattingInfo
+from app.models.onboarding import OnboardingData
+from app.routers.narrative import _is_retryable, narrative_jobs
+from app.services import narrative as narrative_module
+from app.services.jobs import JobQueue
+from app.services.narrative import (
+    NarrativeCache,
+    NarrativeResponse,
+    NarrativeService,
+    narrative_service,
+)
+from app.services.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    LatencyTracker,
+    RetryPolicy,
+    UpstreamAuthError,
+    UpstreamUnavailableError,
+)
+from tests.fake_upstream import FakeUpstream
+
+
+@pytest.fixture
+def upstream():
+    server = FakeUpstream().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def service(upstream):
+    service = NarrativeService(api_key="test-key", base_url=upstream.base_url, model="test")
+    service.resilience.retry = RetryPolicy(max_attempts=3, base_delay=0)
+    return service
+
+
+def create_analysis(word: str = "Builder") -> AnalysisResult:
+    bullets = [
+        BulletPoint(id="1", text="Built ML pipeline", formatting=FormattingInfo(), original_index=0)
+    ]
+    return AnalysisResult(
+        bins=[Bin(id="skillset", label="Skillset", color="#000", bullets=bullets)],
+        analytics=Analytics(
+            distribution=[Distribution(bin_id="skillset", count=1, percentage=100.0)],
+            top_category="Skillset",
+            suggestions=[],
+        ),
+        timestamp=datetime(2024, 1, 1),
+        onboardingData=OnboardingData(
+            paragraph="I like building things.",
+            sentence="I build.",
+            word=word,
+            careerValue="Impact",
+        ),
+    )
+
+
+class TestNarrativeService:
+    def test_sync_generation(self, service, upstream):
+        result = service.generate_narrative(create_analysis())
+
+        assert result.paragraph.startswith("Your word")
+        assert result.experienceSuggestions[0].alignment == "strong"
+        assert upstream.requests[0]["model"] == "test"
+
+    def test_async_generation(self, service):
+        async def scenario():
+            try:
+                return await service.generate_narrative_async(create_analysis())
+            finally:
+                await service.aclose()
+
+        result = asyncio.run(scenario())
+
+        assert len(result.bullets) == 2
+
+    def test_async_calls_run_concurrently(self, service, upstream):
+        upstream.latency = 0.2
+
+        async def scenario():
+            try:
+                return await asyncio.gather(
+                    *(service.generate_narrative_async(create_analysis(f"Word{i}")) for i in range(4))
+                )
+            finally:
+                await service.aclose()
+
+        start = time.perf_counter()
+        results = asyncio.run(scenario())
+        elapsed = time.perf_counter() - start
+
+        assert len(results) == 4
+        assert elapsed < 0.6
+
+    def test_identical_async_requests_share_one_call(self, service, upstream):
+        upstream.latency = 0.2
+
+        async def scenario():
+            try:
+                return await asyncio.gather(
+                    *(service.generate_narrative_async(create_analysis()) for _ in range(5))
+                )
+            finally:
+                await service.aclose()
+
+        results = asyncio.run(scenario())
+
+        assert len(upstream.requests) == 1
+        assert all(result == results[0] for result in results)
+
+    def test_identical_sync_requests_share_one_call(self, service, upstream):
+        upstream.latency = 0.2
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(
+                executor.map(lambda _: service.generate_narrative(create_analysis()), range(4))
+            )
+
+        assert len(upstream.requests) == 1
+        assert all(result == results[0] for result in results)
+
+    def test_coalesced_error_reaches_every_caller(self, service, upstream):
+        upstream.latency = 0.1
+        upstream.failures = [400]
+
+        async def scenario():
+            try:
+                return await asyncio.gather(
+                    *(service.generate_narrative_async(create_analysis()) for _ in range(3)),
+                    return_exceptions=True,
+                )
+            finally:
+                await service.aclose()
+
+        results = asyncio.run(scenario())
+
+        assert len(upstream.requests) == 1
+        assert all(isinstance(result, Exception) for result in results)
+
+    def test_missing_onboarding_skips_upstream(self, service, upstream):
+        analysis = create_analysis()
+        analysis.onboardingData = None
+
+        result = asyncio.run(service.generate_narrative_async(analysis))
+
+        assert "onboarding" in result.paragraph.lower()
+        assert upstream.requests == []
+
+    def test_cache_hit_skips_upstream(self, upstream):
+        service = NarrativeService(
+            api_key="test-key",
+            base_url=upstream.base_url,
+            model="test",
+            cache=NarrativeCache(max_entries=8),
+        )
+
+        assert service.get_cached(create_analysis()) is None
+        generated = service.generate_narrative(create_analysis())
+        cached = service.get_cached(create_analysis())
+
+        assert cached == generated
+        assert len(upstream.requests) == 1
+        assert service.cache.stats()["hits"] == 1
+
+    def test_cache_key_depends_on_prompt(self, service):
+        first = NarrativeCache.make_key(service._completion_params(create_analysis("Builder")))
+        second = NarrativeCache.make_key(service._completion_params(create_analysis("Helper")))
+
+        assert first != second
+
+    def test_stream_narrative(self, service):
+        async def scenario():
+            try:
+                return [e async for e in service.stream_narrative(create_analysis())]
+            finally:
+                await service.aclose()
+
+        events = asyncio.run(scenario())
+        names = [name for name, _ in events]
+
+        assert names == ["paragraph", "bullet", "bullet", "experienceSuggestion", "narrative"]
+        assert events[1][1] == "Lead with your word"
+        assert events[3][1].alignment == "strong"
+        assert events[-1][1].bullets == [events[1][1], events[2][1]]
+
+    def test_stream_span_excludes_opening(self, service, upstream, monkeypatch):
+        upstream.latency = 0.3
+        recorded = {}
+        monkeypatch.setattr(
+            narrative_module, "record_span", lambda stage, elapsed: recorded.setdefault(stage, elapsed)
+        )
+
+        async def scenario():
+            try:
+                return [e async for e in service.stream_narrative(create_analysis())]
+            finally:
+                await service.aclose()
+
+        asyncio.run(scenario())
+
+        assert recorded["ai_stream"] < 0.3
+
+
+class TestNarrativeResilience:
+    def test_retries_server_errors(self, service, upstream):
+        upstream.failures = [500, 503]
+
+        result = service.generate_narrative(create_analysis())
+
+        assert result.paragraph.startswith("Your word")
+        assert len(upstream.requests) == 3
+
+    def test_retries_rate_limit_async(self, service, upstream):
+        upstream.failures = [429]
+
+        async def scenario():
+            try:
+                return await service.generate_narrative_async(create_analysis())
+            finally:
+                await service.aclose()
+
+        asyncio.run(scenario())
+
+        assert len(upstream.requests) == 2
+
+    def test_auth_error_not_retried(self, service, upstream):
+        upstream.failures = [401]
+
+        with pytest.raises(UpstreamAuthError):
+            service.generate_narrative(create_analysis())
+        assert len(upstream.requests) == 1
+
+    def test_circuit_opens_and_fails_fast(self, service, upstream):
+        service.resilience.breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+        upstream.failures = [500] * 3
+
+        with pytest.raises(UpstreamUnavailableError):
+            service.generate_narrative(create_analysis())
+        with pytest.raises(CircuitOpenError):
+            service.generate_narrative(create_analysis("Helper"))
+        assert len(upstream.requests) == 3
+
+    def test_job_retries_do_not_multiply_upstream_calls(self, service, upstream):
+        upstream.failures = [503] * 9
+
+        async def handler(payload):
+            return await service.generate_narrative_async(AnalysisResult.model_validate(payload))
+
+        queue = JobQueue(
+            handler=handler,
+            max_attempts=3,
+            retry_backoff_seconds=0.01,
+            is_retryable=_is_retryable,
+        )
+
+        async def scenario():
+            job = await queue.submit(create_analysis().model_dump(mode="json"))
+            try:
+                for _ in range(200):
+                    if queue.get(job.id).finished:
+                        return queue.get(job.id)
+                    await asyncio.sleep(0.01)
+            finally:
+                await queue.stop()
+                await service.aclose()
+
+        job = asyncio.run(scenario())
+
+        assert job.status == "failed"
+        assert job.attempts == 1
+        assert len(upstream.requests) == 3
+
+    def test_open_circuit_is_retried_as_a_job(self):
+        assert _is_retryable(CircuitOpenError("open"))
+        assert not _is_retryable(UpstreamUnavailableError("down"))
+
+    def test_hedges_slow_request(self, service, upstream):
+        latency = LatencyTracker(min_samples=1)
+        latency.record(0.05)
+        service.resilience.latency = latency
+        service.resilience.hedge_percentile = 0.95
+        upstream.latencies = [1.0, 0.0]
+
+        async def scenario():
+            try:
+                return await service.generate_narrative_async(create_analysis())
+            finally:
+                await service.aclose()
+
+        start = time.perf_counter()
+        result = asyncio.run(scenario())
+        elapsed = time.perf_counter() - start
+
+        assert len(result.bullets) == 2
+        assert len(upstream.requests) == 2
+        assert elapsed < 0.8
+
+
+class TestNarrativeJobsRoute:
+    @pytest.mark.parametrize(
+        "callback_url", ["ftp://example.com/hook", "http://169.254.169.254/latest/meta-data"]
+    )
+    def test_rejects_unsafe_callback_url(self, client, callback_url):
+        response = client.post(
+            "/api/narrative/jobs",
+            params={"callback_url": callback_url},
+            json=create_analysis().model_dump(mode="json"),
+        )
+
+        assert response.status_code == 400
+        assert response.json()["detail"].startswith("callback_url")
+
+    def test_cache_hit_keeps_callback_url(self, client, monkeypatch):
+        cached = NarrativeResponse(paragraph="Cached", bullets=[])
+
+        async def get_cached(analysis):
+            return cached
+
+        monkeypatch.setattr(narrative_service, "get_cached_async", get_cached)
+        monkeypatch.setattr(settings, "narrative_job_callback_allowed_hosts", ["hooks.example.com"])
+        monkeypatch.setattr(narrative_jobs, "callback_allowed_hosts", ["hooks.example.com"])
+        delivered = []
+
+        async def deliver(job):
+            delivered.append(job.callback_url)
+            return True
+
+        monkeypatch.setattr(narrative_jobs, "_deliver_callback", deliver)
+
+        response = client.post(
+            "/api/narrative/jobs",
+            params={"callback_url": "https://hooks.example.com/done"},
+            json=create_analysis().model_dump(mode="json"),
+        )
+
+        assert response.status_code == 202
+        assert response.headers["X-Cache"] == "HIT"
+        assert response.json()["callback_url"] == "https://hooks.example.com/done"
+        assert delivered == ["https://hooks.example.com/done"]
+
+    def test_cache_hits_count_against_default_rate_limit(self, client, monkeypatch):
+        cached = NarrativeResponse(paragraph="Cached", bullets=[])
+
+        async def get_cached(analysis):
+            return cached
+
+        monkeypatch.setattr(narrative_service, "get_cached_async", get_cached)
+        body = create_analysis().model_dump(mode="json")
+
+        statuses = [
+            client.post("/api/narrative", json=body).status_code
+            for _ in range(settings.rate_limit_default_max_requests + 1)
+        ]
+
+        assert statuses[:-1] == [200] * settings.rate_limit_default_max_requests
+        assert statuses[-1] == 429
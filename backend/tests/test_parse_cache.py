@@ -0,0 +1,159 @@
+import asyncio
+import os
+import threading
+import time
+
+from app.models.bullet_point import BulletPoint, FormattingInfo
+from app.services.parse_cache import ParseCache
+from app.utils.cache import DiskCache, LRUCache
+
+
+def create_bullet(text: str) -> BulletPoint:
+    return BulletPoint(
+        id=f"id-{text}",
+        text=text,
+        formatting=FormattingInfo(bold=[False] * len(text), italic=[False] * len(text)),
+        original_index=0,
+    )
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestLRUCache:
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_expires_after_ttl(self):
+        clock = FakeClock()
+        cache = LRUCache(max_entries=10, ttl_seconds=5, clock=clock)
+        cache.set("a", 1)
+
+        clock.now = 4.9
+        assert cache.get("a") == 1
+        clock.now = 5.0
+        assert cache.get("a") is None
+
+
+class TestDiskCache:
+    def test_sweep_removes_expired_entries(self, tmp_path):
+        cache = DiskCache(str(tmp_path), ttl_seconds=60)
+        cache.set("old", "x")
+        cache.set("new", "y")
+        old = cache._path("old")
+        os.utime(old, (time.time() - 120, time.time() - 120))
+
+        assert cache.sweep() == 1
+        assert not old.exists()
+        assert cache.get("new") == "y"
+
+    def test_sweep_keeps_within_bounds(self, tmp_path):
+        cache = DiskCache(str(tmp_path), max_bytes=25, sweep_every=1)
+        for n in range(10):
+            cache.set(f"key{n}", "x" * 10)
+            os.utime(cache._path(f"key{n}"), (n, n))
+
+        assert len(list(tmp_path.glob("*.json"))) == 2
+        assert cache.get("key9") == "x" * 10
+        assert cache.get("key0") is None
+
+    def test_sweeps_on_startup(self, tmp_path):
+        cache = DiskCache(str(tmp_path))
+        for n in range(5):
+            cache.set(f"key{n}", "x")
+
+        DiskCache(str(tmp_path), max_entries=3)
+
+        assert len(list(tmp_path.glob("*.json"))) == 3
+
+
+class TestParseCache:
+    def test_miss_then_hit(self):
+        cache = ParseCache(max_entries=4)
+        key = ParseCache.make_key("abc", "pdf")
+
+        assert cache.get(key) is None
+        cache.set(key, [create_bullet("Led team")])
+
+        assert [b.text for b in cache.get(key)] == ["Led team"]
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_key_includes_file_type_and_parser_version(self):
+        assert ParseCache.make_key("abc", "pdf") != ParseCache.make_key("abc", "docx")
+        assert "abc" in ParseCache.make_key("abc", "pdf")
+
+    def test_disk_tier_survives_restart(self, tmp_path):
+        key = ParseCache.make_key("abc", "pdf")
+        ParseCache(max_entries=4, disk_dir=str(tmp_path)).set(
+            key, [create_bullet("Led team")]
+        )
+
+        restarted = ParseCache(max_entries=4, disk_dir=str(tmp_path))
+        bullets = restarted.get(key)
+
+        assert [b.text for b in bullets] == ["Led team"]
+        assert restarted.stats()["disk_hits"] == 1
+
+    def test_returns_copies(self):
+        cache = ParseCache(max_entries=4)
+        key = ParseCache.make_key("abc", "pdf")
+        bullets = [create_bullet("Led team")]
+        cache.set(key, bullets)
+        bullets[0].text = "changed by caller"
+
+        first = cache.get(key)
+        first[0].text = "changed by request"
+
+        assert cache.get(key)[0].text == "Led team"
+        assert cache.get(key)[0] is not cache.get(key)[0]
+
+    def test_async_disk_access_runs_off_the_loop(self, tmp_path, monkeypatch):
+        key = ParseCache.make_key("abc", "pdf")
+        cache = ParseCache(max_entries=4, disk_dir=str(tmp_path))
+        threads = []
+        for name in ("get", "set"):
+            method = getattr(cache._disk, name)
+
+            def tracking(*args, method=method):
+                threads.append(threading.get_ident())
+                return method(*args)
+
+            monkeypatch.setattr(cache._disk, name, tracking)
+
+        async def scenario():
+            assert await cache.get_async(key) is None
+            await cache.set_async(key, [create_bullet("Led team")])
+            return threading.get_ident()
+
+        loop_thread = asyncio.run(scenario())
+        restarted = ParseCache(max_entries=4, disk_dir=str(tmp_path))
+
+        assert len(threads) == 2 and loop_thread not in threads
+        assert [b.text for b in asyncio.run(restarted.get_async(key))] == ["Led team"]
+        assert restarted.stats()["disk_hits"] == 1
+
+    def test_memory_hit_is_fast(self):
+        cache = ParseCache(max_entries=4)
+        key = ParseCache.make_key("abc", "pdf")
+        cache.set(key, [create_bullet(f"Bullet {i}") for i in range(50)])
+
+        start = time.perf_counter()
+        for _ in range(1000):
+            cache.get(key)
+        per_hit = (time.perf_counter() - start) / 1000
+
+        assert per_hit < 0.001
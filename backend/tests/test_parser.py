@@ -1,5 +1,20 @@
+import asyncio
+import subprocess
+import sys
+import time
+import zipfile
+from io import BytesIO
+
+import pdfplumber
 import pytest
-from app.services.parser import ResumeParser
+from docx import Document
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate
+from app.services.parser import ResumeParser, parse_batch
+from app.services.worker_pool import WorkerPool
+from app.utils.metrics import STAGE_SECONDS
 
 
 @pytest.fixture
@@ -7,6 +22,93 @@ def parser():
     return ResumeParser()
 
 
+@pytest.fixture
+def pool():
+    pool = WorkerPool(max_workers=2, max_queue=2, timeout_seconds=30)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.fixture
+def pdf_bytes():
+    buffer = BytesIO()
+    styles = getSampleStyleSheet()
+    SimpleDocTemplate(buffer).build(
+        [
+            Paragraph("EXPERIENCE", styles["Normal"]),
+            Paragraph("- Built ML pipeline using TensorFlow", styles["Normal"]),
+            Paragraph("- Developed REST API with FastAPI", styles["Normal"]),
+        ]
+    )
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def formatted_pdf_bytes():
+    buffer = BytesIO()
+    styles = getSampleStyleSheet()
+    SimpleDocTemplate(buffer).build(
+        [
+            Paragraph("- Built a <b>thing</b> that <i>works</i>", styles["Normal"]),
+            Paragraph("- <b>Lead</b>ership of <b>two teams</b>", styles["Normal"]),
+        ]
+    )
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def multipage_pdf_bytes():
+    buffer = BytesIO()
+    styles = getSampleStyleSheet()
+    SimpleDocTemplate(buffer).build(
+        [
+            Paragraph("- Bullet on the first page", styles["Normal"]),
+            Paragraph("- Bullet that wraps onto", styles["Normal"]),
+            PageBreak(),
+            Paragraph("the second page", styles["Normal"]),
+            Paragraph("- Last bullet", styles["Normal"]),
+        ]
+    )
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def two_column_pdf_bytes():
+    """
+    Two columns of tightly leaded lines (9pt leading for 10pt text), each
+    with a word whose bold part is kerned 2pt away from the rest.
+    """
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer)
+    for x, column in ((72, "Left"), (320, "Right")):
+        y = 700
+        for n in range(6):
+            prefix = f"- {column} bullet {n} with "
+            pdf.setFont("Helvetica", 10)
+            pdf.drawString(x, y, prefix)
+            bold_x = x + stringWidth(prefix, "Helvetica", 10)
+            pdf.setFont("Helvetica-Bold", 10)
+            pdf.drawString(bold_x, y, "Lead")
+            pdf.setFont("Helvetica", 10)
+            pdf.drawString(bold_x + stringWidth("Lead", "Helvetica-Bold", 10) + 2, y, "ership")
+            y -= 9
+    pdf.save()
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def docx_bytes():
+    buffer = BytesIO()
+    doc = Document()
+    doc.add_paragraph("Experience")
+    paragraph = doc.add_paragraph("Built ", style="List Bullet")
+    paragraph.add_run("ML pipeline").bold = True
+    paragraph.add_run(" using ")
+    paragraph.add_run("TensorFlow").italic = True
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
 class TestResumeParser:
     def test_bullet_pattern_detection_bullet(self, parser):
         assert parser.BULLET_PREFIX_RE.match("• Built ML pipeline")
@@ -56,8 +158,11 @@ class TestResumeParser:
 
         assert len(bullets) == 1
         assert bullets[0].formatting is not None
-        assert len(bullets[0].formatting.bold) == len(bullets[0].text)
-        assert len(bullets[0].formatting.italic) == len(bullets[0].text)
+        assert bullets[0].formatting.spans == []
+
+        legacy = bullets[0].to_legacy()["formatting"]
+        assert len(legacy["bold"]) == len(bullets[0].text)
+        assert len(legacy["italic"]) == len(bullets[0].text)
 
     def test_multiline_bullet(self, parser):
         text = """• This is a bullet point that
@@ -75,3 +180,208 @@ class TestResumeParser:
         assert parser._looks_like_header("WORK EXPERIENCE")
         assert parser._looks_like_header("Skills:")
         assert not parser._looks_like_header("Built a machine learning pipeline")
+
+    def test_font_style_cache_ignores_subset_prefix(self, parser):
+        assert parser._font_style("ABCDEF+Helvetica-Bold") == (True, False)
+        assert parser._font_style("GHIJKL+Helvetica-Bold") == (True, False)
+        assert parser._font_style("MNOPQR+Times-Italic") == (False, True)
+
+        assert set(parser._font_styles) == {"Helvetica-Bold", "Times-Italic"}
+
+    def test_font_style_cache_is_bounded(self, parser):
+        for n in range(parser.FONT_STYLE_CACHE_SIZE * 2):
+            parser._font_style(f"Font{n}-Bold")
+
+        assert len(parser._font_styles) <= parser.FONT_STYLE_CACHE_SIZE
+
+    @pytest.mark.parametrize("line", ["Ⓐ", "ⅫⅫⅫⅫⅫⅫⅫⅫⅫ ok", "Ⅰ. Ⅱ. Ⅲ."])
+    def test_uppercase_non_letters_are_not_headers(self, parser, line):
+        assert not parser._looks_like_header(line)
+
+    def test_section_heading_detection(self, parser):
+        assert parser._looks_like_header("Education")
+        assert parser._looks_like_header("Work Experience")
+        assert parser._looks_like_header("Technical skills:")
+        assert not parser._looks_like_header("Education policy research")
+
+    @pytest.mark.parametrize(
+        "line",
+        [
+            "• Built ML pipeline",
+            "•\tTabbed bullet",
+            "•",
+            "•Glued",
+            "- Dash bullet",
+            "-",
+            "– En dash",
+            "* Star",
+            "12. Numbered",
+            "12.Numbered",
+            "\uf0b7 Wingdings",
+            "\uf0b7",
+            "○",
+            "Plain continuation",
+        ],
+    )
+    def test_line_classifier_matches_bullet_patterns(self, parser, line):
+        kind, m = parser._classify_line(line)
+
+        prefix = parser.BULLET_PREFIX_RE.match(line)
+        assert (kind == "bullet") == bool(prefix)
+        assert (kind == "bullet_only") == bool(parser.BULLET_ONLY_RE.match(line))
+        if prefix:
+            assert m.group("text") == line[prefix.end():]
+
+    def test_parse_pdf_from_bytes(self, parser, pdf_bytes):
+        bullets = parser.parse_pdf(pdf_bytes)
+
+        assert [b.text for b in bullets] == [
+            "Built ML pipeline using TensorFlow",
+            "Developed REST API with FastAPI",
+        ]
+
+    def test_parse_pdf_from_memoryview_and_file(self, parser, pdf_bytes):
+        from_view = parser.parse_pdf(memoryview(pdf_bytes))
+        from_file = parser.parse_pdf(BytesIO(pdf_bytes))
+
+        assert [b.text for b in from_view] == [b.text for b in from_file]
+        assert len(from_view) == 2
+
+    def test_parse_docx_from_bytes(self, parser, docx_bytes):
+        bullets = parser.parse_docx(docx_bytes)
+
+        assert len(bullets) == 1
+        assert bullets[0].text == "Built ML pipeline using TensorFlow"
+
+    def test_bullet_spanning_page_break(self, parser, multipage_pdf_bytes):
+        bullets = parser.parse_pdf(multipage_pdf_bytes)
+
+        assert [b.text for b in bullets] == [
+            "Bullet on the first page",
+            "Bullet that wraps onto the second page",
+            "Last bullet",
+        ]
+
+    def test_iter_pdf_bullets_yields_before_document_end(
+        self, parser, multipage_pdf_bytes
+    ):
+        bullets = parser.iter_pdf_bullets(multipage_pdf_bytes)
+
+        assert next(bullets).text == "Bullet on the first page"
+        assert len(list(bullets)) == 2
+
+    def test_original_index_tracks_source_lines(self, parser):
+        lines = [
+            "EXPERIENCE",
+            "• Built ML pipeline",
+            "using TensorFlow",
+            "",
+            "•",
+            "Marker on its own line",
+            "Skills:",
+            "- Python",
+        ]
+        full = parser._extract_bullets_from_text("\n".join(lines))
+
+        assert [(b.text, b.original_index) for b in full] == [
+            ("Built ML pipeline using TensorFlow", 1),
+            ("Marker on its own line", 4),
+            ("Python", 7),
+        ]
+
+    def test_parse_many(self, parser, pool, pdf_bytes, docx_bytes):
+        result = parser.parse_many(
+            {"a.pdf": pdf_bytes, "b.docx": docx_bytes, "c.txt": b"hello"}, pool
+        )
+
+        assert len(result.results["a.pdf"]) == 2
+        assert len(result.results["b.docx"]) == 1
+        assert "c.txt" in result.errors
+
+    def test_iter_stops_at_deadline(self, parser, pdf_bytes, docx_bytes):
+        with pytest.raises(TimeoutError):
+            list(parser.iter_pdf_bullets(pdf_bytes, expires_at=time.time() - 1))
+        with pytest.raises(TimeoutError):
+            list(parser.iter_docx_bullets(docx_bytes, expires_at=time.time() - 1))
+
+    def test_parse_many_records_worker_spans(self, parser, pool, pdf_bytes):
+        before = STAGE_SECONDS.count("pdf_open")
+
+        parser.parse_many({"a.pdf": pdf_bytes, "b.pdf": pdf_bytes}, pool)
+
+        assert STAGE_SECONDS.count("pdf_open") == before + 2
+
+    def test_parse_many_reports_failures_by_filename(self, parser, pool, pdf_bytes):
+        result = parser.parse_many([("good.pdf", pdf_bytes), ("broken.pdf", b"not a pdf")], pool)
+
+        assert list(result.results) == ["good.pdf"]
+        assert "broken.pdf" in result.errors
+
+    def test_parse_many_from_zip(self, parser, pool, pdf_bytes, tmp_path):
+        archive = tmp_path / "cohort.zip"
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.writestr("students/one.pdf", pdf_bytes)
+            zf.writestr("students/two.pdf", pdf_bytes)
+
+        result = parser.parse_many(str(archive), pool)
+
+        assert sorted(result.results) == ["students/one.pdf", "students/two.pdf"]
+        assert result.errors == {}
+
+    def test_parse_many_reuses_the_pool(self, parser, pool, pdf_bytes):
+        parser.parse_many({"a.pdf": pdf_bytes}, pool)
+        executor = pool.executor
+        parser.parse_many({"b.pdf": pdf_bytes}, pool)
+
+        assert pool.executor is executor
+
+    def test_batch_past_deadline_reads_nothing(self, pool):
+        def unread():
+            raise AssertionError("file was read")
+
+        entries = [("a.pdf", unread, None), ("b.pdf", unread, None)]
+        result = asyncio.run(parse_batch(entries, pool, deadline_seconds=0))
+
+        assert result.errors == {
+            "a.pdf": "Batch deadline exceeded",
+            "b.pdf": "Batch deadline exceeded",
+        }
+
+    def test_batch_file_cap_and_duplicate_names(self, pool, pdf_bytes):
+        entries = [(name, lambda: pdf_bytes, None) for name in ("a.pdf", "a.pdf", "b.pdf")]
+
+        result = asyncio.run(parse_batch(entries, pool, max_files=2))
+
+        assert sorted(result.results) == ["a (2).pdf", "a.pdf"]
+        assert result.errors == {"b.pdf": "Batch is limited to 2 files"}
+
+    def test_docx_formatting_spans(self, parser, docx_bytes):
+        bullet = parser.parse_docx(docx_bytes)[0]
+
+        assert bullet.formatting.spans == [(6, 17, True, False), (24, 34, False, True)]
+        assert bullet.text[6:17] == "ML pipeline"
+
+    def test_pdf_formatting_from_fonts(self, parser, formatted_pdf_bytes):
+        first, second = parser.parse_pdf(formatted_pdf_bytes)
+
+        assert first.text == "Built a thing that works"
+        assert first.formatting.spans == [(8, 13, True, False), (19, 24, False, True)]
+        assert second.text == "Leadership of two teams"
+        assert second.formatting.spans == [(0, 4, True, False), (14, 23, True, False)]
+
+    def test_pdf_lines_match_extract_text(self, parser, two_column_pdf_bytes):
+        with pdfplumber.open(BytesIO(two_column_pdf_bytes)) as pdf:
+            page = pdf.pages[0]
+            expected = page.extract_text()
+            lines = list(parser._iter_pdf_lines(page))
+
+        assert "\n".join(text for text, _ in lines) == expected
+        for text, spans in lines:
+            assert [text[start:end] for start, end, _, _ in spans] == ["Lead", "Lead"]
+
+
+def test_parser_does_not_import_web_framework():
+    # Worker processes import the parser; they should not pay for fastapi
+    code = "import sys, app.services.parser; print('fastapi' in sys.modules)"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == "False"
@@ -0,0 +1,100 @@
+import pytest
+from app.models.bin import Bin
+from app.models.bullet_point import BulletPoint, FormattingInfo
+from app.services.prompt_builder import ExperiencePromptBuilder, estimate_tokens
+
+
+@pytest.fixture
+def builder():
+    return ExperiencePromptBuilder()
+
+
+def create_bin(bin_id: str, texts: list) -> Bin:
+    bullets = [
+        BulletPoint(id=f"{bin_id}-{i}", text=t, formatting=FormattingInfo(), original_index=i)
+        for i, t in enumerate(texts)
+    ]
+    return Bin(id=bin_id, label=bin_id.title(), color="#000", bullets=bullets)
+
+
+class TestExperiencePromptBuilder:
+    def test_matches_plain_listing_when_within_budget(self, builder):
+        bins = [
+            create_bin("skillset", ["Built ML pipeline", "Wrote API docs"]),
+            create_bin("values", []),
+        ]
+
+        text, report = builder.build(bins, token_budget=1000)
+
+        assert text == "\n=== SKILLSET ===\n1. Built ML pipeline\n2. Wrote API docs"
+        assert report.dropped == 0
+
+    def test_empty_bins(self, builder):
+        text, _ = builder.build([create_bin("skillset", [])])
+
+        assert text == "No experiences categorized yet."
+
+    def test_truncates_long_bullets(self, builder):
+        text, _ = builder.build([create_bin("skillset", ["x" * 400])])
+
+        assert "x" * 300 + "..." in text
+        assert "x" * 301 not in text
+
+    def test_drops_near_duplicates_across_bins(self, builder):
+        bins = [
+            create_bin("skillset", ["Led a team of 5 engineers to ship the mobile app"]),
+            create_bin("strengths", ["Led team of 5 engineers to ship the mobile app."]),
+        ]
+
+        text, report = builder.build(bins)
+
+        assert len(report.dropped_duplicates) == 1
+        assert report.included == 1
+        assert "=== STRENGTHS ===" not in text
+
+    def test_budget_keeps_every_category_represented(self, builder):
+        bins = [
+            create_bin("interests", [f"Explored topic number {i} in depth" for i in range(40)]),
+            create_bin("values", ["Volunteered weekly at the food bank"]),
+        ]
+
+        text, report = builder.build(bins, token_budget=120)
+
+        assert report.dropped_for_budget
+        assert "Volunteered weekly at the food bank" in text
+        assert estimate_tokens(text) <= 120
+
+    @pytest.mark.parametrize("budget", [45, 60, 90, 150, 400])
+    def test_rendered_section_fits_budget(self, builder, budget):
+        bins = [
+            create_bin("interests", [f"Explored topic number {i} in depth" for i in range(12)]),
+            create_bin("values", [f"Volunteered at shelter {i} every week" for i in range(12)]),
+        ]
+
+        text, report = builder.build(bins, token_budget=budget)
+
+        assert estimate_tokens(text) <= budget
+        assert report.included > 0
+
+    @pytest.mark.parametrize("budget", [0, -5])
+    def test_no_budget_reports_omitted_bullets(self, builder, budget):
+        bins = [create_bin("skillset", ["Built ML pipeline", "Wrote API docs"])]
+
+        text, report = builder.build(bins, token_budget=budget)
+
+        assert text == "(2 experiences omitted to fit the prompt budget)"
+        assert report.included == 0
+        assert len(report.dropped_for_budget) == 2
+
+    def test_prefers_bullets_with_metrics(self, builder):
+        bins = [
+            create_bin(
+                "skillset",
+                ["Helped with various tasks", "Cut query latency 40% for 2M users"],
+            )
+        ]
+
+        text, _ = builder.build(bins, token_budget=30)
+
+        assert "40%" in text
+        assert "various tasks" not in text
@@ -0,0 +1,267 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from app.middleware.rate_limit import (
+    InMemoryRateLimitBackend,
+    RateLimiter,
+    RateLimitMiddleware,
+    RateLimitPolicy,
+    SQLiteRateLimitBackend,
+)
+from app.utils.metrics import RATE_LIMIT_REJECTIONS
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return InMemoryRateLimitBackend()
+    return SQLiteRateLimitBackend(str(tmp_path / "limits.db"))
+
+
+class TestRateLimiter:
+    def test_allows_burst_up_to_limit(self, backend, clock):
+        limiter = RateLimiter(backend, clock=clock)
+
+        results = [limiter.allow("ip", 3, 60) for _ in range(4)]
+
+        assert results == [True, True, True, False]
+
+    def test_refills_at_steady_rate(self, backend, clock):
+        limiter = RateLimiter(backend, clock=clock)
+        for _ in range(2):
+            limiter.allow("ip", 2, 60)
+
+        clock.now += 29
+        assert not limiter.allow("ip", 2, 60)
+        clock.now += 1
+        assert limiter.allow("ip", 2, 60)
+
+    def test_decision_reports_remaining_and_retry_after(self, backend, clock):
+        limiter = RateLimiter(backend, clock=clock)
+
+        first = limiter.check("ip", 2, 60)
+        second = limiter.check("ip", 2, 60)
+        rejected = limiter.check("ip", 2, 60)
+
+        assert (first.remaining, first.retry_after) == (1, 0)
+        assert (second.remaining, second.retry_after) == (0, 30)
+        assert not rejected.allowed
+        assert rejected.retry_after == 30
+        assert rejected.reset_after == 60
+
+    def test_keys_are_independent(self, backend, clock):
+        limiter = RateLimiter(backend, clock=clock)
+
+        assert limiter.allow("a", 1, 60)
+        assert not limiter.allow("a", 1, 60)
+        assert limiter.allow("b", 1, 60)
+
+    def test_idle_keys_evicted(self, backend, clock):
+        limiter = RateLimiter(backend, clock=clock)
+        for i in range(10):
+            limiter.allow(f"ip{i}", 5, 60)
+
+        clock.now += 60
+        evicted = backend.evict_idle(clock.now)
+
+        assert evicted == 10
+        assert len(backend) == 0
+
+    def test_concurrent_requests_never_exceed_limit(self, backend):
+        limiter = RateLimiter(backend)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: limiter.allow("ip", 50, 3600), range(200)))
+
+        assert sum(results) == 50
+
+    def test_in_memory_eviction_runs_automatically(self, clock):
+        backend = InMemoryRateLimitBackend(shards=1, evict_every=10)
+        limiter = RateLimiter(backend, clock=clock)
+        for i in range(9):
+            limiter.allow(f"ip{i}", 5, 60)
+
+        clock.now += 60
+        limiter.allow("new", 5, 60)
+
+        assert len(backend) == 1  # only "new" is still refilling
+
+    def test_sqlite_limits_shared_between_workers(self, tmp_path, clock):
+        path = str(tmp_path / "limits.db")
+        worker_a = RateLimiter(SQLiteRateLimitBackend(path), clock=clock)
+        worker_b = RateLimiter(SQLiteRateLimitBackend(path), clock=clock)
+
+        assert worker_a.allow("ip", 2, 60)
+        assert worker_b.allow("ip", 2, 60)
+        assert not worker_a.allow("ip", 2, 60)
+        assert not worker_b.allow("ip", 2, 60)
+
+    def test_blocking_backend_checked_off_event_loop(self, tmp_path):
+        backend = SQLiteRateLimitBackend(str(tmp_path / "limits.db"))
+        threads = []
+        update = backend.update
+
+        def recording_update(*args):
+            threads.append(threading.get_ident())
+            return update(*args)
+
+        backend.update = recording_update
+        limiter = RateLimiter(backend)
+
+        async def scenario():
+            return threading.get_ident(), await limiter.check_async("ip", 5, 60)
+
+        loop_thread, decision = asyncio.run(scenario())
+
+        assert decision.allowed
+        assert threads and threads[0] != loop_thread
+
+    def test_sqlite_fails_open_when_locked(self, tmp_path, clock):
+        path = str(tmp_path / "limits.db")
+        limiter = RateLimiter(SQLiteRateLimitBackend(path, busy_timeout=0.05), clock=clock)
+        assert limiter.allow("ip", 1, 60)
+
+        other_worker = sqlite3.connect(path, isolation_level=None)
+        other_worker.execute("BEGIN IMMEDIATE")
+        try:
+            start = time.monotonic()
+            decision = limiter.check("ip", 1, 60)
+            elapsed = time.monotonic() - start
+        finally:
+            other_worker.execute("ROLLBACK")
+            other_worker.close()
+
+        assert decision.allowed
+        assert elapsed < 1.0
+        assert not limiter.allow("ip", 1, 60)
+
+
+async def echo_app(scope, receive, send):
+    charge = scope.get("state", {}).get("charge_rate_limit")
+    status = 200
+    if charge is not None and scope["path"].endswith("charged"):
+        status = 200 if (await charge()).allowed else 429
+    await send({"type": "http.response.start", "status": status, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def request(app, method: str, path: str):
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "headers": [],
+        "client": ("1.2.3.4", 5000),
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start = messages[0]
+    headers = {k.decode().lower(): v.decode() for k, v in start["headers"]}
+    return start["status"], headers
+
+
+@pytest.fixture
+def middleware(clock):
+    return RateLimitMiddleware(
+        echo_app,
+        limiter=RateLimiter(clock=clock),
+        policies=[
+            RateLimitPolicy("ai", 1, 60, paths=("/api/charged", "/api/free"), deferred=True),
+            RateLimitPolicy("default", 2, 60, path_prefix="/api"),
+        ],
+    )
+
+
+class TestRateLimitMiddleware:
+    def test_rejects_over_limit_with_headers(self, middleware):
+        statuses = [request(middleware, "GET", "/api/things")[0] for _ in range(2)]
+        status, headers = request(middleware, "GET", "/api/things")
+
+        assert statuses == [200, 200]
+        assert status == 429
+        assert headers["ratelimit-limit"] == "2"
+        assert headers["ratelimit-remaining"] == "0"
+        assert headers["retry-after"] == "30"
+
+    def test_successful_response_has_headers(self, middleware):
+        status, headers = request(middleware, "GET", "/api/things")
+
+        assert status == 200
+        assert headers["ratelimit-remaining"] == "1"
+        assert headers["ratelimit-reset"] == "30"
+        assert "retry-after" not in headers
+
+    def test_unmatched_paths_not_limited(self, middleware):
+        results = [request(middleware, "GET", "/health") for _ in range(5)]
+
+        assert all(status == 200 and not headers for status, headers in results)
+
+    def test_deferred_policy_charged_only_by_route(self, clock):
+        middleware = RateLimitMiddleware(
+            echo_app,
+            limiter=RateLimiter(clock=clock),
+            policies=[
+                RateLimitPolicy("ai", 1, 60, paths=("/api/charged", "/api/free"), deferred=True),
+                RateLimitPolicy("default", 10, 60, path_prefix="/api"),
+            ],
+        )
+
+        free = [request(middleware, "POST", "/api/free")[0] for _ in range(3)]
+        charged = [request(middleware, "POST", "/api/charged")[0] for _ in range(2)]
+
+        assert free == [200, 200, 200]
+        assert charged == [200, 429]
+
+    def test_deferred_paths_also_charged_by_other_policies(self, middleware):
+        results = [request(middleware, "POST", "/api/free") for _ in range(3)]
+
+        assert [status for status, _ in results] == [200, 200, 429]
+        assert results[1][1]["ratelimit-remaining"] == "0"
+
+    def test_headers_report_most_restrictive_policy(self, middleware):
+        status, headers = request(middleware, "POST", "/api/charged")
+
+        assert status == 200
+        assert headers["ratelimit-limit"] == "1"
+        assert headers["ratelimit-remaining"] == "0"
+
+    def test_rejections_are_counted_per_policy(self, middleware):
+        before = {name: RATE_LIMIT_REJECTIONS.value(name) for name in ("ai", "default")}
+
+        for _ in range(2):
+            request(middleware, "POST", "/api/charged")
+        request(middleware, "GET", "/api/things")
+
+        assert RATE_LIMIT_REJECTIONS.value("default") == before["default"] + 1
+        assert RATE_LIMIT_REJECTIONS.value("ai") == before["ai"] + 1
+
+    def test_policy_matches_methods(self):
+        policy = RateLimitPolicy("ai", 1, 60, paths=("/api/narrative",), methods=("POST",))
+
+        assert policy.matches("POST", "/api/narrative")
+        assert not policy.matches("GET", "/api/narrative")
+        assert not policy.matches("POST", "/api/narrative/other")
@@ -0,0 +1,225 @@
+import asyncio
+
+import pytest
+from app.services.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    LatencyTracker,
+    ResilientCaller,
+    RetryPolicy,
+    UpstreamTimeoutError,
+    UpstreamUnavailableError,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def no_delay_caller(**kwargs) -> ResilientCaller:
+    return ResilientCaller(retry=RetryPolicy(max_attempts=3, base_delay=0), **kwargs)
+
+
+class TestRetryPolicy:
+    def test_delay_is_jittered_and_capped(self):
+        policy = RetryPolicy(base_delay=1.0, max_delay=4.0)
+
+        delays = [policy.delay(attempt) for attempt in range(10) for _ in range(20)]
+
+        assert all(0 <= d <= 4.0 for d in delays)
+        assert len(set(delays)) > 1
+
+    def test_delay_honours_retry_after(self):
+        policy = RetryPolicy(base_delay=0.01, max_delay=10.0)
+
+        assert policy.delay(0, retry_after=3.0) >= 3.0
+        assert policy.delay(0, retry_after=60.0) == 10.0
+
+
+class TestCircuitBreaker:
+    def test_opens_after_threshold_and_recovers(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+
+        breaker.record_failure()
+        breaker.before_call()
+        breaker.record_failure()
+
+        assert breaker.state == "open"
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+        clock.now = 10
+        breaker.before_call()  # probe allowed
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()  # only one probe at a time
+
+        breaker.record_success()
+        assert breaker.state == "closed"
+
+    def test_failed_probe_reopens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+
+        clock.now = 10
+        breaker.before_call()
+        breaker.record_failure()
+
+        assert breaker.state == "open"
+
+
+def half_open_caller(clock: FakeClock) -> ResilientCaller:
+    """A caller whose circuit has opened and whose next call is the probe."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 10
+    return no_delay_caller(breaker=breaker)
+
+
+class TestResilientCaller:
+    def test_retries_retryable_errors(self):
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise UpstreamUnavailableError("down", 503)
+            return "ok"
+
+        assert no_delay_caller().call(flaky) == "ok"
+        assert len(calls) == 3
+
+    def test_gives_up_after_max_attempts(self):
+        calls = []
+
+        def down():
+            calls.append(1)
+            raise UpstreamUnavailableError("down", 503)
+
+        with pytest.raises(UpstreamUnavailableError):
+            no_delay_caller().call(down)
+        assert len(calls) == 3
+
+    def test_unrelated_errors_are_not_retried(self):
+        calls = []
+
+        def bug():
+            calls.append(1)
+            raise KeyError("oops")
+
+        with pytest.raises(KeyError):
+            no_delay_caller().call(bug)
+        assert len(calls) == 1
+
+    def test_probe_raising_unrelated_error_reopens_circuit(self):
+        clock = FakeClock()
+        caller = half_open_caller(clock)
+
+        def bug():
+            raise KeyError("oops")
+
+        with pytest.raises(KeyError):
+            caller.call(bug)
+
+        assert caller.breaker.state == "open"
+        clock.now = 20
+        assert caller.call(lambda: "ok") == "ok"
+        assert caller.breaker.state == "closed"
+
+    def test_cancelled_probe_reopens_circuit(self):
+        clock = FakeClock()
+        caller = half_open_caller(clock)
+
+        async def scenario():
+            started = asyncio.Event()
+
+            async def hang():
+                started.set()
+                await asyncio.sleep(60)
+
+            task = asyncio.ensure_future(caller.call_async(hang))
+            await started.wait()
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(scenario())
+
+        assert caller.breaker.state == "open"
+        clock.now = 20
+
+        async def ok():
+            return "ok"
+
+        assert asyncio.run(caller.call_async(ok)) == "ok"
+        assert caller.breaker.state == "closed"
+
+    def test_cancellations_do_not_open_closed_circuit(self):
+        caller = no_delay_caller(breaker=CircuitBreaker(failure_threshold=2))
+
+        async def scenario():
+            for _ in range(5):
+                started = asyncio.Event()
+
+                async def hang():
+                    started.set()
+                    await asyncio.sleep(60)
+
+                task = asyncio.ensure_future(caller.call_async(hang))
+                await started.wait()
+                task.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await task
+
+        asyncio.run(scenario())
+
+        assert caller.breaker.state == "closed"
+
+    def test_unrelated_errors_do_not_open_closed_circuit(self):
+        caller = no_delay_caller(breaker=CircuitBreaker(failure_threshold=2))
+
+        def bug():
+            raise KeyError("oops")
+
+        for _ in range(5):
+            with pytest.raises(KeyError):
+                caller.call(bug)
+
+        assert caller.breaker.state == "closed"
+        assert caller.call(lambda: "ok") == "ok"
+
+    def test_asyncio_timeout_classified(self):
+        async def slow():
+            raise asyncio.TimeoutError()
+
+        caller = ResilientCaller(retry=RetryPolicy(max_attempts=1))
+
+        with pytest.raises(UpstreamTimeoutError):
+            asyncio.run(caller.call_async(slow))
+
+    def test_hedged_request_wins_when_primary_is_slow(self):
+        latency = LatencyTracker(min_samples=1)
+        latency.record(0.01)
+        caller = no_delay_caller(latency=latency, hedge_percentile=0.95)
+        delays = [1.0, 0.0]
+
+        async def call():
+            delay = delays.pop(0)
+            await asyncio.sleep(delay)
+            return delay
+
+        async def scenario():
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            result = await caller.call_async(call)
+            return result, loop.time() - start
+
+        result, elapsed = asyncio.run(scenario())
+
+        assert result == 0.0
+        assert elapsed < 0.5
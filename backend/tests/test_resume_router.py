@@ -0,0 +1,217 @@
+import asyncio
+import json
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import pytest
+from starlette.datastructures import Headers, UploadFile
+
+from app.config.settings import settings
+from app.routers import resume
+from app.services.worker_pool import WorkerPool
+from benchmarks.corpus import ResumeSpec, make_pdf
+
+
+def resume_file(seed: int):
+    return {"file": ("resume.pdf", pdf_bytes(seed), "application/pdf")}
+
+
+def pdf_bytes(seed: int) -> bytes:
+    return make_pdf(ResumeSpec("small", "•", 0.0, seed))
+
+
+def zip_bytes(members) -> bytes:
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        for name, data in members:
+            zf.writestr(name, data)
+    return buffer.getvalue()
+
+
+def parse_ndjson(text: str):
+    return [json.loads(line) for line in text.splitlines() if line]
+
+
+def parse_sse(text: str):
+    events = []
+    for block in text.strip().split("\n\n"):
+        event, data = block.split("\n")
+        events.append({"type": event[len("event: "):], "data": json.loads(data[len("data: "):])})
+    return events
+
+
+def pool_drained(timeout: float = 5.0) -> bool:
+    """Whether every parse_pool job has finished (abandoned ones finish late)."""
+    deadline = time.monotonic() + timeout
+    while resume.parse_pool.in_flight and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return resume.parse_pool.in_flight == 0
+
+
+@pytest.fixture
+def thread_pool(monkeypatch):
+    """Run parse_pool jobs on threads, so tests can swap in slow parsers."""
+    pool = WorkerPool(max_workers=2, max_queue=2, executor_factory=ThreadPoolExecutor)
+    monkeypatch.setattr(resume, "parse_pool", pool)
+    yield pool
+    pool.shutdown()
+
+
+class TestParseResumeStream:
+    def test_ndjson_streams_bullets_then_summary(self, client, seed):
+        response = client.post("/api/parse-resume/stream", files=resume_file(seed))
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        events = parse_ndjson(response.text)
+        assert [e["type"] for e in events] == ["bullet"] * 9 + ["summary"]
+        assert events[-1]["data"]["count"] == 9
+        assert events[-1]["data"]["cached"] is False
+        assert pool_drained()
+
+    def test_sse_format_and_cached_replay(self, client, seed):
+        files = resume_file(seed)
+        first = client.post("/api/parse-resume/stream?format=sse", files=files)
+        second = client.post("/api/parse-resume/stream?format=sse", files=files)
+
+        assert first.headers["content-type"].startswith("text/event-stream")
+        events = parse_sse(second.text)
+        assert [e["type"] for e in events] == ["bullet"] * 9 + ["summary"]
+        assert events[-1]["data"]["cached"] is True
+        assert [e["data"] for e in parse_sse(first.text)[:-1]] == [e["data"] for e in events[:-1]]
+
+    def test_rejects_unknown_format(self, client, seed):
+        response = client.post("/api/parse-resume/stream?format=xml", files=resume_file(seed))
+        assert response.status_code == 422
+
+    def test_busy_when_pool_saturated(self, client, seed, monkeypatch):
+        monkeypatch.setattr(resume.parse_pool, "_in_flight", resume.parse_pool.capacity)
+
+        response = client.post("/api/parse-resume/stream", files=resume_file(seed))
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "5"
+
+    def test_timeout_emits_error_event(self, client, seed, monkeypatch):
+        monkeypatch.setattr(settings, "parse_timeout_seconds", 0)
+
+        response = client.post("/api/parse-resume/stream", files=resume_file(seed))
+
+        events = parse_ndjson(response.text)
+        assert [e["type"] for e in events] == ["error"]
+        assert events[-1]["data"] == {"detail": "Parsing timed out"}
+        assert pool_drained()
+
+    def test_timeout_without_bullets(self, client, seed, monkeypatch, thread_pool):
+        monkeypatch.setattr(settings, "parse_timeout_seconds", 0.2)
+
+        def silent(source, file_type, sink, expires_at):
+            time.sleep(1)  # a long stretch with no bullets
+            sink.put(None)
+            return 0
+
+        monkeypatch.setattr(resume, "stream_resume_file", silent)
+
+        start = time.perf_counter()
+        response = client.post("/api/parse-resume/stream", files=resume_file(seed))
+
+        assert time.perf_counter() - start < 1
+        assert parse_ndjson(response.text) == [
+            {"type": "error", "data": {"detail": "Parsing timed out"}}
+        ]
+
+    def test_worker_failure_emits_error_event(self, client, seed, monkeypatch, thread_pool):
+        def broken(source, file_type, sink, expires_at):
+            sink.put(None)
+            raise ValueError("bad document")
+
+        monkeypatch.setattr(resume, "stream_resume_file", broken)
+
+        response = client.post("/api/parse-resume/stream", files=resume_file(seed))
+
+        assert parse_ndjson(response.text) == [
+            {"type": "error", "data": {"detail": "Parsing failed: bad document"}}
+        ]
+
+    def test_releases_slot_when_body_never_starts(self, seed, monkeypatch):
+        monkeypatch.setattr(settings, "upload_spill_threshold", 0)
+        upload = UploadFile(
+            BytesIO(resume_file(seed)["file"][1]),
+            filename="resume.pdf",
+            headers=Headers({"content-type": "application/pdf"}),
+        )
+
+        async def receive():
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            raise ConnectionResetError("client went away")
+
+        async def run():
+            response = await resume.parse_resume_stream(upload, "ndjson", "spans")
+            with pytest.raises(ConnectionResetError):
+                await response({"type": "http"}, receive, send)
+
+        spilled_before = set(resume.UPLOAD_DIR.iterdir())
+        asyncio.run(run())
+
+        assert pool_drained()
+        assert set(resume.UPLOAD_DIR.iterdir()) == spilled_before
+
+
+class TestParseResumeBatch:
+    def post_batch(self, client, files):
+        return client.post(
+            "/api/parse-resume/batch",
+            files=[("files", (name, data, "application/octet-stream")) for name, data in files],
+        )
+
+    def test_expands_zip_members_and_disambiguates_names(self, client, seed):
+        pdf = pdf_bytes(seed)
+        archive = zip_bytes([("resume.pdf", pdf), ("notes.txt", b"hello")])
+
+        response = self.post_batch(client, [("resume.pdf", pdf), ("bundle.zip", archive)])
+
+        assert response.status_code == 200
+        body = response.json()
+        assert sorted(body["results"]) == ["resume (2).pdf", "resume.pdf"]
+        assert len(body["results"]["resume.pdf"]) == 9
+        assert body["errors"] == {"notes.txt": "Only PDF and DOCX files are supported"}
+
+    def test_reports_oversize_files_and_members(self, client, seed, monkeypatch):
+        pdf = pdf_bytes(seed)
+        monkeypatch.setattr(settings, "max_upload_size", len(pdf) - 1)
+
+        response = self.post_batch(
+            client, [("big.pdf", pdf), ("bundle.zip", zip_bytes([("inner.pdf", pdf)]))]
+        )
+
+        message = f"File exceeds maximum upload size of {len(pdf) - 1} bytes"
+        assert response.json() == {
+            "results": {},
+            "errors": {"big.pdf": message, "inner.pdf": message},
+        }
+
+    def test_reports_invalid_zip(self, client):
+        response = self.post_batch(client, [("bundle.zip", b"not a zip")])
+
+        assert response.json()["errors"]["bundle.zip"].startswith("Invalid ZIP archive")
+
+    def test_batch_deadline(self, client, seed, monkeypatch):
+        monkeypatch.setattr(settings, "parse_batch_deadline_seconds", 0)
+
+        response = self.post_batch(client, [("a.pdf", pdf_bytes(seed)), ("b.pdf", pdf_bytes(seed + 1))])
+
+        assert response.json()["errors"] == {
+            "a.pdf": "Batch deadline exceeded",
+            "b.pdf": "Batch deadline exceeded",
+        }
+
+    def test_per_file_timeout_is_not_the_batch_deadline(self, client, seed, monkeypatch):
+        monkeypatch.setattr(settings, "parse_timeout_seconds", 0.000001)
+
+        response = self.post_batch(client, [("a.pdf", pdf_bytes(seed))])
+
+        assert response.json()["errors"] == {"a.pdf": "Parsing timed out"}
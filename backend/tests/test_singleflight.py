@@ -0,0 +1,115 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.utils.singleflight import SingleFlight, SingleFlightTimeout
+
+
+class TestSingleFlight:
+    def test_sync_calls_coalesce(self):
+        flights = SingleFlight()
+        calls = []
+
+        def work():
+            calls.append(1)
+            time.sleep(0.1)
+            return "done"
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda _: flights.do("key", work), range(4)))
+
+        assert results == ["done"] * 4
+        assert len(calls) == 1
+
+    def test_sync_error_fans_out(self):
+        flights = SingleFlight()
+
+        def fail():
+            time.sleep(0.1)
+            raise ValueError("boom")
+
+        def call(_):
+            try:
+                flights.do("key", fail)
+            except ValueError as e:
+                return str(e)
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            results = list(executor.map(call, range(3)))
+
+        assert results == ["boom"] * 3
+
+    def test_key_released_after_completion(self):
+        flights = SingleFlight()
+        calls = []
+
+        flights.do("key", lambda: calls.append(1))
+        flights.do("key", lambda: calls.append(1))
+
+        assert len(calls) == 2
+
+    def test_async_calls_coalesce(self):
+        flights = SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "done"
+
+        async def scenario():
+            return await asyncio.gather(*(flights.do_async("key", work) for _ in range(5)))
+
+        assert asyncio.run(scenario()) == ["done"] * 5
+        assert len(calls) == 1
+
+    def test_async_distinct_keys_run_separately(self):
+        flights = SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+
+        async def scenario():
+            await asyncio.gather(flights.do_async("a", work), flights.do_async("b", work))
+
+        asyncio.run(scenario())
+
+        assert len(calls) == 2
+
+    def test_async_waiter_times_out(self):
+        flights = SingleFlight(wait_timeout=0.05)
+
+        async def work():
+            await asyncio.sleep(0.3)
+            return "done"
+
+        async def scenario():
+            return await asyncio.gather(
+                flights.do_async("key", work),
+                flights.do_async("key", work),
+                return_exceptions=True,
+            )
+
+        leader, follower = asyncio.run(scenario())
+
+        assert leader == "done"
+        assert isinstance(follower, SingleFlightTimeout)
+
+    def test_async_leader_cancel_does_not_cancel_followers(self):
+        flights = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        async def scenario():
+            leader = asyncio.ensure_future(flights.do_async("key", work))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(flights.do_async("key", work))
+            await asyncio.sleep(0)
+            leader.cancel()
+            return await follower
+
+        assert asyncio.run(scenario()) == "done"
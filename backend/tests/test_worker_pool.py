@@ -0,0 +1,89 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from app.services.worker_pool import JobTimeoutError, PoolSaturatedError, WorkerPool
+
+
+def square(x: int) -> int:
+    return x * x
+
+
+def sleep_for(seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+@pytest.fixture
+def thread_pool():
+    pool = WorkerPool(max_workers=1, max_queue=1, executor_factory=ThreadPoolExecutor)
+    yield pool
+    pool.shutdown()
+
+
+class TestWorkerPool:
+    def test_run_in_process_pool(self):
+        pool = WorkerPool(max_workers=2, max_queue=2)
+        try:
+            result = asyncio.run(pool.run(square, 7))
+        finally:
+            pool.shutdown()
+
+        assert result == 49
+
+    def test_rejects_when_saturated(self, thread_pool):
+        thread_pool.submit(sleep_for, 0.2)
+        thread_pool.submit(sleep_for, 0.2)
+
+        with pytest.raises(PoolSaturatedError):
+            thread_pool.submit(sleep_for, 0.2)
+
+    def test_slot_released_after_completion(self, thread_pool):
+        thread_pool.submit(sleep_for, 0).result()
+        time.sleep(0.01)
+
+        assert thread_pool.in_flight == 0
+
+    def test_timeout(self, thread_pool):
+        with pytest.raises(JobTimeoutError):
+            asyncio.run(thread_pool.run(sleep_for, 0.5, timeout=0.05))
+
+    def test_event_loop_not_blocked(self, thread_pool):
+        async def scenario():
+            job = asyncio.ensure_future(thread_pool.run(sleep_for, 0.2))
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            elapsed = time.perf_counter() - start
+            await job
+            return elapsed
+
+        assert asyncio.run(scenario()) < 0.1
+
+    def test_abandoned_result_discarded(self, thread_pool):
+        discarded = []
+
+        with pytest.raises(JobTimeoutError):
+            asyncio.run(
+                thread_pool.run(sleep_for, 0.1, timeout=0.01, discard=discarded.append)
+            )
+        time.sleep(0.2)
+
+        assert discarded == [0.1]
+
+    def test_cancelled_job_result_discarded(self, thread_pool):
+        discarded = []
+
+        async def scenario():
+            job = asyncio.ensure_future(
+                thread_pool.run(sleep_for, 0.1, discard=discarded.append)
+            )
+            await asyncio.sleep(0.02)
+            job.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await job
+
+        asyncio.run(scenario())
+        time.sleep(0.2)
+
+        assert discarded == [0.1]
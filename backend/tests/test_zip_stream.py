@@ -0,0 +1,69 @@
+import io
+import zipfile
+
+from app.utils.zip_stream import ZipStream, iter_zip_members
+
+
+class TestZipStream:
+    def test_builds_valid_archive_incrementally(self, tmp_path):
+        path = tmp_path / "report.pdf"
+        path.write_bytes(b"%PDF-" + b"x" * 10000)
+        stream = ZipStream()
+
+        chunks = [
+            stream.add_file(path, "a.pdf"),
+            stream.add_bytes(b'{"ok": true}', "manifest.json"),
+            stream.close(),
+        ]
+
+        assert all(chunks)
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+        assert archive.namelist() == ["a.pdf", "manifest.json"]
+        assert archive.testzip() is None
+        assert archive.read("a.pdf") == path.read_bytes()
+
+    def test_each_member_returned_once(self):
+        stream = ZipStream(compression=zipfile.ZIP_STORED)
+
+        first = stream.add_bytes(b"first member", "1.txt")
+        second = stream.add_bytes(b"second member", "2.txt")
+
+        assert b"first member" in first
+        assert b"first member" not in second
+        assert b"second member" in second
+
+
+class TestIterZipMembers:
+    def test_yields_files_and_flags_oversize_members(self):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as zf:
+            zf.writestr("dir/", "")
+            zf.writestr("dir/small.pdf", b"abc")
+            zf.writestr("large.pdf", b"x" * 10)
+
+        members = [
+            (name, read() if read else None, error)
+            for name, read, error in iter_zip_members(
+                io.BytesIO(buffer.getvalue()), max_member_size=5
+            )
+        ]
+
+        assert members == [
+            ("dir/small.pdf", b"abc", None),
+            ("large.pdf", None, "File exceeds maximum upload size of 5 bytes"),
+        ]
+
+    def test_members_are_not_read_until_asked(self, monkeypatch):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as zf:
+            zf.writestr("a.pdf", b"abc")
+            zf.writestr("b.pdf", b"def")
+
+        def fail(self, *args, **kwargs):
+            raise AssertionError("member was read")
+
+        monkeypatch.setattr(zipfile.ZipFile, "read", fail)
+
+        names = [name for name, _, _ in iter_zip_members(io.BytesIO(buffer.getvalue()), 10)]
+
+        assert names == ["a.pdf", "b.pdf"]
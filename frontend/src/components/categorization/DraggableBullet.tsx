@@ -1,7 +1,7 @@
 import { useDraggable } from '@dnd-kit/core';
 import { CSS } from '@dnd-kit/utilities';
 import { Copy, Trash2 } from 'lucide-react';
-import { useRef, useState, useEffect } from 'react';
+import { useRef, useState, useEffect, ReactNode } from 'react';
 import { BulletPoint } from '../../types/BulletPoint';
 
 interface Props {
@@ -33,25 +33,33 @@ export default function DraggableBullet({ bullet, onDuplicate, onDelete, fixedHe
   };
 
   const renderFormattedText = () => {
-    if (!bullet.formatting.bold.length && !bullet.formatting.italic.length) {
+    const { spans } = bullet.formatting;
+    if (!spans.length) {
       return bullet.text;
     }
 
-    return bullet.text.split('').map((char, idx) => {
-      const isBold = bullet.formatting.bold[idx];
-      const isItalic = bullet.formatting.italic[idx];
+    const parts: ReactNode[] = [];
+    let pos = 0;
+    spans.forEach(([start, end, isBold, isItalic], idx) => {
+      if (start > pos) {
+        parts.push(bullet.text.slice(pos, start));
+      }
 
       let className = '';
       if (isBold && isItalic) className = 'font-semibold italic';
       else if (isBold) className = 'font-semibold';
       else if (isItalic) className = 'italic';
 
-      return (
+      parts.push(
         <span key={idx} className={className}>
-          {char}
+          {bullet.text.slice(start, end)}
         </span>
       );
+      pos = end;
     });
+    parts.push(bullet.text.slice(pos));
+
+    return parts;
   };
 
   return (
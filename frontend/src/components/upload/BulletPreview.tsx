@@ -22,10 +22,7 @@ export default function BulletPreview({ bullets, file, onConfirm, onBack }: Prop
           ? {
               ...b,
               text: newText,
-              formatting: {
-                bold: Array(newText.length).fill(false),
-                italic: Array(newText.length).fill(false),
-              },
+              formatting: { spans: [] },
             }
           : b
       )
@@ -40,7 +37,7 @@ export default function BulletPreview({ bullets, file, onConfirm, onBack }: Prop
     const newBullet: BulletPoint = {
       id: `new-${Date.now()}`,
       text: '',
-      formatting: { bold: [], italic: [] },
+      formatting: { spans: [] },
       original_index: editedBullets.length,
     };
     setEditedBullets((prev) => [...prev, newBullet]);
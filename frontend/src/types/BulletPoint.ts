@@ -1,6 +1,8 @@
+// [start, end, bold, italic] over text.slice(start, end)
+export type FormattingSpan = [number, number, boolean, boolean];
+
 export interface FormattingInfo {
-  bold: boolean[];
-  italic: boolean[];
+  spans: FormattingSpan[];
 }
 
 export interface BulletPoint {
@@ -1,3 +1,3 @@
-export type { BulletPoint, FormattingInfo } from './BulletPoint';
+export type { BulletPoint, FormattingInfo, FormattingSpan } from './BulletPoint';
 export type { Bin } from './Bin';
 export type { Distribution, Analytics, AnalysisResult } from './Analytics';